@@ -8,11 +8,13 @@ from datetime import datetime
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-from src.gpx_loader import GpxLoader, Segment
-from src.weather_client import WeatherClient
-from src.rider import Rider
-from src.physics_engine import PhysicsEngine, PhysicsParams
-from src.valhalla_client import ValhallaClient, SURFACE_MAP
+from src.core.gpx_loader import GpxLoader, Segment
+from src.services.weather import WeatherClient
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsParams
+from src.engines.registry import create_engine, available_engines, DEFAULT_ENGINE
+from src.services.valhalla import ValhallaClient, SURFACE_MAP
+from src.core.profiling import SamplingProfiler, format_hotspots
 import time
 
 def _convert_json_to_segments(v_data: dict) -> list[Segment]:
@@ -100,12 +102,26 @@ def main():
     parser.add_argument("--crr", type=float, default=0.004, help="Crr")
     parser.add_argument("--drafting", type=float, default=0.0, help="Drafting Factor (0.0 - 0.5)")
     
+    # Engine
+    parser.add_argument("--engine", type=str, default=DEFAULT_ENGINE, choices=available_engines(), help="Physics engine (default: $SIM_ENGINE or v2)")
+    parser.add_argument("--time-tolerance", type=float, default=0.0, help="Stop the p_base search once the finish time is known within this many seconds (0 = full precision)")
+    parser.add_argument("--power-tolerance", type=float, default=0.0, help="Stop the p_base search once its bracket is narrower than this [W] (0 = full precision)")
+    
+    # Profiling
+    parser.add_argument("--profile", nargs="?", const="profile.folded", default=None, metavar="PATH", help="Sample the course loading & solver; write collapsed stacks to PATH (default: profile.folded)")
+    parser.add_argument("--profile-top", type=int, default=20, help="Number of hotspots to print with --profile")
+    
     # Environment
     parser.add_argument("--wind-speed", type=float, default=0.0, help="Wind Speed [m/s]")
     parser.add_argument("--wind-deg", type=float, default=0.0, help="Wind Direction [deg] (0=North)")
     
     args = parser.parse_args()
 
+    profiler = None
+    if args.profile:
+        profiler = SamplingProfiler()
+        profiler.start()
+
     # 1. Load Course (GPX or JSON)
     if not os.path.exists(args.gpx):
         print(f"Error: File not found: {args.gpx}")
@@ -212,13 +228,19 @@ def main():
     rider = Rider(cp=cp_val, w_prime_max=wp_val, weight=weight_val, pdc=pdc_data)
     params = PhysicsParams(cda=args.cda, crr=args.crr, bike_weight=args.bike_weight, drafting_factor=args.drafting)
     weather = WeatherClient(use_scenario_mode=True, scenario_data={"wind_speed": args.wind_speed, "wind_deg": args.wind_deg, "temperature": 20.0})
-    engine = PhysicsEngine(rider, params, weather)
+    engine = create_engine(args.engine, rider, params, weather)
+    if hasattr(engine, "set_search_tolerance"):
+        engine.set_search_tolerance(time_tolerance_sec=args.time_tolerance, power_tolerance_w=args.power_tolerance)
     
     # 3. Run Optimization
-    print("\n[Running Physics Engine]")
+    print(f"\n[Running Physics Engine: {args.engine}]")
     print(f"Rider: {cp_val}W CP, {wp_val/1000:.1f}kJ W'")
     result = engine.find_optimal_pacing(segments)
     
+    if profiler is not None:
+        profiler.stop()
+        profiler.write_collapsed(args.profile)
+    
     # 4. Report
     print("\n" + "="*40)
     print("      SIMULATION REPORT")
@@ -230,6 +252,10 @@ def main():
     print(f"Avg Power    : {result.average_power:.0f} W")
     print(f"Work         : {result.work_kj:.0f} kJ")
     print(f"Min W' Bal   : {result.w_prime_min/1000:.1f} kJ (Remaining)")
+    tol = getattr(result, "achieved_tolerance", None)
+    if tol:
+        time_tol = f", time ±{tol['time_sec']:.1f}s" if tol["time_sec"] is not None else ""
+        print(f"Precision    : P_base ±{tol['p_base_w']:.2f} W{time_tol} ({tol['iterations']} iterations)")
     
     if result.is_success:
         print("-" * 40)
@@ -239,47 +265,20 @@ def main():
         # Capture segment details for visualization
         output_data = {"summary": {"time_str": f"{h}h {m}m {s}s", "avg_speed": result.average_speed_kmh, "norm_power": result.normalized_power, "work_kj": result.work_kj}, "segments": []}
         
-        engine.rider.reset_state()
-        curr_v = 0.1 # Start from rest (0.1 m/s)
-        cum_dist = 0.0
-        curr_total_time = 0.0
-        est_hours = total_dist / 1000.0 / 25.0
-        
-        for seg in segments:
-            # Re-calculate P_target (Simplified but consistent)
-            p_base = result.base_power
-            est_sec = est_hours * 3600
-            pdc_lim = engine.rider.get_pdc_power(est_sec)
-            riegel_lim = engine.rider.cp * ((1.0 / max(1.0, est_hours)) ** 0.07)
-            alpha_val = 1.0 if est_sec <= 1200 else (0.0 if est_sec >= 7200 else (1.0 - (est_sec - 1200) / 6000) ** 1.5)
-            final_p_limit = alpha_val * pdc_lim + (1.0 - alpha_val) * riegel_lim * 1.2
-            
-            p_target = engine._calculate_target_power(p_base, seg.grade, final_p_limit)
-            
-            # Wind
-            rel_angle = math.radians(args.wind_deg - seg.heading)
-            v_headwind = args.wind_speed * math.cos(rel_angle)
-            
-            v_next, t_sec, is_walking, _raw_v = engine._solve_segment_physics(seg, p_target, curr_v, v_headwind, f_limit=engine.rider.get_max_force())
-            
-            p_actual = 30.0 if is_walking else p_target
-            
-            engine.rider.update_w_prime(p_actual, t_sec)
-            cum_dist += seg.length
-            curr_total_time += t_sec
+        # Segment details straight from the winning run (engine independent)
+        for seg, p in zip(segments, result.track_data or []):
             output_data["segments"].append({
-                "dist_km": cum_dist / 1000.0, 
+                "dist_km": p["dist_km"], 
                 "ele": seg.end_ele, 
                 "grade_pct": seg.grade * 100, 
-                "speed_kmh": (v_next * 3.6), 
-                "power": p_actual, 
-                "w_prime": engine.rider.w_prime_bal,
-                "time_sec": curr_total_time,
+                "speed_kmh": p["speed_kmh"], 
+                "power": p["power"], 
+                "w_prime": p.get("w_prime_bal"),
+                "time_sec": p["time_sec"],
                 "lat": getattr(seg, 'lat', 0.0),
                 "lon": getattr(seg, 'lon', 0.0),
                 "heading": getattr(seg, 'heading', 0.0)
             })
-            curr_v = v_next
             
         with open("simulation_result.json", "w") as f:
             json.dump(output_data, f, indent=2)
@@ -298,6 +297,10 @@ def main():
         print(f"Reason       : {result.fail_reason}")
     print("="*40)
     print(f"[System] Calculation Time: {time.time() - start_time:.2f} sec")
+    
+    if profiler is not None:
+        print(f"\n[Profile] {profiler.samples} samples over {profiler.duration:.2f} sec -> {args.profile}")
+        print(format_hotspots(profiler.top(args.profile_top)))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
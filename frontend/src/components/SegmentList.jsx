@@ -5,7 +5,7 @@ const SegmentList = () => {
   const { 
     segments, riderProfile, updateSegment, selectedSegmentIds, 
     toggleSegmentSelection, mergeSelectedSegments, exportGpx, 
-    runSimulation, simulationResult, exportJson 
+    runSimulation, simulationResult, simulationProgress, exportJson 
   } = useCourseStore();
 
   const formatTime = (seconds) => {
@@ -117,6 +117,13 @@ const SegmentList = () => {
           </span>
         </div>
         
+        {simulationProgress && (
+          <div className="mt-2 text-[10px] text-gray-500 font-mono">
+            Solving #{simulationProgress.iteration} · {simulationProgress.p_base.toFixed(0)}W
+            {simulationProgress.best_time_sec ? ` · ~${formatTime(simulationProgress.best_time_sec)}` : ''}
+          </div>
+        )}
+
         {simulationResult && (
           <div className="mt-2 pt-2 border-t border-gray-700 grid grid-cols-2 gap-2">
             <div className="bg-gray-900 p-2 rounded shadow-inner">
@@ -31,11 +31,14 @@ const initialRider = {
 
 const useCourseStore = create((set, get) => ({
   gpxData: [], 
+  courseId: null, // course_{hash} from /api/upload_gpx (simulate by id, no point upload)
   atomicSegments: [], 
   segments: [], 
   hoveredDist: null, 
   selectedSegmentIds: [], 
   simulationResult: null,
+  simulationProgress: null, // Latest solver probe while a streamed simulation runs
+  _simulationAbort: null, // AbortController of the running simulation (a new run cancels it)
   riderProfile: initialRider,
   riderPresets: riderData,
 
@@ -198,7 +201,7 @@ const useCourseStore = create((set, get) => ({
           });
       }
 
-      set({ gpxData: pointsWithGrade, atomicSegments: atomicSegments });
+      set({ gpxData: pointsWithGrade, courseId: data.course_id || null, atomicSegments: atomicSegments });
       
       const gpxDataForCalc = pointsWithGrade;
 
@@ -276,12 +279,19 @@ const useCourseStore = create((set, get) => ({
   },
 
   runSimulation: async () => {
-    const { gpxData, segments, riderProfile, _applySimulationStats } = get();
+    const { gpxData, courseId, segments, riderProfile, _applySimulationStats, _simulationAbort } = get();
     if (!gpxData.length) return;
+    // A new run supersedes the previous one: closing its stream cancels the server-side search
+    if (_simulationAbort) _simulationAbort.abort();
+    const abort = new AbortController();
+    set({ _simulationAbort: abort, simulationProgress: null });
     try {
       const payload = { 
-          points: gpxData, 
+          // Uploaded courses are simulated by id (server-side cached segments)
+          ...(courseId ? { course_id: courseId } : { points: gpxData }), 
           segments: segments.map(s => ({ id: s.id, start_dist: s.start_dist, end_dist: s.end_dist })), 
+          // Interactive precision: finish time within 30 s is plenty for planning (stops the search early)
+          time_tolerance_sec: 30,
           rider: {
               weight_kg: riderProfile.weight_kg,
               cp: riderProfile.cp,
@@ -290,10 +300,34 @@ const useCourseStore = create((set, get) => ({
               pdc: riderProfile.pdc
           }
       };
-      const response = await fetch('/api/simulate', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(payload) });
-      const result = await response.json();
-      set({ segments: _applySimulationStats(segments, result), simulationResult: result });
-    } catch (e) { console.error(e); }
+      const response = await fetch('/api/simulate/stream', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(payload), signal: abort.signal });
+      // Server-Sent Events: "progress" per solver probe, then "result" (or "error")
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) >= 0) {
+          const block = buffer.slice(0, sep);
+          buffer = buffer.slice(sep + 2);
+          const event = /^event: (.*)$/m.exec(block)?.[1];
+          const data = /^data: (.*)$/m.exec(block)?.[1];
+          if (!event || !data) continue;
+          if (event === 'progress') set({ simulationProgress: JSON.parse(data) });
+          else if (event === 'result') {
+            const result = JSON.parse(data);
+            set({ segments: _applySimulationStats(get().segments, result), simulationResult: result, simulationProgress: null });
+          } else if (event === 'error') console.error(JSON.parse(data).detail);
+        }
+      }
+    } catch (e) {
+      if (e.name !== 'AbortError') console.error(e);
+    } finally {
+      if (get()._simulationAbort === abort) set({ _simulationAbort: null });
+    }
   },
 
   exportGpx: () => { 
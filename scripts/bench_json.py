@@ -0,0 +1,63 @@
+"""
+[JSON Encode Benchmark]
+Encode time / size of the /api/simulate and /api/upload_gpx payloads for one course:
+  - before: FastAPI default (jsonable_encoder + json.dumps, what JSONResponse does for a dict)
+  - after:  src.services.json_response.dumps (orjson, NumPy arrays, float rounding)
+
+    python scripts/bench_json.py data/gpx/Seorak_Granfondo-208km.gpx
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+
+from src.core.gpx_loader import GpxLoader
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+from src.services.valhalla import ValhallaClient
+from src.services.json_response import dumps
+
+def _best_of(fn, repeat=7):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def _fastapi_default(content):
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+def report(name, content):
+    t_old, old = _best_of(lambda: _fastapi_default(content))
+    t_new, new = _best_of(lambda: dumps(content))
+    print(f"{name:<22} before {t_old * 1000:8.2f} ms {len(old) / 1024:8.1f} kB | "
+          f"after {t_new * 1000:7.2f} ms {len(new) / 1024:8.1f} kB | x{t_old / t_new:.1f}")
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "data/gpx/Seorak_Granfondo-208km.gpx"
+    loader = GpxLoader(path)
+    loader.load()
+
+    # Standard Course JSON, built offline (no map matching) from the GPX points
+    shape = [(p.lat, p.lon) for p in loader.points]
+    course = ValhallaClient()._parse_to_standard_format({"edges": []}, shape, [p.ele for p in loader.points])
+
+    segments = loader.compress_segments(grade_threshold=0.005, max_length=200.0)
+    rider = Rider(weight=82, cp=281, w_prime_max=52000)
+    res = PhysicsEngineV2(rider, PhysicsParams(bike_weight=8.5)).find_optimal_pacing(segments)
+    simulate_rows = {"total_time_sec": res.total_time_sec, "track_data": res.track_data.rows()}
+    simulate_cols = {"total_time_sec": res.total_time_sec, "track_data": dict(res.track_data.columns)}
+
+    report("upload_gpx (course)", course)
+    report("simulate (rows)", simulate_rows)
+    print(f"{'simulate (columnar)':<22} after {_best_of(lambda: dumps(simulate_cols))[0] * 1000:7.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+[Engine Benchmark Harness]
+Runs registered engines over the bundled GPX corpus for a fixed set of riders and
+reports, per (engine, course, rider):
+  - wall time of find_optimal_pacing
+  - number of simulate_course calls and solver iterations (when the engine reports them)
+  - peak Python heap during the run (tracemalloc, measured in a separate pass)
+  - hot-path counters from that same pass, for engines with enable_instrumentation()
+  - deltas of the result vs a golden run (a previous output of this script)
+
+Output is a single JSON document, so runs can be diffed/tracked between commits:
+
+    python scripts/benchmark.py --engines v2 v1 --out bench.json
+    python scripts/benchmark.py --engines v2 --golden bench.json --out bench_new.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.gpx_loader import GpxLoader, Segment
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsParams
+from src.engines.registry import available_engines, create_engine
+
+DEFAULT_RIDERS = ["rider_a", "rider_c"]
+RIDER_DATA_PATH = "data/config/rider_data.json"
+GPX_GLOB = "data/gpx/*.gpx"
+
+# Result fields compared against the golden run
+RESULT_FIELDS = ["total_time_sec", "base_power", "average_speed_kmh", "average_power",
+                 "normalized_power", "work_kj", "w_prime_min"]
+
+def load_courses(pattern: str = GPX_GLOB) -> Dict[str, List[Segment]]:
+    """Course name (file stem) -> segments, compressed the same way as /api/simulate."""
+    courses = {}
+    for path in sorted(glob.glob(pattern)):
+        loader = GpxLoader(path)
+        loader.load()
+        courses[os.path.splitext(os.path.basename(path))[0]] = loader.compress_segments(grade_threshold=0.005, max_length=200.0)
+    return courses
+
+def load_riders(names: List[str], path: str = RIDER_DATA_PATH) -> Dict[str, dict]:
+    with open(path, "r") as f:
+        all_riders = json.load(f)
+    missing = [n for n in names if n not in all_riders]
+    if missing:
+        raise ValueError(f"Unknown rider(s): {', '.join(missing)}")
+    return {n: all_riders[n] for n in names}
+
+def _make_rider(info: dict) -> Rider:
+    return Rider(weight=info.get("weight_kg", 70.0), cp=info.get("cp", 250.0),
+                 w_prime_max=info.get("w_prime", 20000.0), pdc=info.get("pdc", {}))
+
+def _make_engine(name: str, info: dict, params: PhysicsParams):
+    engine = create_engine(name, _make_rider(info), params)
+    # Same configuration as the server
+    if hasattr(engine, "set_tuning"):
+        engine.set_tuning(mode='asymmetric', slow=0.6, fast=1.5)
+    return engine
+
+def _count_simulate_calls(engine) -> List[int]:
+    """Shadow engine.simulate_course with a counting wrapper (instance attribute only)."""
+    counter = [0]
+    inner = engine.simulate_course
+
+    def counted(*args, **kwargs):
+        counter[0] += 1
+        return inner(*args, **kwargs)
+
+    engine.simulate_course = counted
+    return counter
+
+def _solver_iterations(engine) -> Optional[int]:
+    for attr in ("last_dahmen_iterations",):
+        value = getattr(engine, attr, None)
+        if value is not None:
+            return int(value)
+    return None
+
+def run_case(engine_name: str, segments: List[Segment], rider_info: dict,
+             params: PhysicsParams, measure_memory: bool = True) -> dict:
+    engine = _make_engine(engine_name, rider_info, params)
+    calls = _count_simulate_calls(engine)
+
+    t0 = time.perf_counter()
+    res = engine.find_optimal_pacing(segments)
+    wall = time.perf_counter() - t0
+
+    case = {
+        "wall_time_sec": wall,
+        "simulate_calls": calls[0],
+        "solver_iterations": _solver_iterations(engine),
+        "peak_memory_kb": None,
+        "counters": None,
+        "is_success": bool(res.is_success),
+        "fail_reason": res.fail_reason,
+        "result": {f: float(getattr(res, f)) for f in RESULT_FIELDS},
+    }
+
+    # Separate pass: tracemalloc and counters slow Python code down, so they must not skew wall time
+    engine = _make_engine(engine_name, rider_info, params)
+    instrumented = hasattr(engine, "enable_instrumentation")
+    if measure_memory or instrumented:
+        if instrumented:
+            engine.enable_instrumentation()
+        if measure_memory:
+            tracemalloc.start()
+        try:
+            res = engine.find_optimal_pacing(segments)
+            if measure_memory:
+                case["peak_memory_kb"] = tracemalloc.get_traced_memory()[1] / 1024.0
+        finally:
+            if measure_memory:
+                tracemalloc.stop()
+        if getattr(res, "stats", None):
+            case["counters"] = res.stats
+            if case["solver_iterations"] is None:
+                case["solver_iterations"] = res.stats["outer_iterations"]
+    return case
+
+def compare_to_golden(cases: List[dict], golden: dict) -> None:
+    """Attach `delta` (this run - golden) for every case that also exists in the golden run."""
+    index = {(c["engine"], c["course"], c["rider"]): c for c in golden.get("cases", [])}
+    for case in cases:
+        ref = index.get((case["engine"], case["course"], case["rider"]))
+        if ref is None:
+            case["delta"] = None
+            continue
+        delta = {f: case["result"][f] - ref["result"][f] for f in RESULT_FIELDS if f in ref.get("result", {})}
+        delta["wall_time_ratio"] = case["wall_time_sec"] / ref["wall_time_sec"] if ref.get("wall_time_sec") else None
+        case["delta"] = delta
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def run_benchmark(engines: List[str], courses: Dict[str, List[Segment]], riders: Dict[str, dict],
+                  params: Optional[PhysicsParams] = None, golden: Optional[dict] = None,
+                  measure_memory: bool = True, verbose: bool = False) -> dict:
+    params = params or PhysicsParams(bike_weight=8.5)
+    cases = []
+    for engine_name in engines:
+        for course_name, segments in courses.items():
+            for rider_name, info in riders.items():
+                case = {"engine": engine_name, "course": course_name, "rider": rider_name,
+                        "segments": len(segments)}
+                case.update(run_case(engine_name, segments, info, params, measure_memory))
+                cases.append(case)
+                if verbose:
+                    print(f"{engine_name:>7} {course_name:<28} {rider_name:<8} "
+                          f"{case['wall_time_sec']:8.2f}s  calls={case['simulate_calls']:<5} "
+                          f"time={case['result']['total_time_sec']:.0f}s", file=sys.stderr)
+    if golden is not None:
+        compare_to_golden(cases, golden)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "params": vars(params),
+        "cases": cases,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark physics engines over the GPX corpus")
+    parser.add_argument("--engines", nargs="+", default=available_engines(), choices=available_engines())
+    parser.add_argument("--riders", nargs="+", default=DEFAULT_RIDERS, help="Rider IDs in rider_data.json")
+    parser.add_argument("--gpx", default=GPX_GLOB, help="Glob of GPX files")
+    parser.add_argument("--golden", default=None, help="Previous benchmark JSON to compute deltas against")
+    parser.add_argument("--out", default=None, help="Write JSON here (default: stdout)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    courses = load_courses(args.gpx)
+    if not courses:
+        print(f"No GPX files match {args.gpx}", file=sys.stderr)
+        sys.exit(1)
+    riders = load_riders(args.riders)
+
+    golden = None
+    if args.golden:
+        with open(args.golden, "r") as f:
+            golden = json.load(f)
+
+    report = run_benchmark(args.engines, courses, riders, golden=golden,
+                           measure_memory=not args.no_memory, verbose=True)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
 import math
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engines.flat_speed import solve_flat_speed
 
 def calculate_flat_time():
     # 1. 입력 파라미터
@@ -28,14 +34,11 @@ def calculate_flat_time():
     f_gravity = total_mass * g * math.sin(math.atan(grade)) # 0
     f_roll = total_mass * g * crr * math.cos(math.atan(grade)) # 약 89 * 9.81 * 0.006
     
-    # 5. 속도 찾기 (이분 탐색 - 엔진 로직과 동일 방식)
+    # 5. 속도 찾기 (엔진과 동일한 해석해 - 3차 방정식의 실근)
     # P_wheel = F_total * v
     # P_wheel = (F_roll + 0.5 * rho * CdA * v^2) * v
     # f(v) = 0.5 * rho * CdA * v^3 + F_roll * v - P_wheel = 0
     
-    low = 0.0
-    high = 100.0 # m/s (충분히 큰 값)
-    
     print(f"--- Simulation Conditions ---")
     print(f"Power (Input): {rider_power} W")
     print(f"Power (Wheel): {p_wheel:.2f} W")
@@ -44,29 +47,7 @@ def calculate_flat_time():
     print(f"Distance     : {distance_km} km")
     print(f"-----------------------------")
     
-    v_solution = 0.0
-    
-    for i in range(50):
-        mid = (low + high) / 2
-        v = mid
-        
-        if v < 0.001: v = 0.001
-        
-        # 공기 저항
-        f_drag = 0.5 * air_density * cda * (v ** 2)
-        
-        # 필요한 힘
-        f_req = f_roll + f_drag
-        
-        # 이 속도를 유지하기 위한 파워
-        p_req = f_req * v
-        
-        if p_req < p_wheel:
-            low = mid # 파워가 남음 -> 더 빠르게 가능
-        else:
-            high = mid # 파워 부족 -> 느리게
-            
-    v_solution = (low + high) / 2
+    v_solution = solve_flat_speed(rider_power, total_mass, cda, crr, air_density, drivetrain_loss)
     
     # 6. 결과 계산
     speed_kmh = v_solution * 3.6
@@ -11,11 +11,11 @@ from src.core.rider import Rider
 from src.core.gpx_loader import GpxLoader
 from src.engines.base import PhysicsEngine, PhysicsParams as ParamsV1
 from src.engines.v2 import PhysicsEngineV2, PhysicsParams
-from src.engines.base_v3 import PhysicsEngineV3
-from src.engines.base_v3_1 import PhysicsEngineV3_1
-from src.engines.base_v4 import PhysicsEngineV4
-from src.engines.base_v5 import PhysicsEngineV5
-from src.engines.base_gordon import GordonTheoryEngine
+from src.engines.legacy.v3 import PhysicsEngineV3
+from src.engines.legacy.v3_1 import PhysicsEngineV3_1
+from src.engines.legacy.v4 import PhysicsEngineV4
+from src.engines.legacy.v5 import PhysicsEngineV5
+from src.engines.legacy.gordon import GordonTheoryEngine
 
 def format_time(seconds):
     h = int(seconds // 3600)
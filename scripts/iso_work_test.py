@@ -9,7 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.core.gpx_loader import GpxLoader
 from src.core.rider import Rider
 from src.engines.v2 import PhysicsEngineV2, PhysicsParams
-from src.engines.base_theory import TheoryEngine
+from src.engines.legacy.theory import TheoryEngine
 
 def load_rider():
     with open('rider_data.json', 'r') as f:
@@ -10,7 +10,7 @@ from src.core.gpx_loader import GpxLoader
 from src.core.rider import Rider
 # Import V2 Engine directly
 from src.engines.v2 import PhysicsEngineV2, PhysicsParams, SimulationResult
-from src.engines.base_theory import TheoryEngine
+from src.engines.legacy.theory import TheoryEngine
 
 # Custom Engine Class for Testing
 class SensitivityEngine(PhysicsEngineV2):
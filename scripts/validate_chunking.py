@@ -0,0 +1,118 @@
+"""
+[Chunking Validation]
+V2 segment solver with fixed 20 m chunks, adaptive chunks, and adaptive chunks plus
+the equilibrium shortcut (set_chunking), all checked against the RK45 reference in
+scripts/ode_validator.py (requires scipy).
+
+The engine runs in a constant-power configuration (linear tuning, beta_aero=0) so that
+it integrates the same ODE as the validator:
+  1. Kernel cases: single segments with hard transitions
+  2. Course: every segment of each GPX at a fixed power, entry speeds chained by each
+     model itself; total chunk count and finish-time error vs the ODE chain
+
+    python scripts/validate_chunking.py [--max-dke 0.1] [--min-dv 0.3] [--equilibrium-tol 0.1] [--power 200] [data/gpx/*.gpx]
+"""
+import argparse
+import glob
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.ode_validator import PyfunValidator
+from src.core.gpx_loader import GpxLoader, Segment
+from src.core.rider import Rider
+from src.engines.course import CHUNK_MAX_DKE, CHUNK_MIN_DV, EQUILIBRIUM_TOL
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+RIDER_KG = 81.0
+PARAMS = PhysicsParams(bike_weight=10.0, cda=0.314, crr=0.003, drivetrain_loss=0.03)
+F_LIMIT = 9999.0
+
+# (name, v_in [km/h], length [m], grade [%], power [W])
+CASES = [
+    ("Flat accel", 30.0, 1000.0, 0.0, 200.0),
+    ("Flat steady", 36.0, 200.0, 0.0, 200.0),
+    ("Uphill grind", 10.0, 500.0, 10.0, 300.0),
+    ("Ramp after descent", 60.0, 200.0, 10.0, 300.0),
+    ("Descent (no brake)", 40.0, 1000.0, -3.0, 100.0),
+    ("Descent (brake)", 60.0, 1000.0, -10.0, 0.0),
+    ("Standing start", 0.36, 200.0, 2.0, 250.0),
+]
+
+def _engine(max_dke: float, equilibrium_tol: float = 0.0, min_dv: float = CHUNK_MIN_DV) -> PhysicsEngineV2:
+    engine = PhysicsEngineV2(Rider(weight=RIDER_KG, cp=300, w_prime_max=20000), PARAMS)
+    engine.set_tuning(mode='linear')
+    engine.beta_aero = 0.0     # aero_factor = 1: power = p_base on every chunk
+    engine.set_chunking(max_dke, equilibrium_tol, min_dv)
+    engine.enable_instrumentation()
+    return engine
+
+def _solve(engine: PhysicsEngineV2, seg: Segment, power: float, v_in: float):
+    chunks_before = engine.stats.chunks
+    v_out, t, _, _ = engine._solve_segment_physics(seg, power, v_in, 0.0, F_LIMIT, max_power_limit=1e9)
+    return v_out, t, engine.stats.chunks - chunks_before
+
+def _segment(length: float, grade: float) -> Segment:
+    return Segment(index=0, start_dist=0.0, end_dist=length, length=length, grade=grade,
+                   start_ele=0.0, end_ele=length * grade, heading=0.0)
+
+def _engines(max_dke: float, equilibrium_tol: float, min_dv: float):
+    return _engine(0.0), _engine(max_dke, 0.0, min_dv), _engine(max_dke, equilibrium_tol, min_dv)
+
+def kernel_cases(max_dke: float, equilibrium_tol: float, min_dv: float, validator: PyfunValidator):
+    engines = _engines(max_dke, equilibrium_tol, min_dv)
+    fixed = engines[0]
+    print(f"{'Case':<20} | {'fixed: chunks  dv[km/h]  dt[s]':<32} | {'adaptive':<32} | {'+ equilibrium shortcut':<32}")
+    print("-" * 126)
+    for name, v_kmh, length, grade_pct, power in CASES:
+        seg = _segment(length, grade_pct / 100.0)
+        p = 0.0 if fixed._is_coasting(seg.grade) else power
+        v_ref, t_ref = validator.get_exact_final_speed(v_kmh / 3.6, length, seg.grade, p, f_limit=F_LIMIT)
+        cols = []
+        for engine in engines:
+            v, t, n = _solve(engine, seg, power, v_kmh / 3.6)
+            cols.append(f"{n:>6} {(v - v_ref) * 3.6:>+10.3f} {t - t_ref:>+8.3f}")
+        print(f"{name:<20} | " + " | ".join(f"{c:<32}" for c in cols))
+
+def course(path: str, max_dke: float, equilibrium_tol: float, min_dv: float, power: float, validator: PyfunValidator):
+    loader = GpxLoader(path)
+    loader.load()
+    segments = loader.compress_segments(grade_threshold=0.005, max_length=200.0)
+
+    t_ref, v_ref = 0.0, 0.1
+    for seg in segments:
+        p = 0.0 if seg.grade < -0.05 else power
+        v_ref, dt = validator.get_exact_final_speed(v_ref, seg.length, seg.grade, p, f_limit=F_LIMIT)
+        t_ref += dt
+
+    out = []
+    for engine in _engines(max_dke, equilibrium_tol, min_dv):
+        t, v, n = 0.0, 0.1, 0
+        for seg in segments:
+            v, dt, k = _solve(engine, seg, power, v)
+            t += dt
+            n += k
+        out.append((n, t - t_ref))
+    (n_fix, e_fix), (n_ad, e_ad), (n_eq, e_eq) = out
+    print(f"{os.path.basename(path):<32} {len(segments):>6} seg | chunks {n_fix:>6} -> {n_ad:>6} -> {n_eq:>6} "
+          f"| time err {e_fix:>+7.1f}s -> {e_ad:>+7.1f}s -> {e_eq:>+7.1f}s (ODE {t_ref:.0f}s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate adaptive chunking against the ODE reference")
+    parser.add_argument("gpx", nargs="*", default=sorted(glob.glob("data/gpx/*.gpx")))
+    parser.add_argument("--max-dke", type=float, default=CHUNK_MAX_DKE, help="Adaptive chunk bound: kinetic energy change / entry kinetic energy")
+    parser.add_argument("--min-dv", type=float, default=CHUNK_MIN_DV, help="Adaptive chunk floor: speed change always allowed per chunk [m/s]")
+    parser.add_argument("--equilibrium-tol", type=float, default=EQUILIBRIUM_TOL, help="Equilibrium shortcut window: |v - v_eq| / v")
+    parser.add_argument("--power", type=float, default=200.0, help="Constant power for the course runs [W]")
+    args = parser.parse_args()
+
+    validator = PyfunValidator(RIDER_KG, PARAMS.bike_weight, PARAMS.cda, PARAMS.crr, PARAMS.drivetrain_loss)
+    print(f"=== Kernel cases (max_dke={args.max_dke}, min_dv={args.min_dv}, equilibrium_tol={args.equilibrium_tol}) ===")
+    kernel_cases(args.max_dke, args.equilibrium_tol, args.min_dv, validator)
+    print(f"\n=== Courses @ {args.power:.0f} W ===")
+    for path in args.gpx:
+        course(path, args.max_dke, args.equilibrium_tol, args.min_dv, args.power, validator)
+
+if __name__ == "__main__":
+    main()
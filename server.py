@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
+from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
 import math
-import json
 import os
 import logging
 import hashlib
@@ -11,16 +15,58 @@ import hashlib
 # Import internal modules
 from src.core.gpx_loader import GpxLoader, TrackPoint, Segment
 from src.services.valhalla import ValhallaClient
-from src.core.rider import Rider
 from src.core.storage import get_storage
-# Upgrade to PhysicsEngineV2
-from src.engines.v2 import PhysicsEngineV2 as PhysicsEngine, PhysicsParams
+from src.core.atmosphere import assign_air_density
+from src.services.weather import WeatherClient
+from src.services.weather_field import WeatherField
+from src.config.simulation import SolverConfig
+from src.engines.registry import available_engines, get_engine_class, DEFAULT_ENGINE
+from src.services.metrics import get_metrics
+from src.core.profiling import SamplingProfiler
+from src.services.json_response import FastJSONResponse, dumps
+from src.services.transport import unpack_array
+from src.services.course_cache import get_course_segments, CourseNotFound
+from src.services import batch
+from src.services.batch import BatchJob, cancel_batch, make_engine, result_payload, submit_batch
+from src.engines.cancellation import CancelToken
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Upper bound on riders per /api/simulate_batch request
+BATCH_MAX_RIDERS = int(os.environ.get("SIM_BATCH_MAX_RIDERS", "200"))
+
+# Solver time budget per request [s] (0 = unlimited); requests may ask for less via timeout_sec.
+# On expiry the engine returns its best feasible result so far, flagged "interrupted": "deadline"
+# (504 if it had not found a feasible one yet).
+REQUEST_TIMEOUT_SEC = float(os.environ.get("SIM_REQUEST_TIMEOUT_SEC", "60"))
+# Default search precision for requests that do not set one (0 = full precision, 15 iterations)
+TIME_TOLERANCE_SEC = float(os.environ.get("SIM_TIME_TOLERANCE_SEC", "0"))
+POWER_TOLERANCE_W = float(os.environ.get("SIM_POWER_TOLERANCE_W", "0"))
+# How often a running /api/simulate checks whether its client is still connected [s]
+DISCONNECT_POLL_SEC = 0.25
+
+# Keep-alive comment interval on /api/simulate/stream while the solver is between probes [s]
+SSE_PING_SEC = float(os.environ.get("SIM_SSE_PING_SEC", "15"))
+
+# Per-request profiling (?profile=1 or "X-Profile: 1") is only honoured when enabled here
+PROFILING_ENABLED = os.environ.get("SIM_PROFILING", "0") == "1"
+PROFILE_TOP_N = int(os.environ.get("SIM_PROFILE_TOP", "20"))
+
+# One weather client for the whole process: its hourly cache and pooled connection
+# are shared by every request (set WEATHER_CACHE_DIR to also keep them across restarts)
+WEATHER = WeatherClient()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the batch pool's forkserver now, not from a request thread
+    batch.get_pool()
+    yield
+    batch.shutdown_pool(wait=False)
+    WEATHER.close()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -49,32 +95,72 @@ class RiderInput(BaseModel):
     w_prime: float = 20000.0 
     pdc: Dict[str, float] = {}
 
-class SimulationRequest(BaseModel):
-    points: List[PointInput]
-    segments: List[SegmentInput]
+class PackedPoints(BaseModel):
+    # Columns as base64 little-endian arrays (see src/services/transport.py)
+    lat: str
+    lon: str
+    ele: str
+    dist: str # Distance from start [m]
+    dtype: str = "float32"
+
+class CourseRequest(BaseModel):
+    # Course source, one of: points (legacy, one object per point) / points_packed / course_id
+    points: List[PointInput] = []
+    points_packed: Optional[PackedPoints] = None
+    course_id: Optional[str] = None # "course_<sha256>" from /api/upload_gpx
+    segments: List[SegmentInput] = []
+    start_time: Optional[datetime] = None # Ride start (UTC). Enables time-varying weather along the course.
+    engine: Optional[str] = None # Engine name from the registry (default: $SIM_ENGINE or "v2")
+    instrument: Optional[bool] = None # Hot-path counters in the response (default: $SIM_INSTRUMENT)
+    resolution: Optional[float] = None # Track decimation: Douglas-Peucker tolerance on elevation [m]. None/0 = every segment
+    track_format: str = "rows" # "rows" (list of dicts, legacy) or "columnar" (dict of arrays)
+    timeout_sec: Optional[float] = None # Solver budget [s], at most $SIM_REQUEST_TIMEOUT_SEC
+    # Search precision (V2 family): stop once the finish time is known within time_tolerance_sec,
+    # or the p_base bracket is below power_tolerance_w. None = $SIM_TIME_TOLERANCE_SEC / $SIM_POWER_TOLERANCE_W
+    time_tolerance_sec: Optional[float] = None
+    power_tolerance_w: Optional[float] = None
+
+class SimulationRequest(CourseRequest):
     rider: RiderInput
 
+class BatchRiderInput(RiderInput):
+    id: Optional[str] = None # Caller's label (e.g. club member id), echoed back in the result line
+    engine: Optional[str] = None # Per-rider override of the request engine
+
+class BatchSimulationRequest(CourseRequest):
+    riders: List[BatchRiderInput]
+    include_track: bool = False # Per-rider track_data (large); summaries only by default
+
 # --- API Endpoints ---
 
 @app.get("/")
 def read_root():
-    return {"status": "Bike Course Simulator API (Engine V2) is running"}
+    return {"status": f"Bike Course Simulator API (Engine {DEFAULT_ENGINE}) is running"}
+
+@app.get("/api/engines")
+def list_engines():
+    return {"default": DEFAULT_ENGINE, "engines": available_engines()}
 
-@app.post("/api/upload_gpx")
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return get_metrics().render()
+
+@app.post("/api/upload_gpx", response_class=FastJSONResponse)
 async def upload_gpx(file: UploadFile = File(...)):
     try:
         content = await file.read()
         
         # [Caching Strategy] Hash-based Deduplication
         file_hash = hashlib.sha256(content).hexdigest()
-        storage_filename = f"course_{file_hash}.json"
+        course_id = f"course_{file_hash}"
+        storage_filename = f"{course_id}.json"
         
         storage = get_storage()
         
         # 1. Check Cache
         if storage.exists(storage_filename):
             logger.info(f"Cache Hit! Loading {storage_filename} from storage.")
-            return storage.load(storage_filename)
+            return FastJSONResponse({**storage.load(storage_filename), "course_id": course_id})
             
         logger.info(f"Cache Miss. Processing GPX via Valhalla...")
         gpx_str = content.decode("utf-8")
@@ -98,61 +184,258 @@ async def upload_gpx(file: UploadFile = File(...)):
         # 5. Save to Storage (Cache)
         storage.save(standard_course, storage_filename)
         
-        return standard_course
+        return FastJSONResponse({**standard_course, "course_id": course_id})
         
     except Exception as e:
         logger.error(f"Error processing GPX: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/simulate")
-def run_simulation(req: SimulationRequest):
-    if not req.points:
+def _load_course_points(req: SimulationRequest, loader: GpxLoader):
+    """Fill loader.points from the request's inline points (packed or legacy)."""
+    if req.points_packed is not None:
+        packed = req.points_packed
+        try:
+            cols = [unpack_array(c, packed.dtype) for c in (packed.lat, packed.lon, packed.ele, packed.dist)]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if len({len(c) for c in cols}) != 1:
+            raise HTTPException(status_code=400, detail="Packed point columns differ in length")
+        loader.load_from_arrays(*cols)
+    else:
+        loader.points = [
+            TrackPoint(lat=p.lat, lon=p.lon, ele=p.ele, distance_from_start=p.dist_m)
+            for p in req.points
+        ]
+
+def _prepare_course(req: CourseRequest):
+    """Physics segments (with air density) and the optional weather field for a request's course."""
+    # Physical segments: Valhalla's segmentation from the course cache, or compressed points
+    if req.course_id:
+        try:
+            physics_segments = get_course_segments(req.course_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except CourseNotFound:
+            raise HTTPException(status_code=404, detail=f"Unknown course: {req.course_id}")
+    else:
+        loader = GpxLoader("")
+        _load_course_points(req, loader)
+        if not loader.points:
+            raise HTTPException(status_code=400, detail="No GPX points provided")
+        physics_segments = loader.compress_segments(grade_threshold=0.005, max_length=200.0)
+
+    # Time-varying weather (only when a start time is given) & per-segment air density
+    weather_field = None
+    if req.start_time is not None:
+        weather_field = WeatherField.from_course(WEATHER, physics_segments, req.start_time)
+    assign_air_density(physics_segments, weather_field)
+    return physics_segments, weather_field
+
+def _timeout_sec(req: CourseRequest) -> Optional[float]:
+    limits = [t for t in (req.timeout_sec, REQUEST_TIMEOUT_SEC) if t and t > 0]
+    return min(limits) if limits else None
+
+def _solver_config(req: CourseRequest) -> SolverConfig:
+    return SolverConfig(
+        time_tolerance_sec=TIME_TOLERANCE_SEC if req.time_tolerance_sec is None else req.time_tolerance_sec,
+        power_tolerance_w=POWER_TOLERANCE_W if req.power_tolerance_w is None else req.power_tolerance_w,
+    )
+
+async def _cancel_on_disconnect(request: Request, token: CancelToken):
+    while not token.cancelled:
+        if await request.is_disconnected():
+            logger.info("Client disconnected, cancelling simulation")
+            token.cancel()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SEC)
+
+def _interrupted_detail(reason: str) -> str:
+    return f"Solver stopped ({reason}) before finding a feasible pacing"
+
+def _check_request(req):
+    if not req.points and req.points_packed is None and not req.course_id:
         raise HTTPException(status_code=400, detail="No GPX points provided")
+    if req.track_format not in ("rows", "columnar"):
+        raise HTTPException(status_code=400, detail=f"Unknown track_format: {req.track_format}")
 
-    # 1. Setup Rider & Physics
-    rider = Rider(weight=req.rider.weight_kg, cp=req.rider.cp, w_prime_max=req.rider.w_prime)
-    rider.pdc = {str(k): float(v) for k, v in req.rider.pdc.items()}
-    
-    physics_params = PhysicsParams(bike_weight=req.rider.bike_weight)
-    engine = PhysicsEngine(rider, physics_params)
-    
-    # [ENGINE V2 CONFIG] 
-    # Use Asymmetric Mode as it proved to be the most efficient in sensitivity tests.
-    # slow=0.6 (Climbing), fast=1.5 (Descending)
-    engine.set_tuning(mode='asymmetric', slow=0.6, fast=1.5)
-
-    # 2. Convert Points to Internal Format
-    loader = GpxLoader("")
-    loader.points = [
-        TrackPoint(lat=p.lat, lon=p.lon, ele=p.ele, distance_from_start=p.dist_m)
-        for p in req.points
-    ]
-    
-    # 3. Compress points into physical segments
-    physics_segments = loader.compress_segments(grade_threshold=0.005, max_length=200.0)
+@app.post("/api/simulate", response_class=FastJSONResponse)
+async def run_simulation(req: SimulationRequest, request: Request, profile: bool = False,
+                         x_profile: Optional[str] = Header(None)):
+    # The solver runs on a worker thread; meanwhile a client disconnect or the time budget cancels it
+    token = CancelToken(_timeout_sec(req))
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, token))
+    try:
+        return await run_in_threadpool(_simulate, req, profile, x_profile, token)
+    finally:
+        watcher.cancel()
+
+def _simulate(req: SimulationRequest, profile: bool, x_profile: Optional[str], token: CancelToken):
+    _check_request(req)
+
+    profiler = None
+    if profile or x_profile in ("1", "true", "yes"):
+        if not PROFILING_ENABLED:
+            raise HTTPException(status_code=403, detail="Profiling is disabled (set SIM_PROFILING=1)")
+        profiler = SamplingProfiler()
 
-    # 4. Run Optimal Pacing Solver (Binary Search with Adaptive V_ref)
-    logger.info(f"Starting V2 Optimal Pacing Simulation for rider {req.rider.cp}W CP")
-    result_obj = engine.find_optimal_pacing(physics_segments)
+    # 1. Setup Rider, Physics & Engine
+    engine_name = req.engine or DEFAULT_ENGINE
+    try:
+        engine = make_engine(engine_name, req.rider.model_dump(), req.instrument, cancel_token=token,
+                             solver=_solver_config(req))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if profiler is not None:
+        profiler.start()
+    try:
+        # 2. Course: segments, weather & air density
+        physics_segments, weather_field = _prepare_course(req)
+        if weather_field is not None and hasattr(engine, "set_weather_field"):
+            engine.set_weather_field(weather_field)
+
+        # 3. Run Optimal Pacing Solver (Binary Search with Adaptive V_ref)
+        logger.info(f"Starting {engine_name} Optimal Pacing Simulation for rider {req.rider.cp}W CP")
+        result_obj = engine.find_optimal_pacing(physics_segments)
+    finally:
+        if profiler is not None:
+            profiler.stop()
     
-    # 5. Prepare response data
-    result = {
-        "total_time_sec": result_obj.total_time_sec,
-        "avg_speed_kmh": result_obj.average_speed_kmh,
-        "avg_power": result_obj.average_power,
-        "normalized_power": result_obj.normalized_power,
-        "work_kj": result_obj.work_kj,
-        "w_prime_min": result_obj.w_prime_min,
-        "is_success": result_obj.is_success,
-        "fail_reason": result_obj.fail_reason,
-        "track_data": result_obj.track_data
-    }
+    if result_obj.interrupted and not result_obj.is_success:
+        # Stopped before any feasible probe: no pacing plan to return
+        raise HTTPException(status_code=504, detail=_interrupted_detail(result_obj.interrupted))
+
+    # 4. Prepare response data
+    result = result_payload(result_obj, req.resolution, req.track_format)
+    get_metrics().observe(engine_name, result.get("stats"))
+    if profiler is not None:
+        result["profile"] = profiler.summary(PROFILE_TOP_N)
     
     try:
-        with open("simulation_result.json", "w") as f:
-            json.dump(result, f, indent=2)
+        with open("simulation_result.json", "wb") as f:
+            f.write(dumps(result, indent=True))
         logger.info("Successfully updated simulation_result.json")
     except Exception as e:
         logger.error(f"Failed to write simulation_result.json: {e}")
 
-    return result
\ No newline at end of file
+    return FastJSONResponse(result)
+
+def _sse(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+@app.post("/api/simulate/stream")
+def run_simulation_stream(req: SimulationRequest, request: Request):
+    """
+    /api/simulate as Server-Sent Events:
+      event: progress  one per outer-search probe (SearchProgress fields; best_* is the current answer)
+      event: result    the /api/simulate body
+      event: error     {"detail": ...}
+    Closing the connection cancels the search at the next probe.
+    """
+    _check_request(req)
+    token = CancelToken(_timeout_sec(req))
+    engine_name = req.engine or DEFAULT_ENGINE
+    try:
+        engine = make_engine(engine_name, req.rider.model_dump(), req.instrument, cancel_token=token,
+                             solver=_solver_config(req))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    physics_segments, weather_field = _prepare_course(req)
+    if weather_field is not None and hasattr(engine, "set_weather_field"):
+        engine.set_weather_field(weather_field)
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def emit(event, data):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+        def solve():
+            try:
+                result_obj = engine.find_optimal_pacing(physics_segments)
+            except Exception as e:
+                logger.error(f"Streamed simulation failed: {e}")
+                emit("error", {"detail": str(e)})
+                return
+            if token.stop_reason == "cancelled":
+                logger.info("Streamed simulation cancelled by client")
+                return
+            if result_obj.interrupted and not result_obj.is_success:
+                emit("error", {"detail": _interrupted_detail(result_obj.interrupted)})
+                return
+            result = result_payload(result_obj, req.resolution, req.track_format)
+            get_metrics().observe(engine_name, result.get("stats"))
+            emit("result", result)
+
+        if hasattr(engine, "set_progress"):
+            engine.set_progress(lambda p: emit("progress", p._asdict()))
+        logger.info(f"Starting streamed {engine_name} simulation for rider {req.rider.cp}W CP")
+        loop.run_in_executor(None, solve)
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), timeout=SSE_PING_SEC)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield b": ping\n\n"
+                    continue
+                yield _sse(event, data)
+                if event != "progress" or await request.is_disconnected():
+                    return
+        finally:
+            token.cancel()
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/api/simulate_batch")
+def run_simulation_batch(req: BatchSimulationRequest, request: Request):
+    """
+    Simulate many riders on one course. The course is prepared once and the riders
+    are fanned out over the shared process pool; the response is NDJSON, one line per
+    rider in completion order ({"index", "id", "engine", ...simulate result} or {..., "error"}).
+    Closing the connection cancels the riders that have not started.
+    """
+    _check_request(req)
+    if not req.riders:
+        raise HTTPException(status_code=400, detail="No riders provided")
+    if len(req.riders) > BATCH_MAX_RIDERS:
+        raise HTTPException(status_code=400, detail=f"Too many riders ({len(req.riders)} > {BATCH_MAX_RIDERS})")
+
+    jobs = []
+    for i, r in enumerate(req.riders):
+        engine_name = r.engine or req.engine or DEFAULT_ENGINE
+        try:
+            get_engine_class(engine_name)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rider = r.model_dump(exclude={"id", "engine"})
+        jobs.append(BatchJob(index=i, rider=rider, engine=engine_name, job_id=r.id, instrument=req.instrument,
+                             timeout_sec=_timeout_sec(req), solver=_solver_config(req)))
+
+    physics_segments, weather_field = _prepare_course(req)
+    logger.info(f"Starting batch simulation: {len(jobs)} riders, {len(physics_segments)} segments")
+
+    futures = submit_batch(physics_segments, jobs, weather_field, req.resolution, req.track_format, req.include_track)
+
+    async def stream():
+        pending = {asyncio.wrap_future(f) for f in futures}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=DISCONNECT_POLL_SEC,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    item = fut.result()
+                    if "error" not in item:
+                        get_metrics().observe(item["engine"], item.get("stats"))
+                    yield dumps(item) + b"\n"
+                if pending and await request.is_disconnected():
+                    logger.info(f"Client disconnected, cancelling {len(pending)} batch jobs")
+                    return
+        finally:
+            cancel_batch(futures)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
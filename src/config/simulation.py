@@ -22,7 +22,10 @@ class SolverConfig:
     v_ref_fixed_kmh: float = 30.0
     brake_start_kmh: float = 50.0   # 제동 시작 속도
     brake_limit_kmh: float = 80.0   # 최대 마지노선 속도
-    binary_search_iterations: int = 15
+    # 외부 탐색(p_base 이분 탐색) 종료 조건: 아래 중 하나라도 만족하면 종료 (0 = 해당 조건 사용 안 함)
+    max_iterations: int = 15           # 상한 (기존 binary_search_iterations)
+    time_tolerance_sec: float = 0.0    # 남은 탐색 구간 안에서 완주 시간이 바뀔 수 있는 폭 < X초
+    power_tolerance_w: float = 0.0     # p_base 탐색 구간 폭 < Y W
 
 @dataclass
 class SimulationConfig:
@@ -38,7 +41,10 @@ class SimulationConfig:
                 data = json.load(f)
             
             p_data = data.get('physics', {})
-            s_data = data.get('solver', {})
+            s_data = dict(data.get('solver', {}))
+            # 구버전 설정 호환
+            if 'binary_search_iterations' in s_data:
+                s_data.setdefault('max_iterations', s_data.pop('binary_search_iterations'))
             
             return cls(
                 physics=PhysicalConfig(**p_data),
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+
+from src.core.gpx_loader import Segment
+
+# Physical constants
+R_DRY_AIR = 287.05          # Specific gas constant of dry air [J/(kg K)]
+SEA_LEVEL_PRESSURE = 1013.25  # ISA [hPa]
+SEA_LEVEL_TEMP_C = 15.0     # ISA [C]
+LAPSE_RATE = 0.0065         # ISA troposphere [K/m]
+BAROMETRIC_EXPONENT = 5.2559  # g / (R * L)
+
+def air_density(elevation_m, temperature_c=None, pressure_hpa=None):
+    """
+    Air density [kg/m^3] from the ideal gas law: rho = p / (R * T).
+
+    - pressure_hpa: station (surface) pressure at this elevation. If omitted,
+      the ISA barometric formula is used: p = p0 * (1 - L*h/T0)^5.2559
+    - temperature_c: air temperature at this elevation. If omitted, the ISA
+      profile T = 15C - 6.5 K/km is used.
+
+    Works on scalars and NumPy arrays alike.
+    At sea level with ISA defaults this returns 1.225.
+    """
+    h = np.asarray(elevation_m, dtype=float)
+    if temperature_c is None:
+        temp_k = (SEA_LEVEL_TEMP_C + 273.15) - LAPSE_RATE * h
+    else:
+        temp_k = np.asarray(temperature_c, dtype=float) + 273.15
+    if pressure_hpa is None:
+        t0 = SEA_LEVEL_TEMP_C + 273.15
+        p_hpa = SEA_LEVEL_PRESSURE * (1.0 - LAPSE_RATE * h / t0) ** BAROMETRIC_EXPONENT
+    else:
+        p_hpa = np.asarray(pressure_hpa, dtype=float)
+    rho = (p_hpa * 100.0) / (R_DRY_AIR * temp_k)
+    return float(rho) if np.ndim(rho) == 0 else rho
+
+def lapse_to_elevation(temperature_c, pressure_hpa, from_ele, to_ele):
+    """
+    Move a surface (temperature, pressure) reading from `from_ele` to `to_ele` [m]
+    through the ISA lapse rate: T' = T - L*dh, p' = p * (T'/T)^5.2559.
+    Works on scalars and NumPy arrays alike. Returns (temperature_c, pressure_hpa).
+    """
+    temp_k = np.asarray(temperature_c, dtype=float) + 273.15
+    dh = np.asarray(to_ele, dtype=float) - np.asarray(from_ele, dtype=float)
+    new_k = temp_k - LAPSE_RATE * dh
+    return new_k - 273.15, np.asarray(pressure_hpa, dtype=float) * (new_k / temp_k) ** BAROMETRIC_EXPONENT
+
+def weather_air_density(segments: List[Segment], weather_field, arrival_sec) -> np.ndarray:
+    """
+    Air density of each segment from a WeatherField: surface temperature/pressure
+    at the segment's arrival time (`arrival_sec`, elapsed seconds at the segment
+    midpoint), lapsed from the weather samples' elevation to the segment mid
+    elevation, so a climb between two samples (10 km apart) still thins the air.
+    """
+    mid_ele = np.array([(s.start_ele + s.end_ele) * 0.5 for s in segments])
+    mid_dist = np.array([(s.start_dist + s.end_dist) * 0.5 for s in segments])
+    w = weather_field.sample(mid_dist, arrival_sec)
+    temp_c, p_hpa = w["temperature"], w["pressure"]
+    ref_ele = weather_field.reference_elevation(mid_dist)
+    if ref_ele is not None:
+        temp_c, p_hpa = lapse_to_elevation(temp_c, p_hpa, ref_ele, mid_ele)
+    return np.atleast_1d(air_density(mid_ele, temp_c, p_hpa))
+
+def assign_air_density(segments: List[Segment], weather_field=None, temperature_c: Optional[float] = None,
+                       v_est_kmh: float = 25.0, arrival_sec=None) -> List[Segment]:
+    """
+    [Course Preparation] Store the air density of each segment in `seg.air_density`.
+
+    Computed once per course (vectorized), so the engine only reads a number per
+    segment instead of doing any atmosphere math in the hot loop.
+
+    - With a WeatherField: weather_air_density at `arrival_sec`, or, before any
+      simulation has predicted those, at distance / `v_est_kmh`. Engines that take
+      the field themselves (V2) re-evaluate it at each probe's own arrival times,
+      together with the wind, so this value is only their starting estimate.
+    - Otherwise: ISA pressure from the segment mid elevation, and either the
+      given sea-level-equivalent `temperature_c` lapsed to altitude, or ISA temperature.
+    """
+    if not segments:
+        return segments
+
+    if weather_field is not None:
+        if arrival_sec is None:
+            arrival_sec = np.array([(s.start_dist + s.end_dist) * 0.5 for s in segments]) / (v_est_kmh / 3.6)
+        rho = weather_air_density(segments, weather_field, arrival_sec)
+    else:
+        mid_ele = np.array([(s.start_ele + s.end_ele) * 0.5 for s in segments])
+        if temperature_c is not None:
+            rho = air_density(mid_ele, temperature_c - LAPSE_RATE * mid_ele)
+        else:
+            rho = air_density(mid_ele)
+
+    for seg, value in zip(segments, np.atleast_1d(rho).tolist()):
+        seg.air_density = value
+    return segments
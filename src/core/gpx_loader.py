@@ -26,6 +26,7 @@ class Segment:
     start_ele: float
     end_ele: float
     crr: float = 0.0045
+    air_density: float = 0.0 # [kg/m^3] set during course preparation; 0 = use PhysicsParams.air_density
     lat: float = 0.0
     lon: float = 0.0
     start_lat: float = 0.0
@@ -110,6 +111,14 @@ class GpxLoader:
             )
             self.segments.append(seg)
 
+    def load_from_arrays(self, lats, lons, eles, dists):
+        """Load track points from parallel columns (lat, lon, ele, distance from start [m])."""
+        cols = [c.tolist() if hasattr(c, "tolist") else list(c) for c in (lats, lons, eles, dists)]
+        self.points = [
+            TrackPoint(lat=lat, lon=lon, ele=ele, distance_from_start=dist)
+            for lat, lon, ele, dist in zip(*cols)
+        ]
+
     def load_from_json_data(self, data: List[dict]):
         """Load segments directly from a list of dictionaries (Simulation Result format)."""
         self.segments = []
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional, Union
+
+import numpy as np
+
+# Riegel fatigue exponent used beyond the longest PDC duration (0.05 ~ 0.08 for trained cyclists)
+DEFAULT_RIEGEL_EXPONENT = -0.07
+
+class PowerDurationCurve:
+    """
+    [Indexed Power Duration Curve]
+    Immutable, built once per rider from a {seconds: watts} mapping.
+
+    - Durations/powers are kept as sorted read-only NumPy arrays (plus their logs),
+      so a lookup is one `searchsorted` instead of a sort + linear scan.
+    - Inside the data range: log-log interpolation, P = P1 * (T / T1) ^ k with
+      k = ln(P2/P1) / ln(T2/T1), i.e. a piecewise power law (the natural shape of a PDC).
+    - Shorter than the first point: clamped to the first power.
+    - Longer than the last point: Riegel extrapolation P = P_last * (T / T_last) ^ riegel_exponent.
+      An exponent of 0 means "hold the last power".
+    - `evaluate` takes any array of durations and returns an array of powers.
+    """
+
+    __slots__ = ("durations", "powers", "_log_t", "_log_p", "riegel_exponent")
+
+    def __init__(self, points: Optional[Mapping[Union[int, str], float]] = None,
+                 riegel_exponent: float = DEFAULT_RIEGEL_EXPONENT):
+        items = sorted((int(k), float(v)) for k, v in (points or {}).items())
+        # log-log needs strictly positive durations and powers
+        items = [(t, p) for t, p in items if t > 0 and p > 0]
+
+        durations = np.array([t for t, _ in items], dtype=float)
+        powers = np.array([p for _, p in items], dtype=float)
+        log_t = np.log(durations)
+        log_p = np.log(powers)
+        for arr in (durations, powers, log_t, log_p):
+            arr.setflags(write=False)
+
+        object.__setattr__(self, "durations", durations)
+        object.__setattr__(self, "powers", powers)
+        object.__setattr__(self, "_log_t", log_t)
+        object.__setattr__(self, "_log_p", log_p)
+        object.__setattr__(self, "riegel_exponent", float(riegel_exponent))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PowerDurationCurve is immutable")
+
+    def __reduce__(self):
+        return (PowerDurationCurve, (self.as_dict(), self.riegel_exponent))
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def __bool__(self) -> bool:
+        return len(self.durations) > 0
+
+    def __repr__(self) -> str:
+        return f"PowerDurationCurve({self.as_dict()!r})"
+
+    def as_dict(self) -> Dict[int, float]:
+        return {int(t): float(p) for t, p in zip(self.durations, self.powers)}
+
+    def evaluate(self, durations, riegel_exponent: Optional[float] = None) -> np.ndarray:
+        """Max sustainable power [W] for each duration [s] (array in, array out)."""
+        if not self:
+            raise ValueError("Empty power duration curve")
+        k_tail = self.riegel_exponent if riegel_exponent is None else riegel_exponent
+        t = np.maximum(np.asarray(durations, dtype=float), self.durations[0])
+        log_t = np.log(t)
+
+        n = len(self.durations)
+        if n == 1:
+            return self.powers[0] * np.exp(k_tail * (log_t - self._log_t[0]))
+
+        # Segment index i so that durations[i] <= t <= durations[i + 1]
+        i = np.clip(np.searchsorted(self.durations, t, side="right") - 1, 0, n - 2)
+        t1, t2 = self._log_t[i], self._log_t[i + 1]
+        p1, p2 = self._log_p[i], self._log_p[i + 1]
+        log_p = p1 + (p2 - p1) * (log_t - t1) / (t2 - t1)
+
+        beyond = t > self.durations[-1]
+        if np.any(beyond):
+            log_p = np.where(beyond, self._log_p[-1] + k_tail * (log_t - self._log_t[-1]), log_p)
+        return np.exp(log_p)
+
+    def power(self, duration_sec: float, riegel_exponent: Optional[float] = None) -> float:
+        """Scalar version of `evaluate`."""
+        return float(self.evaluate(duration_sec, riegel_exponent))
+
+    def step_power(self, duration_sec: float) -> float:
+        """Power of the first tabulated duration >= duration_sec (the last one if longer)."""
+        if not self:
+            raise ValueError("Empty power duration curve")
+        i = int(np.searchsorted(self.durations, duration_sec, side="left"))
+        return float(self.powers[min(i, len(self.powers) - 1)])
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Modules kept in the stacks by default: physics engines and the course loader
+DEFAULT_SCOPE = ("src.engines", "src.core.gpx_loader", "src.core.rider", "src.core.pdc", "src.core.wprime")
+
+class Hotspot(NamedTuple):
+    frame: str              # "module:function:line"
+    self_samples: int       # Samples with this frame on top of the (scoped) stack
+    total_samples: int      # Samples with this frame anywhere in the stack
+    self_pct: float
+    total_pct: float
+
+class SamplingProfiler:
+    """
+    [Sampling Profiler]
+    A background thread snapshots the target thread's stack every `interval` seconds
+    (sys._current_frames), keeping only frames whose module starts with one of `scope`.
+    No tracing hooks are installed, so the profiled code runs at full speed apart from
+    the GIL hand-offs to the sampler.
+
+    Output:
+      - collapsed(): "a;b;c <count>" lines (Brendan Gregg's folded format, readable by
+        flamegraph.pl / speedscope / inferno)
+      - top(n): hotspots by self samples
+    """
+
+    def __init__(self, interval: float = 0.002, scope: Optional[Sequence[str]] = DEFAULT_SCOPE,
+                 thread_id: Optional[int] = None):
+        self.interval = interval
+        self.scope = tuple(scope) if scope else None
+        self.thread_id = thread_id
+        self.stacks: Counter = Counter()
+        self.samples = 0            # All samples taken (including ones with no scoped frame)
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._t0 = 0.0
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.duration = time.perf_counter() - self._t0
+
+    def _in_scope(self, module: str) -> bool:
+        return self.scope is None or module.startswith(self.scope)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            stack = []
+            while frame is not None:
+                module = frame.f_globals.get("__name__", "?")
+                if self._in_scope(module):
+                    code = frame.f_code
+                    stack.append(f"{module}:{code.co_name}:{code.co_firstlineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write_collapsed(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+
+    def top(self, n: int = 20) -> List[Hotspot]:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for f in set(frames):
+                total_counts[f] += count
+        denom = max(1, self.samples)
+        return [Hotspot(f, c, total_counts[f], 100.0 * c / denom, 100.0 * total_counts[f] / denom)
+                for f, c in self_counts.most_common(n)]
+
+    def summary(self, n: int = 20) -> Dict:
+        """JSON-friendly report: hotspots plus the collapsed stacks."""
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "duration_sec": self.duration,
+            "samples": self.samples,
+            "hotspots": [h._asdict() for h in self.top(n)],
+            "collapsed": self.collapsed(),
+        }
+
+def format_hotspots(hotspots: List[Hotspot]) -> str:
+    lines = [f"{'self%':>6} {'total%':>7} {'samples':>8}  frame"]
+    for h in hotspots:
+        lines.append(f"{h.self_pct:6.1f} {h.total_pct:7.1f} {h.self_samples:8d}  {h.frame}")
+    return "\n".join(lines)
@@ -2,7 +2,21 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.core.pdc import PowerDurationCurve
+from src.core.wprime import SKIBA_2012, WPrimeTrace, w_prime_balance
+
+class RiderState(NamedTuple):
+    """
+    Physiological state of one simulation run.
+    Immutable and owned by the run, so a single Rider can drive many
+    simulations at once (threads, batched candidates) without sharing state.
+    """
+    w_prime_bal: float      # Remaining anaerobic capacity (Joules), < 0 means bonk
+
+    def is_bonked(self) -> bool:
+        return self.w_prime_bal < 0
 
 @dataclass
 class Rider:
@@ -17,46 +31,82 @@ class Rider:
     
     # State variables for simulation
     w_prime_bal: float = 0.0
+
+    # (source dict, curve) behind pdc_curve
+    _pdc_cache: Optional[Tuple[Dict[int, float], PowerDurationCurve]] = field(init=False, repr=False, compare=False, default=None)
     
     def __post_init__(self):
         """Initialize simulation state."""
-        # Normalize PDC keys to int
-        if self.pdc:
-            self.pdc = {int(k): float(v) for k, v in self.pdc.items()}
+        # Normalize PDC keys to int (JSON configs carry string keys)
+        self.pdc = {int(k): float(v) for k, v in (self.pdc or {}).items()}
         self.reset_state()
 
+    @property
+    def pdc_curve(self) -> PowerDurationCurve:
+        """
+        Indexed view of `pdc`, rebuilt on first use after `pdc` is reassigned or
+        edited in place (the curve remembers the contents it was built from).
+        """
+        cache = self._pdc_cache
+        if cache is None or cache[0] != self.pdc:
+            source = dict(self.pdc or {})
+            cache = (source, PowerDurationCurve({int(k): float(v) for k, v in source.items()}))
+            self._pdc_cache = cache
+        return cache[1]
+
     def reset_state(self):
         """Reset W' balance to maximum."""
         self.w_prime_bal = self.w_prime_max
 
-    def update_w_prime(self, power: float, duration_sec: float):
+    def initial_state(self) -> RiderState:
+        """Fresh state for a new simulation run (full W')."""
+        return RiderState(self.w_prime_max)
+
+    def next_state(self, state: RiderState, power: float, duration_sec: float) -> RiderState:
         """
-        Update W' balance using the Skiba model.
+        W' balance after holding 'power' for 'duration_sec', using the Skiba model.
+        Pure function of (rider, state): nothing on the Rider is modified.
         
         If Power > CP: Depletion is linear.
         If Power < CP: Recovery is exponential.
         """
+        w_prime_bal = state.w_prime_bal
         delta_p = power - self.cp
         
         if delta_p > 0:
             # Depletion
-            self.w_prime_bal -= delta_p * duration_sec
+            w_prime_bal -= delta_p * duration_sec
         else:
             # Recovery
             # Tau (time constant) estimation - Skiba (2012)
             # D_cp = CP - P_recovery
-            d_cp = abs(delta_p)
+            d_cp = -delta_p
             if d_cp > 0:
                 tau = 546 * math.exp(-0.01 * d_cp) + 316
                 # Exponential recovery formula
-                w_exp = self.w_prime_max - self.w_prime_bal
-                self.w_prime_bal = self.w_prime_max - w_exp * math.exp(-duration_sec / tau)
+                w_exp = self.w_prime_max - w_prime_bal
+                w_prime_bal = self.w_prime_max - w_exp * math.exp(-duration_sec / tau)
             else:
                 # No recovery if Power == CP
-                pass
+                return state
         
         # Clamp balance between 0 and Max
-        # self.w_prime_bal = max(0.0, min(self.w_prime_bal, self.w_prime_max))
+        # w_prime_bal = max(0.0, min(w_prime_bal, self.w_prime_max))
+        return RiderState(w_prime_bal)
+
+    def update_w_prime(self, power: float, duration_sec: float):
+        """
+        In-place variant of `next_state` on `self.w_prime_bal`
+        (kept for step-by-step callers such as the CLI track export).
+        """
+        self.w_prime_bal = self.next_state(RiderState(self.w_prime_bal), power, duration_sec).w_prime_bal
+
+    def w_prime_trace(self, powers, durations, model: str = SKIBA_2012) -> WPrimeTrace:
+        """
+        W' balance over a whole (power, duration) series in one vectorized pass,
+        starting from full W'. Does not touch `w_prime_bal`.
+        """
+        return w_prime_balance(powers, durations, self.cp, self.w_prime_max, model=model)
 
     def is_bonked(self) -> bool:
         """Check if anaerobic battery is exhausted."""
@@ -66,51 +116,23 @@ class Rider:
         """
         Validate if the rider can sustain 'power' for 'duration_sec' based on PDC.
         """
-        if not self.pdc:
+        if not self.pdc_curve:
             return True # No PDC data, assume okay
             
-        # Find the closest duration in PDC
-        sorted_keys = sorted(self.pdc.keys())
-        
-        # Simple lookup: find first key >= duration
-        limit_power = 0.0
-        for k in sorted_keys:
-            if k >= duration_sec:
-                limit_power = self.pdc[k]
-                break
-        else:
-            # If duration is longer than max PDC key, use the longest one
-            limit_power = self.pdc[sorted_keys[-1]]
+        # Power of the first PDC duration >= duration (the longest one if beyond)
+        limit_power = self.pdc_curve.step_power(duration_sec)
             
         return power <= (limit_power + 5) # 5W margin
 
     def get_pdc_power(self, duration_sec: float) -> float:
         """
         Returns the maximum sustainable power for a given duration using 
-        linear interpolation of the PDC data.
+        log-log interpolation of the PDC data (held flat beyond the longest duration).
         """
-        if not self.pdc:
+        if not self.pdc_curve:
             return self.cp * 1.2 # Fallback
             
-        # Convert keys to int and sort
-        sorted_pdc = sorted([(int(k), float(v)) for k, v in self.pdc.items()])
-        durations = [item[0] for item in sorted_pdc]
-        powers = [item[1] for item in sorted_pdc]
-        
-        # Boundary cases
-        if duration_sec <= durations[0]: return powers[0]
-        if duration_sec >= durations[-1]: return powers[-1]
-        
-        # Linear Interpolation
-        for i in range(len(durations) - 1):
-            if durations[i] <= duration_sec <= durations[i+1]:
-                t1, p1 = durations[i], powers[i]
-                t2, p2 = durations[i+1], powers[i+1]
-                # Log-linear interpolation is more accurate for PDC, 
-                # but linear is sufficient for this range.
-                return p1 + (p2 - p1) * (duration_sec - t1) / (t2 - t1)
-                
-        return self.cp
+        return self.pdc_curve.power(duration_sec, riegel_exponent=0.0)
 
     def get_max_force(self) -> float:
         """Estimate max leg force (Torque limit) based on weight."""
@@ -4,9 +4,16 @@ import math
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
-from src.core.rider import Rider
+from src.core.rider import Rider, RiderState
 from src.core.gpx_loader import Segment
-from src.weather_client import WeatherClient
+from src.services.weather import WeatherClient
+from src.engines.tables import get_tables
+from src.engines.course import CoursePreparation
+from src.engines.progress import ProgressReporting
+from src.engines.cancellation import Cancellable
+
+# Margin around [entry speed, coasting terminal speed] when bracketing a coasting chunk [m/s]
+COAST_BRACKET_MARGIN = 0.05
 
 @dataclass
 class PhysicsParams:
@@ -29,8 +36,9 @@ class SimulationResult:
     is_success: bool
     fail_reason: str = ""
     track_data: List[Dict[str, Any]] = None
+    interrupted: str = ""   # "cancelled" / "deadline": 탐색 조기 종료 (그때까지의 최선 결과)
 
-class PhysicsEngine:
+class PhysicsEngine(CoursePreparation, ProgressReporting, Cancellable):
     def __init__(self, rider: Rider, params: PhysicsParams, weather_client: Optional[WeatherClient] = None):
         self.rider = rider
         self.params = params
@@ -38,6 +46,11 @@ class PhysicsEngine:
         # 경사도에 따른 파워 가중치 (오르막에서는 더 쓰고, 내리막에서는 덜 쓰는 전략)
         self.alpha_climb = 2.5   # 오르막 가중치 (경사도 10%일 때 약 25% 더 씀)
         self.alpha_descent = 10.0 # 내리막 감산치 (경사도 -5%일 때 파워 50% 감소)
+        # 무동력 내리막 종단속도 테이블 (bisection bracket 용)
+        self.brake_table, self.speed_table = get_tables(
+            rider.weight + params.bike_weight, params.cda * (1 - params.drafting_factor),
+            params.crr, params.air_density
+        )
     
     def find_optimal_pacing(self, segments: List[Segment]) -> SimulationResult:
         """
@@ -60,8 +73,13 @@ class PhysicsEngine:
         high = 1500.0
         
         best_result: Optional[SimulationResult] = None
+        interrupted = ""
         
         for i in range(15):
+            # 취소 / 마감 시간 초과: 지금까지의 최선 결과로 종료
+            interrupted = self._stop_reason() or ""
+            if interrupted:
+                break
             mid = (low + high) / 2.0
             
             # 시뮬레이션 수행
@@ -76,20 +94,27 @@ class PhysicsEngine:
             # 시뮬레이션 시간에 해당하는 라이더의 생리학적 한계(PDC) 조회
             pdc_limit_watts = self._get_dynamic_pdc_limit(res.total_time_sec)
             
-            # 디버깅 출력
-            print(f"[Binary Search #{i+1}] P_base: {mid:.1f}W -> Time: {res.total_time_sec:.0f}s, NP: {simulated_intensity:.0f}W / Limit: {pdc_limit_watts:.0f}W", flush=True)
-            
             # 판단: Bonk가 났거나, NP가 한계보다 높으면 -> 파워를 줄여야 함
-            if not res.is_success or simulated_intensity > pdc_limit_watts:
+            feasible = res.is_success and simulated_intensity <= pdc_limit_watts
+            if not feasible:
                 high = mid
             else:
                 # 성공했고 NP가 한계보다 낮으면 -> 파워를 더 올려도 됨
                 # (성공한 케이스만 best_result로 저장)
                 best_result = res
                 low = mid
+            
+            # 진행 상황 보고 (디버그 로그 + set_progress 콜백)
+            self._report_progress(i + 1, mid, res, simulated_intensity, pdc_limit_watts, feasible, best_result, high - low)
         
-        # 탐색 실패 시(전 구간 Bonk 등), 마지막 시도 결과를 반환
-        return best_result if best_result else self.simulate_course(segments, low, low * 2.0)
+        if best_result is None and interrupted:
+            # 성공한 시도 없이 중단됨: 보고할 페이싱 결과가 없으므로 실패로 반환
+            result = SimulationResult(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, False, fail_reason=interrupted)
+        else:
+            # 탐색 실패 시(전 구간 Bonk 등), 마지막 시도 결과를 반환
+            result = best_result if best_result else self.simulate_course(segments, low, low * 2.0)
+        result.interrupted = interrupted
+        return result
 
     def _get_dynamic_pdc_limit(self, duration_sec: float) -> float:
         """
@@ -101,38 +126,32 @@ class PhysicsEngine:
         공식: P = P_ref * (T / T_ref) ^ -0.07
         
         1. duration_sec가 PDC 데이터 범위 내(예: 1초~2시간)라면?
-           -> 저장된 PDC 데이터를 선형 보간(Interpolation)하여 정확한 값을 줍니다.
+           -> 저장된 PDC 데이터를 로그-로그 보간(Interpolation)하여 정확한 값을 줍니다.
         2. duration_sec가 PDC 범위 밖(예: 5시간)이라면?
            -> 가지고 있는 데이터 중 가장 긴 시간(예: 2시간)의 파워를 기준점(Reference)으로 삼고,
               Riegel 지수(-0.07)를 적용하여 시간이 길어질수록 파워가 자연스럽게 떨어지도록 계산합니다.
            -> 1.2배 같은 매직 넘버는 일절 사용하지 않습니다. 순수 데이터 기반입니다.
         """
-        # 1. PDC 데이터 정렬
-        sorted_pdc = sorted([(int(k), v) for k, v in self.rider.pdc.items()])
-        if not sorted_pdc:
+        # 1. Rider 생성 시 한 번 정렬/색인된 PDC 곡선 사용
+        curve = self.rider.pdc_curve
+        if not curve:
             return self.rider.cp # 데이터 없으면 CP 리턴 (안전장치)
-            
-        max_pdc_time, max_pdc_watts = sorted_pdc[-1]
         
-        # 2. 범위 밖 (장거리) 처리: Riegel Model 적용
-        if duration_sec > max_pdc_time:
-            # 피로 계수 0.07은 사이클링 통계학적 표준값 (0.05 ~ 0.08 사이)
-            riegel_exponent = -0.07 
-            extrapolated_power = max_pdc_watts * (duration_sec / max_pdc_time) ** riegel_exponent
-            return extrapolated_power
-            
-        # 3. 범위 내 처리: 선형 보간 (Linear Interpolation)
-        #    더 정교한 로그 보간도 가능하지만, 촘촘한 PDC 데이터가 있다면 선형으로도 충분합니다.
-        return self.rider.get_pdc_power(duration_sec)
+        # 2. 범위 내: 로그-로그 보간 / 범위 밖 (장거리): Riegel Model 적용
+        #    피로 계수 0.07은 사이클링 통계학적 표준값 (0.05 ~ 0.08 사이)
+        return curve.power(duration_sec, riegel_exponent=-0.07)
 
-    def simulate_course(self, segments: List[Segment], p_base: float, max_power_limit: float) -> SimulationResult:
-        self.rider.reset_state()
+    def simulate_course(self, segments: List[Segment], p_base: float, max_power_limit: float,
+                        state: Optional[RiderState] = None) -> SimulationResult:
+        # Physiological state lives in this call only (the Rider is never mutated)
+        if state is None:
+            state = self.rider.initial_state()
         
         total_time = 0.0
         total_work = 0.0
         weighted_power_sum = 0.0
         v_current = 0.1 # Start from near-zero (0.1 m/s) to avoid div-by-zero
-        min_w_prime = self.rider.w_prime_max
+        min_w_prime = state.w_prime_bal
         track_data = []
 
         wind_speed_global = 0.0
@@ -218,15 +237,15 @@ class PhysicsEngine:
                 p_actual = (f_actual_wheel * v_avg) / (1 - self.params.drivetrain_loss)
             
             # 생리학적 상태 업데이트 (실제 파워 기반)
-            self.rider.update_w_prime(p_actual, time_sec)
+            state = self.rider.next_state(state, p_actual, time_sec)
             
-            if self.rider.is_bonked():
+            if state.is_bonked():
                 return SimulationResult(total_time, p_base, 0, 0, 0, 0, -1, False, "BONK (W' Depleted)")
 
             total_time += time_sec
             total_work += p_actual * time_sec
             weighted_power_sum += (p_actual ** 4) * time_sec
-            min_w_prime = min(min_w_prime, self.rider.w_prime_bal)
+            min_w_prime = min(min_w_prime, state.w_prime_bal)
 
             track_data.append({
                 "dist_km": seg.end_dist / 1000.0,
@@ -235,7 +254,7 @@ class PhysicsEngine:
                 "speed_kmh": (v_next + v_current) / 2 * 3.6,
                 "power": p_actual, # 실제 낸 파워 기록
                 "time_sec": total_time,
-                "w_prime_bal": self.rider.w_prime_bal,
+                "w_prime_bal": state.w_prime_bal,
                 "lat": seg.lat,
                 "lon": seg.lon
             })
@@ -311,6 +330,7 @@ class PhysicsEngine:
         is_walking = False
         min_speed_ms = 5.0 / 3.6
         first_raw_speed = None # 끌바 발생 시점의 원래 속도
+        v_coast = self.speed_table.speed(seg.grade) if p_avail <= 0 else 0.0
 
         for _ in range(num_chunks):
             # Bisection Method (이분 탐색)
@@ -322,6 +342,14 @@ class PhysicsEngine:
             high = 45.0 # 최대 속도 (약 160km/h) - 물리적 한계
             
             v_next = v_current
+
+            if v_coast > 0:
+                # 무동력 구간: 해는 진입 속도와 종단 속도 사이에 있음 (검증된 경우에만 좁힘)
+                a = max(low, min(v_current, v_coast) - COAST_BRACKET_MARGIN)
+                b = min(high, max(v_current, v_coast) + COAST_BRACKET_MARGIN)
+                if (self._coast_residual(a, v_current, v_wind, d_sub, f_gravity, f_roll, total_mass, eff_cda) > 0.0
+                        and self._coast_residual(b, v_current, v_wind, d_sub, f_gravity, f_roll, total_mass, eff_cda) <= 0.0):
+                    low, high = a, b
             
             for _i in range(15): # 15회 반복이면 오차 0.01km/h 미만으로 수렴
                 if (high - low) < 0.005: break
@@ -387,4 +415,18 @@ class PhysicsEngine:
         # 만약 끌바가 없었다면 마지막 속도를 반환
         final_raw_return = first_raw_speed if first_raw_speed is not None else v_next
             
-        return v_current, t_total, is_walking, final_raw_return
\ No newline at end of file
+        return v_current, t_total, is_walking, final_raw_return
+
+    def _coast_residual(self, v_next: float, v_current: float, v_wind: float, d_sub: float,
+                        f_gravity: float, f_roll: float, total_mass: float, eff_cda: float) -> float:
+        """무동력 chunk 의 에너지 수지 (초기E + 알짜일 - 나중E), v_next 에서 평가."""
+        v_avg = (v_current + v_next) / 2
+        if v_avg < 0.1: v_avg = 0.1
+        v_air = v_avg + v_wind
+        f_drag = 0.5 * self.params.air_density * eff_cda * (v_air * abs(v_air))
+        f_brake = 0.0
+        if v_avg > 13.8889:
+            # 검증은 solver 와 동일한 정확한 식으로 해야 bracket 이 유효함
+            f_brake = total_mass * (0.22 * ((v_avg * 3.6 - 50.0) ** 1.2)) / 3.6
+        f_net = -f_drag - f_gravity - f_roll - f_brake
+        return 0.5 * total_mass * (v_current ** 2) + f_net * d_sub - 0.5 * total_mass * (v_next ** 2)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+class CancelToken:
+    """
+    [Cooperative Cancellation]
+    Shared between a request handler and an engine: the handler cancels it (client
+    went away) or gives it a deadline; the engine's search loops poll `stop_reason`
+    between probes and return the best feasible result found so far.
+    """
+
+    def __init__(self, timeout_sec: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout_sec if timeout_sec else None
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def stop_reason(self) -> Optional[str]:
+        """"cancelled", "deadline", or None while the search may continue."""
+        if self._event.is_set():
+            return "cancelled"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        return None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.stop_reason is not None
+
+class Cancellable:
+    """Mixin for engines whose search loops honour a CancelToken (`set_cancel_token`)."""
+
+    cancel_token: Optional[CancelToken] = None
+
+    def set_cancel_token(self, token: Optional[CancelToken]):
+        self.cancel_token = token
+
+    def _stop_reason(self) -> Optional[str]:
+        return self.cancel_token.stop_reason if self.cancel_token is not None else None
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, astuple
+from typing import List, NamedTuple, Tuple
+
+from src.core.gpx_loader import Segment
+
+G = 9.81
+CHUNK_SIZE = 20.0           # Sub-stepping length [m] (fixed chunking)
+# Adaptive sub-stepping (V2): each chunk is sized so that the kinetic energy change
+# predicted from the net force at its entry (F * d) stays below CHUNK_MAX_DKE * KE,
+# i.e. about half that fraction in speed. Chunk time error scales with (dv / v)^2.
+CHUNK_MAX_DKE = 0.1         # Fraction of the entry kinetic energy
+CHUNK_MIN_DV = 0.75         # ... but may always change speed by this much (slow climbs) [m/s]
+CHUNK_MIN_LENGTH = 5.0      # [m]
+CHUNK_MAX_LENGTH = 200.0    # [m]
+# Equilibrium shortcut (V2): once a chunk starts within EQUILIBRIUM_TOL of the speed
+# where the net force at target power vanishes, the rest of the segment is integrated
+# in one step with the force linearized around that speed (exponential approach).
+# The step is taken only where the linearization holds (Newton lands near F = 0).
+EQUILIBRIUM_TOL = 0.1       # |v - v_eq| / v
+EQUILIBRIUM_LINEARITY = 0.03 # |F(v_eq)| / |F(v)|
+EQUILIBRIUM_PROBE_MS = 0.05 # Finite-difference step for dF/dv [m/s]
+CORNER_MU = 0.8             # Tire grip + banking
+BRAKE_GAIN_KMH = 0.22       # Soft-wall deceleration a = 0.22 * (V - 50)^1.2 [km/h per sec]
+BRAKE_START_MS = 13.8889    # 50 km/h
+
+class SegmentConstants(NamedTuple):
+    """Everything the segment solver needs that depends only on (course, rider mass, params)."""
+    f_gravity: float        # m * g * grade [N]
+    k_drag: float           # 0.5 * rho * CdA_eff [kg/m]
+    num_chunks: int
+    d_sub: float            # Chunk length [m]
+    v_corner_limit: float   # Entry speed cap from heading change [m/s], inf if none
+
+@dataclass(frozen=True)
+class PreparedCourse:
+    """
+    [Course Preparation Stage]
+    Per-segment physics constants materialized once per (course, rider mass, params)
+    and shared by every p_base probe of the outer search (and by later requests
+    on the same course, via the module-level cache below).
+    """
+    total_mass: float
+    f_roll: float           # m * g * crr [N]
+    brake_coef: float       # m * 0.22 / 3.6, so that F_brake = brake_coef * (v_kmh - 50)^1.2
+    eff_loss: float         # 1 - drivetrain_loss
+    total_dist_km: float
+    segments: Tuple[SegmentConstants, ...]
+
+def segment_constants(seg: Segment, total_mass: float, params, prev_heading: float) -> SegmentConstants:
+    """Constants for a single segment (also used by solvers called without a prepared course)."""
+    eff_cda = params.cda * (1 - params.drafting_factor)
+    rho = seg.air_density if seg.air_density > 0 else params.air_density
+    num_chunks = max(1, math.ceil(seg.length / CHUNK_SIZE))
+
+    # Physics-based Cornering Limit: V = sqrt(mu * g * R)
+    v_corner_limit = math.inf
+    heading_change = abs(seg.heading - prev_heading)
+    if heading_change > 180: heading_change = 360 - heading_change
+    if seg.length > 0 and heading_change > 1.0: # Ignore micro-jitters (< 1 deg)
+        curvature_rad = math.radians(heading_change) / seg.length
+        if curvature_rad > 0.0001:
+            v_corner_limit = math.sqrt(CORNER_MU * G * (1.0 / curvature_rad))
+
+    return SegmentConstants(
+        f_gravity=total_mass * G * seg.grade,
+        k_drag=0.5 * rho * eff_cda,
+        num_chunks=num_chunks,
+        d_sub=seg.length / num_chunks,
+        v_corner_limit=v_corner_limit
+    )
+
+def course_fingerprint(segments: List[Segment]) -> int:
+    """Hash of everything in a course that the prepared constants depend on."""
+    return hash(tuple((s.length, s.grade, s.heading, s.air_density) for s in segments))
+
+_CACHE: "OrderedDict[tuple, PreparedCourse]" = OrderedDict()
+_CACHE_MAX = 32
+_CACHE_LOCK = threading.Lock()   # engines may run simulations from several threads
+
+def prepare_course(segments: List[Segment], rider_weight: float, params) -> PreparedCourse:
+    """
+    Fetch the PreparedCourse for these segments from the LRU cache, building it on a miss.
+    The key covers the course geometry, rider weight and every PhysicsParams field.
+    """
+    key = (course_fingerprint(segments), float(rider_weight), astuple(params))
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+            return hit
+
+    course = build_course(segments, rider_weight, params)
+    with _CACHE_LOCK:
+        _CACHE[key] = course
+        if len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return course
+
+def build_course(segments: List[Segment], rider_weight: float, params) -> PreparedCourse:
+    """Uncached construction of a PreparedCourse."""
+    total_mass = rider_weight + params.bike_weight
+    consts = []
+    prev_heading = segments[0].heading if segments else 0.0
+    for seg in segments:
+        consts.append(segment_constants(seg, total_mass, params, prev_heading))
+        prev_heading = seg.heading
+
+    return PreparedCourse(
+        total_mass=total_mass,
+        f_roll=total_mass * G * params.crr,
+        brake_coef=total_mass * BRAKE_GAIN_KMH / 3.6,
+        eff_loss=1 - params.drivetrain_loss,
+        total_dist_km=sum(s.length for s in segments) / 1000.0,
+        segments=tuple(consts)
+    )
+
+class CoursePreparation:
+    """Mixin giving an engine (with `rider` and `params`) the cached `prepare_course` stage."""
+
+    def prepare_course(self, segments: List[Segment]) -> PreparedCourse:
+        return prepare_course(segments, self.rider.weight, self.params)
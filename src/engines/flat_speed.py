@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+
+G = 9.81
+
+@lru_cache(maxsize=4096)
+def solve_flat_speed(power_watts: float, total_mass: float, cda: float, crr: float,
+                     air_density: float = 1.225, drivetrain_loss: float = 0.05) -> float:
+    """
+    [Analytic Flat-Road Speed]
+    Steady-state speed [m/s] on a flat road with no wind, i.e. the real root of
+        P_wheel = a*v^3 + b*v,   a = 0.5*rho*CdA,  b = m*g*Crr,  P_wheel = P*(1 - loss)
+
+    With a, b > 0 the cubic is monotonic and has exactly one real root; the
+    trigonometric-hyperbolic form of Cardano's formula is used because it has no
+    cancellation (unlike the two-cube-root form):
+        v = 2*sqrt(p/3) * sinh( asinh( (3q/2p) * sqrt(3/p) ) / 3 ),   p = b/a, q = P_wheel/a
+
+    Memoized per (power, mass, CdA, Crr, rho, loss).
+    """
+    p_wheel = power_watts * (1 - drivetrain_loss)
+    if p_wheel <= 0.0:
+        return 0.0
+    a = 0.5 * air_density * cda
+    b = total_mass * G * crr
+    if a <= 0.0:
+        return p_wheel / b if b > 0.0 else math.inf
+    if b <= 0.0:
+        return (p_wheel / a) ** (1.0 / 3.0)
+    p = b / a
+    q = p_wheel / a
+    return 2.0 * math.sqrt(p / 3.0) * math.sinh(math.asinh(1.5 * q / p * math.sqrt(3.0 / p)) / 3.0)
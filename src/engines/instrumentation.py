@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional
+
+# Engines start with instrumentation on when SIM_INSTRUMENT=1 (off by default)
+INSTRUMENT_DEFAULT = os.environ.get("SIM_INSTRUMENT", "0").lower() in ("1", "true", "yes", "on")
+
+@dataclass
+class EngineStats:
+    """
+    [Hot-Path Counters]
+    Filled by an engine only while instrumentation is enabled (engine.stats is not None).
+    The hot loops test `stats is not None` once per chunk, so the disabled cost is a
+    single pointer comparison; per-iteration counts are derived after the fact
+    (see bisection_steps) instead of being incremented inside the bisection.
+    """
+    outer_iterations: int = 0       # Probes of the outer p_base search
+    simulate_calls: int = 0
+    segments: int = 0
+    chunks: int = 0
+    bisection_iterations: int = 0   # Inner speed-bisection steps, summed over chunks
+    walking_clamps: int = 0         # Chunks clamped to walking speed
+    corner_clamps: int = 0          # Segment entries capped by the cornering limit
+    brake_activations: int = 0      # Chunks ending inside the soft-wall brake zone
+    equilibrium_shortcuts: int = 0  # Segment remainders integrated in closed form (no bisection)
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + time.perf_counter() - t0
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "phase_seconds"}
+        out["phase_seconds"] = dict(self.phase_seconds)
+        return out
+
+def bisection_steps(width: float, tol: float, max_iter: int) -> int:
+    """Steps a halving bisection takes to shrink `width` below `tol` (capped at max_iter)."""
+    n = 0
+    while width >= tol and n < max_iter:
+        width *= 0.5
+        n += 1
+    return n
+
+@contextmanager
+def maybe_phase(stats: Optional[EngineStats], name: str):
+    """`stats.phase(name)` when instrumentation is on, a no-op otherwise."""
+    if stats is None:
+        yield
+    else:
+        with stats.phase(name):
+            yield
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 
 from src.core.rider import Rider
 from src.core.gpx_loader import Segment
-from src.weather_client import WeatherClient
+from src.services.weather import WeatherClient
 from src.engines.v2 import PhysicsParams, SimulationResult, PhysicsEngineV2
 
 class GordonTheoryEngine(PhysicsEngineV2):
@@ -34,9 +34,13 @@ class GordonTheoryEngine(PhysicsEngineV2):
         """
         low_vcrit, high_vcrit = 0.1, 20.0 # m/s (0.36 ~ 72 km/h)
         best_res = None
+        interrupted = ""
         
-        # Binary Search for V_crit
+        # Binary Search for V_crit (stops early on cancellation / deadline, keeping the last probe)
         for _ in range(20):
+            interrupted = (self._stop_reason() or "") if best_res is not None else ""
+            if interrupted:
+                break
             mid_vcrit = (low_vcrit + high_vcrit) / 2
             self.v_crit = mid_vcrit
             
@@ -52,6 +56,7 @@ class GordonTheoryEngine(PhysicsEngineV2):
                 high_vcrit = mid_vcrit
             best_res = res
             
+        best_res.interrupted = interrupted
         return best_res
 
     def _calculate_target_power_dynamic(self, p_base: float, grade: float, max_limit: float, current_v: float) -> float:
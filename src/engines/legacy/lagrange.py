@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Tuple
+
+# Lambda (marginal time saved per Joule, s/J) is searched on a log scale:
+# useful values span many decades (~1e-6 .. 1e-2), which a linear bisection over
+# [-1000, 0] cannot resolve in a few dozen steps.
+LAMBDA_MIN_MAGNITUDE = 1e-12
+LAMBDA_MAX_MAGNITUDE = 1000.0
+
+def solve_budget_lambda(evaluate: Callable[[float], Tuple[float, Any]], target_joules: float,
+                        lam_strict: float = -LAMBDA_MAX_MAGNITUDE, lam_generous: float = -LAMBDA_MIN_MAGNITUDE,
+                        rtol: float = 1e-4, max_iter: int = 40) -> Tuple[float, Any, bool]:
+    """
+    [Bracketing Root Finder for the Energy Budget]
+    Find lambda (< 0) with energy(lambda) = target_joules, where `evaluate(lambda)`
+    returns (energy, payload) and energy grows as lambda goes from `lam_strict`
+    (spend only on very efficient segments) towards `lam_generous` (spend freely).
+
+    Illinois (modified false position) on u = log10(-lambda), which keeps the root
+    bracketed at every step like bisection but converges superlinearly on smooth
+    parts of the (piecewise-constant, because of the inner power search) energy curve.
+
+    Returns (lambda, payload, feasible) for the best evaluation that stays within
+    budget (energy <= target). If even `lam_strict` overspends, that evaluation is
+    returned with feasible=False.
+    """
+    u_lo = math.log10(-lam_generous)     # generous end: energy above target
+    u_hi = math.log10(-lam_strict)       # strict end: energy below target
+
+    e_hi, payload_hi = evaluate(lam_strict)
+    g_hi = e_hi - target_joules
+    if g_hi > 0:
+        return lam_strict, payload_hi, False
+    best = (lam_strict, payload_hi, g_hi)
+    if -g_hi <= rtol * target_joules:
+        return best[0], best[1], True
+
+    e_lo, payload_lo = evaluate(lam_generous)
+    g_lo = e_lo - target_joules
+    if g_lo <= 0:
+        return lam_generous, payload_lo, True
+
+    side = 0
+    for _ in range(max_iter):
+        # False position, falling back to bisection if the secant leaves the bracket
+        u = u_hi - g_hi * (u_hi - u_lo) / (g_hi - g_lo)
+        if not (min(u_lo, u_hi) < u < max(u_lo, u_hi)):
+            u = (u_lo + u_hi) / 2.0
+        lam = -(10.0 ** u)
+        e, payload = evaluate(lam)
+        g = e - target_joules
+
+        if g <= 0:
+            if g > best[2]:
+                best = (lam, payload, g)
+            if -g <= rtol * target_joules:
+                break
+            u_hi, g_hi = u, g
+            if side == -1:
+                g_lo *= 0.5     # Illinois: stop the stale endpoint from pinning the secant
+            side = -1
+        else:
+            u_lo, g_lo = u, g
+            if side == 1:
+                g_hi *= 0.5
+            side = 1
+
+        if abs(u_hi - u_lo) < 1e-9:
+            break
+
+    return best[0], best[1], True
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 
 from src.core.rider import Rider
 from src.core.gpx_loader import Segment
-from src.weather_client import WeatherClient
+from src.services.weather import WeatherClient
 from src.engines.v2 import PhysicsParams, SimulationResult, PhysicsEngineV2
 
 class TheoryEngine(PhysicsEngineV2):
@@ -19,6 +19,10 @@ class TheoryEngine(PhysicsEngineV2):
         super().__init__(rider, params, weather_client)
         self.p_max_constraint = self.rider.pdc.get(60, self.rider.cp * 2.0) # 1-min Max Power Constraint
 
+    def _is_coasting(self, grade: float) -> bool:
+        # Inverse-velocity pacing never drops to 0 W
+        return False
+
     def _calculate_target_power_dynamic(self, p_base: float, grade: float, max_limit: float, current_v: float) -> float:
         # 1. Theoretical Optimum: Inverse Velocity
         # P = C / V (to maintain constant energy per distance)
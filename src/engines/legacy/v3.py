@@ -4,10 +4,12 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from src.core.rider import Rider
 from src.core.gpx_loader import Segment
-from src.weather_client import WeatherClient
+from src.services.weather import WeatherClient
 from src.engines.v2 import PhysicsParams, SimulationResult
+from src.engines.course import CoursePreparation
+from src.engines.cancellation import Cancellable
 
-class PhysicsEngineV3:
+class PhysicsEngineV3(CoursePreparation, Cancellable):
     """
     Physics Engine V3: Optimal Control (Dahmen's Algorithm)
     - Implementation strictly following docs/todo/fix_strategy.txt
@@ -27,8 +29,13 @@ class PhysicsEngineV3:
         high_p = self.rider.cp * 1.5 
         
         best_result: Optional[SimulationResult] = None
+        interrupted = ""
         
         for i in range(12):
+            # Cancellation / deadline: keep the best feasible profile so far
+            interrupted = self._stop_reason() or ""
+            if interrupted:
+                break
             mid_p = (low_p + high_p) / 2.0
             
             # 1. Determine Energy Budget for this Power Level
@@ -73,13 +80,26 @@ class PhysicsEngineV3:
             else:
                 high_p = mid_p
                 
-        return best_result if best_result else self.simulate_course(segments, [150.0]*len(segments))
+        if best_result is None and interrupted:
+            # Stopped before any feasible probe: there is no pacing plan to report
+            result = SimulationResult(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, False, fail_reason=interrupted)
+        else:
+            result = best_result if best_result else self.simulate_course(segments, [150.0]*len(segments))
+        result.interrupted = interrupted
+        return result
 
-    def solve_dahmen_optimizer(self, segments: List[Segment], total_energy_budget: float, max_power_limit: float) -> List[float]:
+    def solve_dahmen_optimizer(self, segments: List[Segment], total_energy_budget: float, max_power_limit: float,
+                               max_iterations: int = 200, tol_sec: float = 0.01) -> List[float]:
         """
         [Dahmen Optimal Control Solver]
         EXACTLY AS WRITTEN IN docs/todo/fix_strategy.txt (Step 3)
         with minor initialization stability fix.
+
+        dt/dP is the analytic sensitivity of the segment solve (see _segment_time_sensitivity),
+        taken from the same forward pass, so one iteration costs one simulation.
+        Stops once an iteration improves the course time by less than `tol_sec`
+        (or after `max_iterations`); the number of power updates applied is kept
+        in `self.last_dahmen_iterations`.
         """
         # 1. 초기화: Warm Start based on Gradient
         # Flat initialization takes too long to converge to a polarized strategy.
@@ -97,13 +117,17 @@ class PhysicsEngineV3:
         
         # [TUNING] Convergence parameters
         # Learning Rate 30.0: Aggressive enough to pace, conservative enough to avoid instant Bonk.
-        # Iterations 200: Give it time to settle.
+        # max_iterations 200: upper bound only; converged profiles stop early.
         learning_rate = 30.0  
-        iterations = 200
+        self.last_dahmen_iterations = 0
+        prev_total_time = math.inf
         
-        for k in range(iterations):
+        for k in range(max_iterations):
+            if self._stop_reason():
+                break
             gradients = [] # 각 구간별 dt/dP (1W당 시간 단축량)
             current_total_energy = 0.0
+            current_total_time = 0.0
             
             # 2. 기울기(Gradient) 계산 루프
             v_curr = 0.1
@@ -113,17 +137,20 @@ class PhysicsEngineV3:
                 # 현재 파워일 때 시간 (T_base)
                 v_next_base, t_base, _, _ = self._solve_segment_physics(seg, p, v_curr, 0)
                 
-                # 미세 파워 증가 시 시간 (T_delta) -> 수치 미분
-                delta = 0.5 
-                v_next_delta, t_delta, _, _ = self._solve_segment_physics(seg, p + delta, v_curr, 0)
-                
-                # 기울기 (음수 값)
-                grad = (t_delta - t_base) / delta
+                # 기울기 (음수 값): 같은 해에서 해석적 미분 (추가 시뮬레이션 없음)
+                grad = self._segment_time_sensitivity(seg, p, v_curr, v_next_base, 0)
                 gradients.append(grad)
                 
                 current_total_energy += p * t_base
+                current_total_time += t_base
                 v_curr = v_next_base 
 
+            # 수렴 판정: 직전 반복 대비 코스 시간 개선이 tol_sec 미만이면 종료
+            if abs(prev_total_time - current_total_time) < tol_sec:
+                break
+            prev_total_time = current_total_time
+            self.last_dahmen_iterations = k + 1
+
             # 3. 파워 업데이트 (Greedy Update)
             avg_grad = sum(gradients) / len(gradients)
             
@@ -169,7 +196,7 @@ class PhysicsEngineV3:
             if current_total_energy > 0:
                 scale = total_energy_budget / current_total_energy
                 powers = [p * scale for p in powers]
-                
+
         return powers
 
     def simulate_course(self, segments: List[Segment], power_profile: List[float]) -> SimulationResult:
@@ -177,7 +204,7 @@ class PhysicsEngineV3:
         Dahmen 알고리즘용 시뮬레이터:
         EXACTLY AS WRITTEN IN docs/todo/fix_strategy.txt (Step 2)
         """
-        self.rider.reset_state()
+        state = self.rider.initial_state()
         total_time = 0.0
         total_work = 0.0
         weighted_power_sum = 0.0
@@ -191,8 +218,8 @@ class PhysicsEngineV3:
             # 물리 연산 실행
             v_next, time_sec, is_walking, p_actual = self._solve_segment_physics(seg, p_target, v_current, 0)
             
-            self.rider.update_w_prime(p_actual, time_sec)
-            if self.rider.is_bonked():
+            state = self.rider.next_state(state, p_actual, time_sec)
+            if state.is_bonked():
                 return SimulationResult(total_time, 0, 0, 0, 0, 0, -1, False, "BONK")
 
             total_time += time_sec
@@ -261,11 +288,35 @@ class PhysicsEngineV3:
         
         return v_final, t_final, False, p_target
 
+    def _segment_time_sensitivity(self, seg: Segment, p_target: float, v_entry: float, v_final: float, v_wind: float) -> float:
+        """
+        dt/dP [s/W] of `_solve_segment_physics` at its solution, by implicit differentiation.
+
+        The segment solve finds v_f with R(v_f, P) = 0, where (v_avg = (v_in + v_f) / 2)
+            R = 0.5*m*v_in^2 + P_wheel*d/v_avg - (F_aero(v_avg) + F_grav + F_roll)*d - 0.5*m*v_f^2
+        so dv_f/dP = -(dR/dP) / (dR/dv_f) and t = d / v_avg gives dt/dP = -d / (2 v_avg^2) * dv_f/dP.
+        Same local sensitivity (entry speed held fixed) as a finite difference of the solver,
+        without its bisection noise.
+        """
+        if v_final <= 0.5:
+            return 0.0 # clamped at the minimum speed: time does not respond to power
+        total_mass = self.rider.weight + self.params.bike_weight
+        eff_cda = self.params.cda * (1 - self.params.drafting_factor)
+        loss = 1 - self.params.drivetrain_loss
+        d = max(seg.length, 0.1)
+
+        v_avg = max((v_entry + v_final) / 2, 0.1)
+        v_air = v_avg + v_wind
+        p_wheel = p_target * loss
+        # d(v|v|)/dv = 2|v|
+        df_aero = self.params.air_density * eff_cda * abs(v_air)
+
+        dr_dp = loss * d / v_avg
+        dr_dv = -0.5 * p_wheel * d / (v_avg * v_avg) - 0.5 * df_aero * d - total_mass * v_final
+        dv_dp = -dr_dp / dr_dv
+        return -d / (2 * v_avg * v_avg) * dv_dp
+
     def _get_fatigue_adjusted_limit(self, duration_sec: float) -> float:
-        sorted_pdc = sorted([(int(k), v) for k, v in self.rider.pdc.items()])
-        if not sorted_pdc: return self.rider.cp
-        max_pdc_time, max_pdc_watts = sorted_pdc[-1]
-        if duration_sec > max_pdc_time:
-            riegel_exponent = -0.10 
-            return max_pdc_watts * (duration_sec / max_pdc_time) ** riegel_exponent
-        return self.rider.get_pdc_power(duration_sec)
+        curve = self.rider.pdc_curve
+        if not curve: return self.rider.cp
+        return curve.power(duration_sec, riegel_exponent=-0.10)
@@ -2,12 +2,17 @@ from __future__ import annotations
 import math
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+
+import numpy as np
+
 from src.core.rider import Rider
 from src.core.gpx_loader import Segment
-from src.weather_client import WeatherClient
+from src.services.weather import WeatherClient
 from src.engines.v2 import PhysicsParams, SimulationResult
+from src.engines.course import CoursePreparation
+from src.engines.legacy.lagrange import solve_budget_lambda
 
-class PhysicsEngineV3_1:
+class PhysicsEngineV3_1(CoursePreparation):
     """
     Physics Engine V3.1: High-Resolution Lagrange Optimizer
     - Broadens Lambda search range to ensure full energy budget utilization.
@@ -57,28 +62,69 @@ class PhysicsEngineV3_1:
         # [CRITICAL] Extremely broad lambda range to capture very high and very low efficiency segments.
         # low_lambda -1000.0 means we are willing to spend 1 Joule to save 1000 seconds (very cheap).
         # high_lambda -1e-12 means we barely save any time (very expensive).
-        low_lambda, high_lambda = -1000.0, -1e-12
-        best_powers = []
-        
-        for _ in range(30): # Increased precision
-            mid_lambda = (low_lambda + high_lambda) / 2.0
-            current_powers = []
-            est_energy = 0.0
-            
-            for seg in segments:
-                p = self._find_power_for_lambda(seg, mid_lambda, max_power_limit)
-                current_powers.append(p)
-                v = self._solve_equilibrium_speed(seg, p)
-                est_energy += p * (seg.length / v if v > 0.1 else seg.length / 0.1)
-                
-            if est_energy > target_joules:
-                # Used too much energy -> need more negative lambda (more efficient watts only)
-                high_lambda = mid_lambda
-            else:
-                # Energy left -> can afford less efficient watts -> higher (closer to 0) lambda
-                low_lambda = mid_lambda
-                best_powers = current_powers
-        return best_powers
+        # All segments are solved at once for each lambda (_powers_for_lambda), and the
+        # budget-matching lambda is found by a bracketing root finder on log(-lambda).
+        if not segments:
+            return []
+        arrays = self._segment_arrays(segments)
+
+        def evaluate(lam: float):
+            powers = self._powers_for_lambda(arrays, lam, max_power_limit)
+            v = self._equilibrium_speed_array(arrays, powers)
+            energy = float(np.sum(powers * arrays["length"] / np.maximum(v, 0.1)))
+            return energy, powers
+
+        _, powers, feasible = solve_budget_lambda(evaluate, target_joules)
+        # Nothing fits the budget: same empty profile as before (simulate_course falls back to 150 W)
+        return powers.tolist() if feasible else []
+
+    def _segment_arrays(self, segments: List[Segment]) -> Dict[str, np.ndarray]:
+        """Per-segment constants of the equilibrium model as arrays."""
+        total_mass, g = self.rider.weight + self.params.bike_weight, 9.81
+        grade = np.array([s.grade for s in segments], dtype=float)
+        theta = np.arctan(grade)
+        f_static = total_mass * g * (np.sin(theta) + self.params.crr * np.cos(theta))
+        # _calculate_min_power_for_speed(seg, 4.0)
+        v_min = 4.0 / 3.6
+        f_min = f_static + 0.5 * 1.225 * self.params.cda * v_min ** 2
+        p_min = np.maximum(5.0, f_min * v_min / (1 - self.params.drivetrain_loss))
+        return {
+            "length": np.array([s.length for s in segments], dtype=float),
+            "f_static": f_static,
+            "p_min": p_min,
+        }
+
+    def _equilibrium_speed_array(self, arrays: Dict[str, np.ndarray], power: np.ndarray) -> np.ndarray:
+        """`_solve_equilibrium_speed` for every segment at once (same 15-step bisection)."""
+        p_wheel = power * (1 - self.params.drivetrain_loss)
+        k_aero = 0.5 * 1.225 * self.params.cda
+        f_static = arrays["f_static"]
+        low_v = np.full(p_wheel.shape, 0.1)
+        high_v = np.full(p_wheel.shape, 45.0)
+        for _ in range(15):
+            mid_v = (low_v + high_v) / 2.0
+            below = (k_aero * mid_v ** 2 + f_static) * mid_v < p_wheel
+            low_v = np.where(below, mid_v, low_v)
+            high_v = np.where(below, high_v, mid_v)
+        return (low_v + high_v) / 2.0
+
+    def _powers_for_lambda(self, arrays: Dict[str, np.ndarray], target_lambda: float, max_limit: float) -> np.ndarray:
+        """`_find_power_for_lambda` for every segment at once (same 15-step bisection)."""
+        length = arrays["length"]
+        low_p = arrays["p_min"].copy()
+        high_p = np.full(low_p.shape, float(max_limit))
+        for _ in range(15):
+            mid_p = (low_p + high_p) / 2.0
+            v1 = self._equilibrium_speed_array(arrays, mid_p)
+            v2 = self._equilibrium_speed_array(arrays, mid_p + 0.1)
+            t1, t2 = length / v1, length / v2
+            dw = (mid_p + 0.1) * t2 - mid_p * t1
+            safe_dw = np.where(dw != 0, dw, 1.0)
+            grad = np.where(dw != 0, (t2 - t1) / safe_dw, 0.0)
+            efficient = grad < target_lambda
+            low_p = np.where(efficient, mid_p, low_p)
+            high_p = np.where(efficient, high_p, mid_p)
+        return (low_p + high_p) / 2.0
 
     def _find_power_for_lambda(self, seg: Segment, target_lambda: float, max_limit: float) -> float:
         # Minimal power just to keep moving, no arbitrary 150W floor.
@@ -125,15 +171,15 @@ class PhysicsEngineV3_1:
         return (low_v + high_v) / 2.0
 
     def simulate_course(self, segments: List[Segment], power_profile: List[float]) -> SimulationResult:
-        self.rider.reset_state()
+        state = self.rider.initial_state()
         total_time, total_work, weighted_power_sum = 0.0, 0.0, 0.0
         v_current = 0.1
         track_data = []
         for i, seg in enumerate(segments):
             p_target = power_profile[i] if i < len(power_profile) else 150.0
             v_next, time_sec, _, p_actual = self._solve_segment_physics(seg, p_target, v_current, 0)
-            self.rider.update_w_prime(p_actual, time_sec)
-            if self.rider.is_bonked(): return SimulationResult(total_time, 0, 0, 0, 0, 0, -1, False, "BONK")
+            state = self.rider.next_state(state, p_actual, time_sec)
+            if state.is_bonked(): return SimulationResult(total_time, 0, 0, 0, 0, 0, -1, False, "BONK")
             total_time += time_sec
             total_work += p_actual * time_sec
             weighted_power_sum += (p_actual ** 4) * time_sec
@@ -164,8 +210,6 @@ class PhysicsEngineV3_1:
         return v_final, d/((v_curr+v_final)/2), False, p_target
 
     def _get_fatigue_adjusted_limit(self, duration_sec: float) -> float:
-        sorted_pdc = sorted([(int(k), v) for k, v in self.rider.pdc.items()])
-        if not sorted_pdc: return self.rider.cp
-        max_pdc_time, max_pdc_watts = sorted_pdc[-1]
-        if duration_sec > max_pdc_time: return max_pdc_watts * (duration_sec / max_pdc_time) ** -0.10
-        return self.rider.get_pdc_power(duration_sec)
+        curve = self.rider.pdc_curve
+        if not curve: return self.rider.cp
+        return curve.power(duration_sec, riegel_exponent=-0.10)
@@ -4,10 +4,11 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from src.core.rider import Rider
 from src.core.gpx_loader import Segment
-from src.weather_client import WeatherClient
+from src.services.weather import WeatherClient
 from src.engines.v2 import PhysicsParams, SimulationResult
+from src.engines.course import CoursePreparation
 
-class PhysicsEngineV4:
+class PhysicsEngineV4(CoursePreparation):
     """
     Physics Engine V4: Gravity Ratio Heuristic
     - Replaces explicit If/Else gradient logic with a continuous physical ratio.
@@ -51,16 +52,10 @@ class PhysicsEngineV4:
         return best_result if best_result else self.simulate_course(segments, low, low * 3.0)
 
     def _get_dynamic_pdc_limit(self, duration_sec: float) -> float:
-        sorted_pdc = sorted([(int(k), v) for k, v in self.rider.pdc.items()])
-        if not sorted_pdc: return self.rider.cp
-        max_pdc_time, max_pdc_watts = sorted_pdc[-1]
-        
-        if duration_sec > max_pdc_time:
-            # Riegel Exponent -0.10 (General Cyclist Fatigue)
-            riegel_exponent = -0.10 
-            return max_pdc_watts * (duration_sec / max_pdc_time) ** riegel_exponent
-            
-        return self.rider.get_pdc_power(duration_sec)
+        curve = self.rider.pdc_curve
+        if not curve: return self.rider.cp
+        # Riegel Exponent -0.10 (General Cyclist Fatigue)
+        return curve.power(duration_sec, riegel_exponent=-0.10)
 
     def _calculate_target_power(self, seg: Segment, p_base: float, max_limit: float, current_v: float) -> float:
         """
@@ -98,7 +93,7 @@ class PhysicsEngineV4:
         return max(0.0, min(target, max_limit))
 
     def simulate_course(self, segments: List[Segment], p_base: float, max_power_limit: float) -> SimulationResult:
-        self.rider.reset_state()
+        state = self.rider.initial_state()
         total_time = 0.0
         total_work = 0.0
         weighted_power_sum = 0.0
@@ -120,14 +115,14 @@ class PhysicsEngineV4:
             p_actual = p_target 
             if is_walking: p_actual = 30.0 
             
-            self.rider.update_w_prime(p_actual, time_sec)
-            if self.rider.is_bonked():
+            state = self.rider.next_state(state, p_actual, time_sec)
+            if state.is_bonked():
                 return SimulationResult(total_time, p_base, 0, 0, 0, 0, -1, False, "BONK")
 
             total_time += time_sec
             total_work += p_actual * time_sec
             weighted_power_sum += (p_actual ** 4) * time_sec
-            min_w_prime = min(min_w_prime, self.rider.w_prime_bal)
+            min_w_prime = min(min_w_prime, state.w_prime_bal)
             
             track_data.append({
                 "dist_km": seg.end_dist / 1000.0,
@@ -190,9 +185,6 @@ class PhysicsEngineV4:
         return v_current, t_total, is_walking, power
 
     def _get_fatigue_adjusted_limit(self, duration_sec: float) -> float:
-        sorted_pdc = sorted([(int(k), v) for k, v in self.rider.pdc.items()])
-        if not sorted_pdc: return self.rider.cp
-        max_pdc_time, max_pdc_watts = sorted_pdc[-1]
-        if duration_sec > max_pdc_time:
-            return max_pdc_watts * (duration_sec / max_pdc_time) ** -0.10
-        return self.rider.get_pdc_power(duration_sec)
+        curve = self.rider.pdc_curve
+        if not curve: return self.rider.cp
+        return curve.power(duration_sec, riegel_exponent=-0.10)
@@ -2,12 +2,18 @@ from __future__ import annotations
 import math
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+
+import numpy as np
+
 from src.core.rider import Rider
 from src.core.gpx_loader import Segment
-from src.weather_client import WeatherClient
+from src.services.weather import WeatherClient
 from src.engines.v2 import PhysicsParams, SimulationResult
+from src.engines.course import CoursePreparation
+from src.engines.cancellation import Cancellable
+from src.engines.legacy.lagrange import solve_budget_lambda
 
-class PhysicsEngineV5:
+class PhysicsEngineV5(CoursePreparation, Cancellable):
     """
     Physics Engine V5: Iterative Gradient Descent with Smoothing
     - Solves the Optimal Control problem by iteratively refining the power profile.
@@ -32,10 +38,15 @@ class PhysicsEngineV5:
         
         best_result = None
         best_time = float('inf')
+        interrupted = ""
         
         print(f"DEBUG: Starting Optimization Loop with Target: {target_watts:.1f}W")
 
         for i in range(15):
+            # Cancellation / deadline: keep the best feasible result so far
+            interrupted = self._stop_reason() or ""
+            if interrupted:
+                break
             # A. 목표 예산 설정 (Dynamic Budgeting)
             # "이 코스를 target_watts로 달리면 대충 몇 kJ이 필요한가?"를 역산
             # 거리 / (대략적 속도) = 시간
@@ -105,7 +116,13 @@ class PhysicsEngineV5:
                     best_result = sim_res
                     best_time = real_time
 
-        return best_result if best_result else self.simulate_course(segments, [150.0]*len(segments))
+        if best_result is None and interrupted:
+            # Stopped before any feasible probe: there is no pacing plan to report
+            result = SimulationResult(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, False, fail_reason=interrupted)
+        else:
+            result = best_result if best_result else self.simulate_course(segments, [150.0]*len(segments))
+        result.interrupted = interrupted
+        return result
 
     def solve_pacing_final(self, segments: List[Segment], target_joules: float, max_limit: float) -> List[float]:
         """
@@ -135,8 +152,11 @@ class PhysicsEngineV5:
         # Strategy: Inside the Iterative Loop, we adjust Lambda dynamically to match budget.
         
         current_lambda = -0.5 # Start guess
+        arrays = self._segment_arrays(segments)
         
         for _iter in range(iterations):
+            if self._stop_reason():
+                break
             # 1. Forward Simulation (Get v_in profile)
             sim_results = self._run_simulation_with_inertia(segments, current_powers)
             # sim_results[i] = v_in for segment i
@@ -144,15 +164,17 @@ class PhysicsEngineV5:
             # 2. Find optimal Lambda for this fixed velocity profile
             # We want Sum(Energy(P_ideal)) = Target.
             # This is a sub-problem: Binary search for Lambda given FIXED v_in.
-            target_lambda = self._find_lambda_for_budget(segments, target_joules, max_limit, sim_results)
+            # (All segments are solved at once per lambda; the P_ideal profile comes with it.)
+            target_lambda, ideal_powers = self._find_lambda_for_budget(
+                segments, target_joules, max_limit, sim_results, arrays=arrays, return_powers=True
+            )
             
             # 3. Calculate P_ideal and Update with Smoothing
             next_powers = []
             max_diff = 0.0
             
             for i, seg in enumerate(segments):
-                v_in = sim_results[i]
-                p_ideal = self._find_power_for_lambda(seg, target_lambda, max_limit, v_in)
+                p_ideal = ideal_powers[i]
                 
                 # Smoothing Update
                 p_new = current_powers[i] + alpha * (p_ideal - current_powers[i])
@@ -192,38 +214,90 @@ class PhysicsEngineV5:
             
         return v_ins
 
-    def _find_lambda_for_budget(self, segments: List[Segment], target_joules: float, max_limit: float, v_ins: List[float]) -> float:
+    def _find_lambda_for_budget(self, segments: List[Segment], target_joules: float, max_limit: float, v_ins: List[float],
+                                arrays: Optional[Dict[str, np.ndarray]] = None, return_powers: bool = False):
         """
         [FIXED] Binary Search Direction Inverted
         Lambda 범위: -1000 (Very Strict, Save Energy) ~ -1e-9 (Very Generous, Spend Energy)
+
+        각 Lambda 에 대해 모든 구간을 배열로 한 번에 풀고 (_powers_for_lambda),
+        예산을 맞추는 Lambda 는 log(-lambda) 위의 bracketing root finder 로 찾습니다.
+        return_powers=True 이면 (lambda, 그 lambda 의 파워 배열) 을 반환합니다.
         """
+        if arrays is None:
+            arrays = self._segment_arrays(segments)
+        v_in = np.asarray(v_ins, dtype=float)
+        length = arrays["length"]
+
+        def evaluate(lam: float):
+            powers = self._powers_for_lambda(arrays, lam, max_limit, v_in)
+            v_out = self._segment_speed_array(arrays, powers, v_in)
+            v_avg = np.maximum((v_in + v_out) / 2.0, 0.1)
+            return float(np.sum(powers * length / v_avg)), powers
+
         # 범위 설정: -1000 (효율충) ~ 0 (낭비충)
-        low_l, high_l = -1000.0, -1e-9
-        
-        for _ in range(30): # 횟수 충분히
-            mid_l = (low_l + high_l) / 2.0
-            total_e = 0.0
-            
-            # 현재 Lambda(mid_l) 기준 파워 계산
-            for i, seg in enumerate(segments):
-                v_in = v_ins[i]
-                p = self._find_power_for_lambda(seg, mid_l, max_limit, v_in)
-                
-                v_out = self._solve_segment_speed(seg, p, v_in)
-                v_avg = (v_in + v_out) / 2.0
-                if v_avg < 0.1: v_avg = 0.1
-                t = seg.length / v_avg
-                total_e += p * t
-            
-            # [핵심 수정 구간]
-            if total_e > target_joules:
-                # 예산 초과! -> 아껴 써야 함 -> 더 엄격한 쪽(-1000)으로
-                high_l = mid_l 
-            else:
-                # 예산 남음! -> 펑펑 써야 함 -> 더 관대한 쪽(0)으로
-                low_l = mid_l
-                
-        return (low_l + high_l) / 2.0
+        lam, powers, _ = solve_budget_lambda(evaluate, target_joules, lam_generous=-1e-9)
+        if return_powers:
+            return lam, powers.tolist()
+        return lam
+
+    def _segment_arrays(self, segments: List[Segment]) -> Dict[str, np.ndarray]:
+        """Per-segment constants of the local (fixed v_in) segment model as arrays."""
+        total_mass, g = self.rider.weight + self.params.bike_weight, 9.81
+        grade = np.array([s.grade for s in segments], dtype=float)
+        theta = np.arctan(grade)
+        length = np.array([s.length for s in segments], dtype=float)
+        return {
+            "length": length,
+            "d": np.maximum(0.1, length),
+            "f_const": total_mass * g * (np.sin(theta) + self.params.crr * np.cos(theta)),
+        }
+
+    def _segment_speed_array(self, arrays: Dict[str, np.ndarray], power: np.ndarray, v_entry: np.ndarray) -> np.ndarray:
+        """`_solve_segment_speed` for every segment at once (same 30-step bisection)."""
+        v_entry = np.maximum(v_entry, 0.1)
+        total_mass = self.rider.weight + self.params.bike_weight
+        eff_cda = self.params.cda * (1 - self.params.drafting_factor)
+        k_aero = 0.5 * self.params.air_density * eff_cda
+        p_wheel = power * (1 - self.params.drivetrain_loss)
+        d, f_const = arrays["d"], arrays["f_const"]
+        ke_entry = 0.5 * total_mass * v_entry ** 2
+
+        low_v = np.full(p_wheel.shape, 0.1)
+        high_v = np.full(p_wheel.shape, 130.0 / 3.6)
+        for _ in range(30):
+            v_final = (low_v + high_v) / 2.0
+            v_avg = (v_entry + v_final) / 2.0
+            work_net = ((p_wheel / v_avg) - k_aero * v_avg ** 2 - f_const) * d
+            gain = work_net > 0.5 * total_mass * v_final ** 2 - ke_entry
+            low_v = np.where(gain, v_final, low_v)
+            high_v = np.where(gain, high_v, v_final)
+        return (low_v + high_v) / 2.0
+
+    def _powers_for_lambda(self, arrays: Dict[str, np.ndarray], target_lambda: float, max_limit: float,
+                           v_in: np.ndarray) -> np.ndarray:
+        """`_find_power_for_lambda` for every segment at once (same 20-step bisection, h = 5 W)."""
+        total_mass = self.rider.weight + self.params.bike_weight
+        length = arrays["length"]
+        h = 5.0
+        low_p = np.zeros(v_in.shape)
+        high_p = np.full(v_in.shape, float(max_limit))
+        for _ in range(20):
+            mid_p = (low_p + high_p) / 2.0
+            v_out_1 = self._segment_speed_array(arrays, mid_p, v_in)
+            v_out_2 = self._segment_speed_array(arrays, mid_p + h, v_in)
+            t1 = length / ((v_in + v_out_1) / 2.0)
+            t2 = length / ((v_in + v_out_2) / 2.0)
+            # 실질 비용 = 페달링 에너지 - 운동에너지 이득
+            dw_eff_1 = mid_p * t1 - 0.5 * total_mass * (v_out_1 ** 2 - v_in ** 2)
+            dw_eff_2 = (mid_p + h) * t2 - 0.5 * total_mass * (v_out_2 ** 2 - v_in ** 2)
+            dw = dw_eff_2 - dw_eff_1
+            singular = np.abs(dw) < 1e-6
+            grad = np.where(singular, -1e9, (t2 - t1) / np.where(singular, 1.0, dw))
+            efficient = grad < target_lambda
+            low_p = np.where(efficient, mid_p, low_p)
+            high_p = np.where(efficient, high_p, mid_p)
+        return (low_p + high_p) / 2.0
 
     def _find_power_for_lambda(self, seg: Segment, target_lambda: float, max_limit: float, v_in: float) -> float:
         """
@@ -346,15 +420,15 @@ class PhysicsEngineV5:
         return v_final, d/((v_curr+v_final)/2), False, p_target
 
     def simulate_course(self, segments: List[Segment], power_profile: List[float]) -> SimulationResult:
-        self.rider.reset_state()
+        state = self.rider.initial_state()
         total_time, total_work, weighted_power_sum = 0.0, 0.0, 0.0
         v_current = 0.1
         track_data = []
         for i, seg in enumerate(segments):
             p_target = power_profile[i] if i < len(power_profile) else 150.0
             v_next, time_sec, _, p_actual = self._solve_segment_physics(seg, p_target, v_current, 0, 9999.0)
-            self.rider.update_w_prime(p_actual, time_sec)
-            if self.rider.is_bonked(): return SimulationResult(total_time, 0, 0, 0, 0, 0, -1, False, "BONK")
+            state = self.rider.next_state(state, p_actual, time_sec)
+            if state.is_bonked(): return SimulationResult(total_time, 0, 0, 0, 0, 0, -1, False, "BONK")
             total_time += time_sec
             total_work += p_actual * time_sec
             weighted_power_sum += (p_actual ** 4) * time_sec
@@ -366,8 +440,6 @@ class PhysicsEngineV5:
         return SimulationResult(total_time, 0, avg_spd, avg_p, np, total_work/1000, 0, True, track_data=track_data)
 
     def _get_fatigue_adjusted_limit(self, duration_sec: float) -> float:
-        sorted_pdc = sorted([(int(k), v) for k, v in self.rider.pdc.items()])
-        if not sorted_pdc: return self.rider.cp
-        max_pdc_time, max_pdc_watts = sorted_pdc[-1]
-        if duration_sec > max_pdc_time: return max_pdc_watts * (duration_sec / max_pdc_time) ** -0.10
-        return self.rider.get_pdc_power(duration_sec)
\ No newline at end of file
+        curve = self.rider.pdc_curve
+        if not curve: return self.rider.cp
+        return curve.power(duration_sec, riegel_exponent=-0.10)
\ No newline at end of file
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+from typing import Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+class SearchProgress(NamedTuple):
+    """One outer-search probe, reported after the feasibility decision."""
+    iteration: int                  # 1-based
+    p_base: float                   # Candidate base power [W]
+    total_time_sec: float           # Finish time at this candidate
+    normalized_power: float         # NP at this candidate (p_base if NP is undefined)
+    pdc_limit: float                # Sustainable power for that duration [W]
+    feasible: bool                  # No bonk and NP <= limit
+    best_p_base: Optional[float]    # Highest feasible candidate so far (the current answer)
+    best_time_sec: Optional[float]
+    bracket_w: float                # Width of the remaining p_base bracket [W]
+
+ProgressCallback = Callable[[SearchProgress], None]
+
+class SearchCancelled(Exception):
+    """Raised from a progress callback to abandon the search."""
+
+class ProgressReporting:
+    """
+    Mixin for engines with an outer search: `set_progress(callback)` receives a
+    SearchProgress per probe (replaces the old debug prints, which now go to
+    the module logger at DEBUG level).
+    """
+
+    progress: Optional[ProgressCallback] = None
+
+    def set_progress(self, callback: Optional[ProgressCallback]):
+        self.progress = callback
+
+    def _report_progress(self, iteration: int, p_base: float, res, intensity: float, limit: float,
+                         feasible: bool, best, bracket_w: float):
+        logger.debug("[Binary Search #%d] P_base: %.1fW -> Time: %.0fs, NP: %.0fW / Limit: %.0fW",
+                     iteration, p_base, res.total_time_sec, intensity, limit)
+        if self.progress is None:
+            return
+        self.progress(SearchProgress(
+            iteration=iteration, p_base=p_base, total_time_sec=res.total_time_sec,
+            normalized_power=intensity, pdc_limit=limit, feasible=feasible,
+            best_p_base=best.base_power if best is not None else None,
+            best_time_sec=best.total_time_sec if best is not None else None,
+            bracket_w=bracket_w,
+        ))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import importlib
+import os
+from typing import Dict, List, Optional, Protocol, Type, runtime_checkable
+
+from src.core.rider import Rider
+from src.core.gpx_loader import Segment
+from src.engines.course import PreparedCourse
+
+@runtime_checkable
+class Engine(Protocol):
+    """
+    [Engine Protocol]
+    What the CLI, server and scripts rely on from a physics engine:
+      - prepare_course:      per-course constants (cached, shared by every probe of a search)
+      - simulate_course:     one run; the extra arguments are engine specific
+                             (p_base / max_power_limit, or a per-segment power profile)
+      - find_optimal_pacing: the full solver, returning the best feasible SimulationResult
+    """
+    rider: Rider
+    params: object
+
+    def prepare_course(self, segments: List[Segment]) -> PreparedCourse: ...
+
+    def simulate_course(self, segments: List[Segment], *args, **kwargs): ...
+
+    def find_optimal_pacing(self, segments: List[Segment]): ...
+
+# name -> "module:Class", imported on first use so that picking one engine
+# never pulls in (or breaks on) the others.
+ENGINES: Dict[str, str] = {
+    "v1": "src.engines.base:PhysicsEngine",
+    "v2": "src.engines.v2:PhysicsEngineV2",
+    "v3": "src.engines.legacy.v3:PhysicsEngineV3",
+    "v3_1": "src.engines.legacy.v3_1:PhysicsEngineV3_1",
+    "v4": "src.engines.legacy.v4:PhysicsEngineV4",
+    "v5": "src.engines.legacy.v5:PhysicsEngineV5",
+    "gordon": "src.engines.legacy.gordon:GordonTheoryEngine",
+    "theory": "src.engines.legacy.theory:TheoryEngine",
+}
+
+DEFAULT_ENGINE = os.environ.get("SIM_ENGINE", "v2")
+
+def register_engine(name: str, target) -> None:
+    """Register an engine class, or a "module:Class" path, under `name` (replaces an existing entry)."""
+    ENGINES[name] = target
+
+def available_engines() -> List[str]:
+    return sorted(ENGINES)
+
+def get_engine_class(name: Optional[str] = None) -> Type:
+    name = name or DEFAULT_ENGINE
+    try:
+        target = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine '{name}'. Available: {', '.join(available_engines())}") from None
+    if isinstance(target, str):
+        module_name, _, class_name = target.partition(":")
+        target = getattr(importlib.import_module(module_name), class_name)
+        ENGINES[name] = target
+    return target
+
+def create_engine(name: Optional[str], rider: Rider, params, weather_client=None):
+    """Instantiate the engine registered as `name` (DEFAULT_ENGINE / $SIM_ENGINE when None)."""
+    return get_engine_class(name)(rider, params, weather_client)
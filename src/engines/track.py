@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+class Track(Sequence):
+    """
+    [Columnar Track Data]
+    Per-segment simulation output stored as one NumPy array per field
+    (dist_km, ele, grade_pct, speed_kmh, power, time_sec, ...).
+
+    Reads like the old list of dicts (len, iteration, track[i]["power"]), so
+    existing consumers keep working, while the server can ship columns directly
+    (`to_columns`) and decimate without touching every row.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Mapping[str, Any]):
+        cols = {k: np.asarray(v, dtype=float) for k, v in columns.items()}
+        lengths = {len(v) for v in cols.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Track columns differ in length: {sorted(lengths)}")
+        self.columns: Dict[str, np.ndarray] = cols
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "Track":
+        rows = list(rows)
+        keys = list(rows[0].keys()) if rows else []
+        return cls({k: [r[k] for r in rows] for k in keys})
+
+    def __len__(self) -> int:
+        for v in self.columns.values():
+            return len(v)
+        return 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Track({k: v[index] for k, v in self.columns.items()})
+        return {k: float(v[index]) for k, v in self.columns.items()}
+
+    def __repr__(self) -> str:
+        return f"Track({len(self)} rows, columns={list(self.columns)})"
+
+    def rows(self) -> List[Dict[str, float]]:
+        """Legacy list-of-dicts form (what /api/simulate returned before)."""
+        keys = list(self.columns)
+        return [dict(zip(keys, values)) for values in zip(*(self.columns[k].tolist() for k in keys))]
+
+    def to_columns(self) -> Dict[str, List[float]]:
+        return {k: v.tolist() for k, v in self.columns.items()}
+
+    def take(self, indices) -> "Track":
+        idx = np.asarray(indices, dtype=int)
+        return Track({k: v[idx] for k, v in self.columns.items()})
+
+    def decimate_stride(self, stride: int) -> "Track":
+        """Every `stride`-th row, always keeping the last one."""
+        n = len(self)
+        if stride <= 1 or n <= 2:
+            return self
+        idx = np.arange(0, n, stride)
+        if idx[-1] != n - 1:
+            idx = np.append(idx, n - 1)
+        return self.take(idx)
+
+    def decimate(self, tolerance_m: float, x: str = "dist_km", y: str = "ele", x_scale: float = 1000.0) -> "Track":
+        """
+        Douglas-Peucker on the (distance, elevation) profile: drop rows whose elevation
+        lies within `tolerance_m` of the chord between the kept neighbours.
+        Rows are assumed to be ordered by distance, so the vertical offset from the
+        chord is used as the error (distances are km, elevations m).
+        """
+        n = len(self)
+        if tolerance_m <= 0 or n <= 2:
+            return self
+        xs = self.columns[x] * x_scale
+        ys = self.columns[y]
+        keep = np.zeros(n, dtype=bool)
+        keep[0] = keep[-1] = True
+
+        stack = [(0, n - 1)]
+        while stack:
+            i, j = stack.pop()
+            if j - i < 2:
+                continue
+            span = xs[j] - xs[i]
+            seg_x = xs[i + 1:j]
+            if span > 0:
+                chord = ys[i] + (ys[j] - ys[i]) * (seg_x - xs[i]) / span
+            else:
+                chord = np.full_like(seg_x, ys[i])
+            err = np.abs(ys[i + 1:j] - chord)
+            k = int(np.argmax(err))
+            if err[k] > tolerance_m:
+                m = i + 1 + k
+                keep[m] = True
+                stack.append((i, m))
+                stack.append((m, j))
+        return self.take(np.flatnonzero(keep))
+
+def track_from(data) -> Optional[Track]:
+    """Track from either a Track or a legacy list of row dicts (None stays None)."""
+    if data is None or isinstance(data, Track):
+        return data
+    return Track.from_rows(data)
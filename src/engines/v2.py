@@ -1,12 +1,32 @@
 from __future__ import annotations
 
 import math
+import time
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
-from src.core.rider import Rider
+from src.core.rider import Rider, RiderState
 from src.core.gpx_loader import Segment
 from src.services.weather import WeatherClient
+from src.services.weather_field import WeatherField
+from src.engines.course import (PreparedCourse, SegmentConstants, prepare_course, build_course, BRAKE_START_MS, CoursePreparation,
+                                CHUNK_MAX_DKE, CHUNK_MIN_DV, CHUNK_MIN_LENGTH, CHUNK_MAX_LENGTH, EQUILIBRIUM_TOL, EQUILIBRIUM_PROBE_MS,
+                                EQUILIBRIUM_LINEARITY)
+from src.core.atmosphere import weather_air_density
+from src.engines.flat_speed import solve_flat_speed
+from src.engines.tables import get_tables, DEFAULT_BRAKE_RESOLUTION_KMH, DEFAULT_GRADE_RESOLUTION
+from src.engines.track import Track
+from src.engines.instrumentation import EngineStats, INSTRUMENT_DEFAULT, bisection_steps, maybe_phase
+from src.engines.progress import ProgressReporting
+from src.engines.cancellation import Cancellable
+
+# Margin around [entry speed, coasting terminal speed] when bracketing a coasting chunk [m/s]
+COAST_BRACKET_MARGIN = 0.05
+
+# Outer p_base search bounds [W] and default iteration cap (1490 W / 2^15 = 0.05 W)
+P_BASE_LOW = 10.0
+P_BASE_HIGH = 1500.0
+SEARCH_MAX_ITERATIONS = 15
 
 @dataclass
 class PhysicsParams:
@@ -28,13 +48,23 @@ class SimulationResult:
     w_prime_min: float
     is_success: bool
     fail_reason: str = ""
-    track_data: List[Dict[str, Any]] = None
+    track_data: Optional[Track] = None    # Columnar; iterates like the old list of dicts
+    stats: Optional[Dict[str, Any]] = None    # EngineStats.as_dict() when instrumentation is on
+    interrupted: str = ""                     # "cancelled" / "deadline": search stopped early, best feasible so far
+    achieved_tolerance: Optional[Dict[str, Any]] = None   # Outer search precision at stop (see _binary_search_pacing)
 
-class PhysicsEngineV2:
+def _arrival_times(track: Track) -> List[float]:
+    """Elapsed time at each segment's midpoint, from a track's cumulative time_sec."""
+    ends = track.columns["time_sec"].tolist()
+    return [(start + end) * 0.5 for start, end in zip([0.0] + ends[:-1], ends)]
+
+class PhysicsEngineV2(CoursePreparation, ProgressReporting, Cancellable):
     def __init__(self, rider: Rider, params: PhysicsParams, weather_client: Optional[WeatherClient] = None):
         self.rider = rider
         self.params = params
         self.weather = weather_client
+        # Optional time-varying weather (overrides the global scenario wind when set)
+        self.weather_field: Optional[WeatherField] = None
         
         # [Pacing Strategy Parameters]
         self.alpha_climb = 0.0   
@@ -51,84 +81,205 @@ class PhysicsEngineV2:
         self.beta_slow = 0.6  
         self.beta_fast = 1.5  
 
+        # [Lookup Tables] Brake soft wall & coasting steady-state speed, per (mass, CdA)
+        self.set_table_resolution()
+
+        # [Instrumentation] None = off (see src/engines/instrumentation.py)
+        self.stats: Optional[EngineStats] = EngineStats() if INSTRUMENT_DEFAULT else None
+
+        # [Search Tolerance] Full-precision search by default
+        self.set_search_tolerance()
+
+        # [Sub-stepping] Adaptive chunk length by default
+        self.set_chunking()
+
     def set_tuning(self, mode: str, slow: float = 0.6, fast: float = 1.5, deadzone: float = 5.0):
         self.tuning_mode = mode
         self.beta_slow = slow
         self.beta_fast = fast
         self.deadzone_kmh = deadzone
 
-    def _calculate_flat_speed(self, power_watts: float) -> float:
+    def set_table_resolution(self, brake_kmh: float = DEFAULT_BRAKE_RESOLUTION_KMH, grade: float = DEFAULT_GRADE_RESOLUTION):
+        """Build (or reuse) the brake / steady-state speed tables at the given resolution."""
+        self.brake_table, self.speed_table = get_tables(
+            self.rider.weight + self.params.bike_weight,
+            self.params.cda * (1 - self.params.drafting_factor),
+            self.params.crr, self.params.air_density, brake_kmh, grade
+        )
+
+    def set_search_tolerance(self, max_iterations: int = SEARCH_MAX_ITERATIONS,
+                             time_tolerance_sec: float = 0.0, power_tolerance_w: float = 0.0):
+        """
+        Stopping rule of the outer search (SolverConfig fields): stop after `max_iterations`,
+        or once the finish time can change by less than `time_tolerance_sec` within the
+        remaining p_base bracket (bracket width x dT/dp_base of the last two feasible
+        probes), or once the bracket is narrower than `power_tolerance_w`.
+        0 disables a tolerance.
+        """
+        self.max_iterations = max(1, int(max_iterations))
+        self.time_tolerance_sec = time_tolerance_sec
+        self.power_tolerance_w = power_tolerance_w
+
+    def set_chunking(self, max_dke: float = CHUNK_MAX_DKE, equilibrium_tol: float = EQUILIBRIUM_TOL,
+                     min_dv: float = CHUNK_MIN_DV):
+        """
+        Chunk length rule of the segment solver: chunks are sized so that the predicted
+        kinetic energy change per chunk stays below `max_dke` x the entry kinetic energy
+        (short chunks through transitions, up to CHUNK_MAX_LENGTH at equilibrium speed).
+        At low speed that fraction is only a few hundredths of a m/s, so a chunk may
+        always change speed by `min_dv` [m/s]; this keeps slow climbs from being cut
+        into CHUNK_MIN_LENGTH slivers. max_dke=0 restores the fixed CHUNK_SIZE chunks.
+        Once the speed is within `equilibrium_tol` of the segment's equilibrium speed,
+        the remainder is integrated in one closed-form step (0 = always bisect).
+        Validated against the ODE reference by scripts/validate_chunking.py.
+        """
+        self.chunk_max_dke = max_dke
+        self.chunk_min_dv = min_dv
+        self.equilibrium_tol = equilibrium_tol
+
+    def set_weather_field(self, field: Optional[WeatherField]):
+        self.weather_field = field
+
+    def enable_instrumentation(self, enabled: bool = True):
+        """Switch hot-path counters on (fresh EngineStats) or off."""
+        self.stats = EngineStats() if enabled else None
+
+    def _segment_weather(self, segments: List[Segment],
+                         arrival_sec: Optional[List[float]] = None) -> Tuple[List[float], List[float]]:
+        """
+        Headwind [m/s] and drag scale (air density / prepared air density) per segment
+        from the weather field, at each segment's predicted arrival: `arrival_sec`
+        (elapsed time at the segment midpoints, normally from the previous probe's
+        track) or, without one, segment distance / current flat reference speed.
+        One vectorized lookup per simulate_course call.
+        """
+        mid_dist = [(s.start_dist + s.end_dist) * 0.5 for s in segments]
+        if arrival_sec is None:
+            v_pred = max(self.v_ref, 1.0)
+            arrival_sec = [d / v_pred for d in mid_dist]
+        headwinds = self.weather_field.headwind(mid_dist, arrival_sec, [s.heading for s in segments]).tolist()
+        rho = weather_air_density(segments, self.weather_field, arrival_sec).tolist()
+        default_rho = self.params.air_density
+        drag_scale = [r / (s.air_density if s.air_density > 0 else default_rho) for r, s in zip(rho, segments)]
+        return headwinds, drag_scale
+
+    def calculate_flat_speed(self, power_watts: float) -> float:
         """
         Calculates the steady-state speed on a flat road with no wind for a given power.
-        Solves: P = 0.5*rho*CdA*v^3 + Crr*m*g*v
+        Solves: P = 0.5*rho*CdA*v^3 + Crr*m*g*v (closed form, memoized; see solve_flat_speed)
         """
-        low = 0.0
-        high = 200.0 / 3.6 
-        
-        total_mass = self.rider.weight + self.params.bike_weight
-        eff_cda = self.params.cda
-        g = 9.81
-        p_avail = power_watts * (1 - self.params.drivetrain_loss)
-        
-        for _ in range(10):
-            mid = (low + high) / 2
-            if mid < 0.1: mid = 0.1
-            f_aero = 0.5 * self.params.air_density * eff_cda * (mid ** 2)
-            f_roll = total_mass * g * self.params.crr
-            p_req = (f_aero + f_roll) * mid
-            
-            if p_req > p_avail: high = mid
-            else: low = mid
-                
-        return (low + high) / 2
+        return solve_flat_speed(
+            power_watts, self.rider.weight + self.params.bike_weight, self.params.cda,
+            self.params.crr, self.params.air_density, self.params.drivetrain_loss
+        )
+
+    _calculate_flat_speed = calculate_flat_speed
 
     def find_optimal_pacing(self, segments: List[Segment]) -> SimulationResult:
-        low = 10.0
-        high = 1500.0
+        # Counters cover one search; a fresh set per call
+        if self.stats is not None:
+            self.stats = EngineStats()
+        stats = self.stats
+        with maybe_phase(stats, "search"):
+            result = self._binary_search_pacing(segments)
+        if stats is not None:
+            result.stats = stats.as_dict()
+        return result
+
+    def _binary_search_pacing(self, segments: List[Segment]) -> SimulationResult:
+        low = P_BASE_LOW
+        high = P_BASE_HIGH
         best_result: Optional[SimulationResult] = None
+        interrupted = ""
+        iterations = 0
+        time_slope = None       # |dT/dp_base| between the last two feasible probes [s/W]
+        time_error = math.inf   # Finish-time change still possible inside the bracket [s]
+        arrival = None          # Segment arrival times of the last probe (weather field lookups)
         
-        for i in range(15):
+        for i in range(self.max_iterations):
+            # Cancellation / deadline: keep the best feasible probe so far
+            interrupted = self._stop_reason() or ""
+            if interrupted:
+                break
+            if self.stats is not None:
+                self.stats.outer_iterations += 1
             mid = (low + high) / 2.0
             
             # [Adaptive V_ref Update]
-            self.v_ref = self._calculate_flat_speed(mid)
+            self.v_ref = self.calculate_flat_speed(mid)
             
-            res = self.simulate_course(segments, p_base=mid, max_power_limit=mid * 3.0)
+            res = self.simulate_course(segments, p_base=mid, max_power_limit=mid * 3.0, arrival_sec=arrival)
+            if self.weather_field is not None and res.track_data is not None:
+                arrival = _arrival_times(res.track_data)
             
             simulated_intensity = res.normalized_power if res.normalized_power > 0 else mid
             pdc_limit_watts = self._get_dynamic_pdc_limit(res.total_time_sec)
             
-            if not res.is_success or simulated_intensity > pdc_limit_watts:
+            feasible = res.is_success and simulated_intensity <= pdc_limit_watts
+            if not feasible:
                 high = mid 
             else:
+                if best_result is not None and mid != best_result.base_power:
+                    time_slope = abs(best_result.total_time_sec - res.total_time_sec) / abs(mid - best_result.base_power)
                 best_result = res
                 low = mid 
+            iterations = i + 1
+            self._report_progress(i + 1, mid, res, simulated_intensity, pdc_limit_watts, feasible, best_result, high - low)
+
+            if time_slope is not None:
+                time_error = time_slope * (high - low)
+            if high - low < self.power_tolerance_w or time_error < self.time_tolerance_sec:
+                break
         
-        return best_result if best_result else self.simulate_course(segments, low, low * 3.0)
+        if best_result is None and interrupted:
+            # Stopped before any feasible probe: there is no pacing plan to report
+            result = SimulationResult(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, False, fail_reason=interrupted)
+        else:
+            result = best_result if best_result else self.simulate_course(segments, low, low * 3.0, arrival_sec=arrival)
+        result.interrupted = interrupted
+        result.achieved_tolerance = {
+            "iterations": iterations,
+            "p_base_w": high - low,
+            "time_sec": time_error if math.isfinite(time_error) else None,
+        }
+        return result
 
     def _get_dynamic_pdc_limit(self, duration_sec: float) -> float:
-        sorted_pdc = sorted([(int(k), v) for k, v in self.rider.pdc.items()])
-        if not sorted_pdc: return self.rider.cp
-        max_pdc_time, max_pdc_watts = sorted_pdc[-1]
-        
-        if duration_sec > max_pdc_time:
-            # [Riegel Fatigue Model]
-            # 지수 -0.07은 엘리트 선수급, -0.10은 일반 동호인 수준의 피로 누적을 의미.
-            # 5시간 이상의 초장거리 주행 시 파워 저하를 더 현실적으로 반영하기 위해 -0.10 채택.
-            riegel_exponent = -0.10 
-            return max_pdc_watts * (duration_sec / max_pdc_time) ** riegel_exponent
-            
-        return self.rider.get_pdc_power(duration_sec)
+        curve = self.rider.pdc_curve
+        if not curve: return self.rider.cp
+
+        # [Riegel Fatigue Model] beyond the longest PDC duration
+        # 지수 -0.07은 엘리트 선수급, -0.10은 일반 동호인 수준의 피로 누적을 의미.
+        # 5시간 이상의 초장거리 주행 시 파워 저하를 더 현실적으로 반영하기 위해 -0.10 채택.
+        return curve.power(duration_sec, riegel_exponent=-0.10)
 
-    def simulate_course(self, segments: List[Segment], p_base: float, max_power_limit: float) -> SimulationResult:
-        self.rider.reset_state()
+    def simulate_course(self, segments: List[Segment], p_base: float, max_power_limit: float,
+                        state: Optional[RiderState] = None, record_track: bool = True,
+                        arrival_sec: Optional[List[float]] = None) -> SimulationResult:
+        """
+        One pass over the course at base power `p_base`. With a weather field, wind and
+        air density are looked up at `arrival_sec` (elapsed time at each segment's
+        midpoint, e.g. from a previous run's track; default: flat reference speed).
+        """
+        stats = self.stats
+        if stats is not None:
+            t_start = time.perf_counter()
+            stats.simulate_calls += 1
+
+        # Physiological state lives in this call only (the Rider is never mutated)
+        if state is None:
+            state = self.rider.initial_state()
         
         total_time = 0.0
         total_work = 0.0
         weighted_power_sum = 0.0
         v_current = 0.1 # Start from near-zero
-        min_w_prime = self.rider.w_prime_max
-        track_data = []
+        min_w_prime = state.w_prime_bal
+        # Columnar track: a few list appends per segment. Cheap enough to keep on every
+        # probe (<1 ms per Seorak run) - re-running the winning probe would cost a full
+        # simulation. record_track=False for callers that only need the totals.
+        if record_track:
+            tr_speed, tr_power, tr_time, tr_wbal = [], [], [], []
 
         wind_speed_global = 0.0
         wind_deg_global = 0.0
@@ -136,31 +287,30 @@ class PhysicsEngineV2:
              d = self.weather._get_scenario_weather()
              wind_speed_global = d['wind_speed']
              wind_deg_global = d['wind_deg']
+        headwinds = drag_scale = None
+        if self.weather_field is not None:
+            headwinds, drag_scale = self._segment_weather(segments, arrival_sec)
 
+        # Per-segment constants, built once per (course, rider, params) and shared by all probes
+        with maybe_phase(stats, "prepare_course"):
+            course = prepare_course(segments, self.rider.weight, self.params)
         f_max_initial = self.rider.weight * 9.81 * 1.5
-        prev_heading = segments[0].heading
 
-        for seg in segments:
-            # --- Cornering Speed Limit Logic (Restored from Jan 23) ---
-            heading_change = abs(seg.heading - prev_heading)
-            if heading_change > 180: heading_change = 360 - heading_change
-            
-            if seg.length > 0 and heading_change > 1.0: 
-                theta_rad = math.radians(heading_change)
-                curvature_rad = theta_rad / seg.length
-                
-                if curvature_rad > 0.0001:
-                    radius = 1.0 / curvature_rad
-                    mu = 0.8
-                    g = 9.81
-                    v_corner_limit = math.sqrt(mu * g * radius)
-                    v_current = min(v_current, v_corner_limit) 
-            
-            prev_heading = seg.heading
-            # ---------------------------------------------
+        for i, seg in enumerate(segments):
+            sc = course.segments[i]
+            if drag_scale is not None:
+                sc = sc._replace(k_drag=sc.k_drag * drag_scale[i])
+            # --- Cornering Speed Limit Logic (precomputed per segment) ---
+            if v_current > sc.v_corner_limit:
+                v_current = sc.v_corner_limit
+                if stats is not None:
+                    stats.corner_clamps += 1
 
-            rel_angle_rad = math.radians(wind_deg_global - seg.heading)
-            v_headwind_env = wind_speed_global * math.cos(rel_angle_rad)
+            if headwinds is not None:
+                v_headwind_env = headwinds[i]
+            else:
+                rel_angle_rad = math.radians(wind_deg_global - seg.heading)
+                v_headwind_env = wind_speed_global * math.cos(rel_angle_rad)
             
             decay_factor = 1.0
             if total_time > 3600:
@@ -168,39 +318,57 @@ class PhysicsEngineV2:
             current_f_limit = f_max_initial * decay_factor
             
             v_next, time_sec, is_walking, p_avg_segment = self._solve_segment_physics(
-                seg, p_base, v_current, v_headwind_env, current_f_limit, max_power_limit
+                seg, p_base, v_current, v_headwind_env, current_f_limit, max_power_limit, course, sc
             )
             
             p_actual = 30.0 if is_walking else p_avg_segment
             
-            self.rider.update_w_prime(p_actual, time_sec)
+            state = self.rider.next_state(state, p_actual, time_sec)
             
-            if self.rider.is_bonked():
+            if state.is_bonked():
+                if stats is not None:
+                    stats.segments += i + 1
+                    stats.phase_seconds["simulate"] = stats.phase_seconds.get("simulate", 0.0) + time.perf_counter() - t_start
                 return SimulationResult(total_time, p_base, 0, 0, 0, 0, -1, False, "BONK")
 
             total_time += time_sec
             total_work += p_actual * time_sec
             weighted_power_sum += (p_actual ** 4) * time_sec
-            min_w_prime = min(min_w_prime, self.rider.w_prime_bal)
-
-            track_data.append({
-                "dist_km": seg.end_dist / 1000.0,
-                "ele": seg.end_ele,
-                "grade_pct": seg.grade * 100,
-                "speed_kmh": (v_next + v_current) / 2 * 3.6,
-                "power": p_actual,
-                "time_sec": total_time,
-                "w_prime_bal": self.rider.w_prime_bal
-            })
+            min_w_prime = min(min_w_prime, state.w_prime_bal)
+
+            if record_track:
+                tr_speed.append((v_next + v_current) / 2 * 3.6)
+                tr_power.append(p_actual)
+                tr_time.append(total_time)
+                tr_wbal.append(state.w_prime_bal)
             v_current = v_next
             
         avg_p = total_work / total_time if total_time > 0 else 0
         np = math.pow(weighted_power_sum / total_time, 0.25) if total_time > 0 else 0
-        dist_km = sum(s.length for s in segments) / 1000.0
-        avg_spd = (dist_km * 3600) / total_time if total_time > 0 else 0
+        avg_spd = (course.total_dist_km * 3600) / total_time if total_time > 0 else 0
+
+        track_data = None
+        if record_track:
+            track_data = Track({
+                "dist_km": [s.end_dist / 1000.0 for s in segments],
+                "ele": [s.end_ele for s in segments],
+                "grade_pct": [s.grade * 100 for s in segments],
+                "speed_kmh": tr_speed,
+                "power": tr_power,
+                "time_sec": tr_time,
+                "w_prime_bal": tr_wbal
+            })
+
+        if stats is not None:
+            stats.segments += len(segments)
+            stats.phase_seconds["simulate"] = stats.phase_seconds.get("simulate", 0.0) + time.perf_counter() - t_start
         
         return SimulationResult(total_time, p_base, avg_spd, avg_p, np, total_work/1000, min_w_prime, True, track_data=track_data)
 
+    def _is_coasting(self, grade: float) -> bool:
+        """True when the pacing function returns 0 W at every speed on this grade."""
+        return grade < -0.05
+
     def _calculate_target_power_dynamic(self, p_base: float, grade: float, max_limit: float, current_v: float) -> float:
         """
         [Dynamic Pacing Function with Tuning Modes]
@@ -250,20 +418,56 @@ class PhysicsEngineV2:
             return min(target, max_limit)
         return target
 
-    def _solve_segment_physics(self, seg: Segment, p_base: float, v_entry: float, v_wind: float, f_limit: float, max_power_limit: float) -> Tuple[float, float, bool, float]:
+    def _solve_segment_physics(self, seg: Segment, p_base: float, v_entry: float, v_wind: float, f_limit: float, max_power_limit: float,
+                               course: Optional[PreparedCourse] = None, sc: Optional[SegmentConstants] = None) -> Tuple[float, float, bool, float]:
         """
         [Nested Solver Implementation]
+        `course`/`sc` carry the precomputed constants; when omitted (e.g. scripts
+        probing a single segment) they are built on the fly.
+
+        The segment is integrated chunk by chunk (energy balance over each chunk,
+        solved for the exit speed by bisection). Chunk lengths follow set_chunking:
+        the kinetic energy change predicted from the net force at chunk entry is kept
+        below `chunk_max_dke` x KE (or a `chunk_min_dv` speed change, whichever is
+        larger), so steady stretches take one long chunk and transitions (e.g. a ramp
+        right after a descent) get short ones.
+
+        [Equilibrium Shortcut] With F(v) the net force at target power, a chunk that
+        starts close to v_eq (F(v_eq) = 0) ends the segment: linearizing
+        F ~ -k (v - v_eq) makes the approach to v_eq exponential in time (tau = m / k),
+        and the remaining distance is covered in that one closed-form step instead of
+        chunk by chunk.
         """
-        g = 9.81
-        total_mass = self.rider.weight + self.params.bike_weight
-        eff_cda = self.params.cda * (1 - self.params.drafting_factor)
-        f_gravity = total_mass * g * seg.grade
-        f_roll = total_mass * g * self.params.crr
-        
-        chunk_size = 20.0
-        num_chunks = max(1, math.ceil(seg.length / chunk_size))
-        d_sub = seg.length / num_chunks
+        if course is None or sc is None:
+            course = build_course([seg], self.rider.weight, self.params)
+            sc = course.segments[0]
+
+        half_mass = 0.5 * course.total_mass
+        f_gravity = sc.f_gravity
+        f_roll = course.f_roll
+        # Per-segment 0.5 * rho * CdA (air density from course preparation, see src/core/atmosphere.py)
+        k_drag = sc.k_drag
+        brake_coef = course.brake_coef
+        eff_loss = course.eff_loss
+        max_dke = self.chunk_max_dke
+        dke_floor = 2.0 * half_mass * self.chunk_min_dv   # KE change of a min_dv step is m * v * dv
+        eq_tol = self.equilibrium_tol
+        d_sub = sc.d_sub    # Fixed chunking (max_dke = 0)
+        coasting = self._is_coasting(seg.grade)
+        v_coast = self.speed_table.speed(seg.grade) if coasting else 0.0
+        stats = self.stats
+
+        def net_force(v: float) -> float:
+            """Net force at speed v under the target power (pedal, drag, gravity, roll, brake)."""
+            p = 0.0 if coasting else self._calculate_target_power_dynamic(p_base, seg.grade, max_power_limit, current_v=v)
+            v_air = v + v_wind
+            f = min(p * eff_loss / v, f_limit) - k_drag * (v_air * abs(v_air)) - f_gravity - f_roll
+            if v > BRAKE_START_MS:
+                f -= brake_coef * ((v * 3.6 - 50.0) ** 1.2)
+            return f
         
+        remaining = seg.length
+        num_chunks = 0
         v_current = v_entry
         t_total = 0.0
         is_walking = False
@@ -271,12 +475,83 @@ class PhysicsEngineV2:
         accumulated_power = 0.0
         first_raw_speed = None
 
-        for _ in range(num_chunks):
+        while True:
+            v0 = v_current if v_current > 0.1 else 0.1
+            f0 = net_force(v0) if (max_dke > 0 or eq_tol > 0) else 0.0
+
+            if eq_tol > 0 and v_current > min_speed_ms:
+                # [Equilibrium Shortcut] One Newton step towards F(v_eq) = 0, accepted when
+                # F is close enough to linear that the step actually lands there
+                slope = (net_force(v0 + EQUILIBRIUM_PROBE_MS) - f0) / EQUILIBRIUM_PROBE_MS
+                v_eq = v0 - f0 / slope if slope < 0 else 0.0
+                if abs(v_eq - v0) <= eq_tol * v0 and v_eq > min_speed_ms:
+                    linear = abs(v_eq - v0) < 0.005     # Already there (bisection resolution)
+                    if not linear:
+                        f_eq = net_force(v_eq)
+                        linear = abs(f_eq) <= EQUILIBRIUM_LINEARITY * abs(f0)
+                        if linear:
+                            # Secant refinement: the tail of the segment runs at v_eq
+                            slope = (f_eq - f0) / (v_eq - v0)
+                            v_eq -= f_eq / slope
+                    if linear:
+                        dv0 = v0 - v_eq
+                        # m dv/dt = -k (v - v_eq): v = v_eq + dv0 * exp(-t / tau), tau = m / k,
+                        # x(t) = v_eq * t + tau * dv0 * (1 - exp(-t / tau)); solve x(t) = remaining
+                        tau = 2.0 * half_mass / -slope
+                        t_step = remaining / v_eq
+                        for _ in range(8):
+                            decay = math.exp(-t_step / tau)
+                            dt = (v_eq * t_step + tau * dv0 * (1.0 - decay) - remaining) / (v_eq + dv0 * decay)
+                            t_step -= dt
+                            if abs(dt) < 1e-4: break
+                        v_next = v_eq + dv0 * math.exp(-t_step / tau)
+                        t_total += t_step
+                        p_final_chunk = 0.0 if coasting else self._calculate_target_power_dynamic(
+                            p_base, seg.grade, max_power_limit, current_v=(v0 + v_next) / 2)
+                        accumulated_power += p_final_chunk * remaining
+                        v_current = v_next
+                        num_chunks += 1
+                        if stats is not None:
+                            stats.equilibrium_shortcuts += 1
+                            if v_next > BRAKE_START_MS:
+                                stats.brake_activations += 1
+                        break
+
+            if max_dke > 0:
+                # [Adaptive Chunk] |F_net| * d <= max_dke * KE, with F_net at the chunk entry
+                dke_max = max_dke * half_mass * v0 * v0
+                if dke_max < dke_floor * v0:
+                    dke_max = dke_floor * v0
+                if f0 < 0 and v_current <= min_speed_ms:
+                    d_sub = CHUNK_MAX_LENGTH    # Walking: speed stays clamped at min_speed_ms
+                elif abs(f0) * CHUNK_MAX_LENGTH > dke_max:
+                    d_sub = dke_max / abs(f0)
+                else:
+                    d_sub = CHUNK_MAX_LENGTH
+                if d_sub < CHUNK_MIN_LENGTH:
+                    d_sub = CHUNK_MIN_LENGTH
+                if remaining - d_sub < CHUNK_MIN_LENGTH:
+                    d_sub = remaining   # No sliver chunk at the end
+            num_chunks += 1
+
             low = 0.01
             high = 45.0 
             
             v_next = v_current
             p_final_chunk = p_base 
+            ke_initial = half_mass * (v_current ** 2)
+
+            if coasting:
+                # [Steady-State Bracket] The root lies between the entry speed and the
+                # tabulated terminal speed. Use the narrow bracket only if it verifiably
+                # contains the root, otherwise keep the full [0.01, 45] range.
+                a = max(low, min(v_current, v_coast) - COAST_BRACKET_MARGIN)
+                b = min(high, max(v_current, v_coast) + COAST_BRACKET_MARGIN)
+                if (self._coast_residual(a, v_current, ke_initial, v_wind, course, sc, d_sub) > 0.0
+                        and self._coast_residual(b, v_current, ke_initial, v_wind, course, sc, d_sub) <= 0.0):
+                    low, high = a, b
+                    p_final_chunk = 0.0
+            bracket_width = high - low
             
             for _i in range(15): 
                 if (high - low) < 0.005: break
@@ -284,27 +559,24 @@ class PhysicsEngineV2:
                 
                 # Dynamic Power Calculation using Tuning Mode
                 p_dynamic = self._calculate_target_power_dynamic(p_base, seg.grade, max_power_limit, current_v=mid_v)
-                p_avail = p_dynamic * (1 - self.params.drivetrain_loss)
+                p_avail = p_dynamic * eff_loss
                 
                 v_avg = (v_current + mid_v) / 2
                 if v_avg < 0.1: v_avg = 0.1
                 
                 f_pedal = min(p_avail / v_avg, f_limit)
                 v_air = v_avg + v_wind
-                f_drag = 0.5 * self.params.air_density * eff_cda * (v_air * abs(v_air))
+                f_drag = k_drag * (v_air * abs(v_air))
                 
                 # --- Downhill Braking Logic (Soft Wall @ 80km/h) ---
+                # Deceleration a = 0.22 * (V - 50)^1.2 (km/h per sec)
                 f_brake = 0.0
-                if mid_v > 13.8889: # 50 km/h
-                    v_avg_kmh = mid_v * 3.6
-                    # Deceleration a = 0.22 * (V - 50)^1.2 (km/h per sec)
-                    a_brake_ms2 = (0.22 * ((v_avg_kmh - 50.0) ** 1.2)) / 3.6
-                    f_brake = total_mass * a_brake_ms2
+                if mid_v > BRAKE_START_MS: # 50 km/h
+                    f_brake = brake_coef * ((mid_v * 3.6 - 50.0) ** 1.2)
 
                 f_net = f_pedal - f_drag - f_gravity - f_roll - f_brake
                 work_net = f_net * d_sub
-                ke_initial = 0.5 * total_mass * (v_current ** 2)
-                ke_final_target = 0.5 * total_mass * (mid_v ** 2)
+                ke_final_target = half_mass * (mid_v ** 2)
                 
                 if (ke_initial + work_net) > ke_final_target:
                     low = mid_v
@@ -314,19 +586,44 @@ class PhysicsEngineV2:
             
             v_next = (low + high) / 2
             raw_v_next = v_next
+            if stats is not None:
+                stats.bisection_iterations += bisection_steps(bracket_width, 0.005, 15)
+                if v_next > BRAKE_START_MS:
+                    stats.brake_activations += 1
             
             if v_next < min_speed_ms:
                 v_next = min_speed_ms
                 is_walking = True
                 if first_raw_speed is None: first_raw_speed = raw_v_next
+                if stats is not None:
+                    stats.walking_clamps += 1
             
             v_avg_chunk = (v_current + v_next) / 2
             if v_avg_chunk < 0.1: v_avg_chunk = 0.1
             t_total += d_sub / v_avg_chunk
-            accumulated_power += p_final_chunk
+            accumulated_power += p_final_chunk * d_sub
             v_current = v_next
+
+            remaining -= d_sub
+            if remaining <= 1e-6:
+                break
             
+        if stats is not None:
+            stats.chunks += num_chunks
         final_raw_return = first_raw_speed if first_raw_speed is not None else v_next
-        p_avg_total = accumulated_power / num_chunks
+        # Distance-weighted over the chunks (= plain mean for equal chunks)
+        p_avg_total = accumulated_power / seg.length if seg.length > 0 else p_final_chunk
         
         return v_current, t_total, is_walking, p_avg_total
+
+    def _coast_residual(self, v_next: float, v_current: float, ke_initial: float, v_wind: float,
+                        course: PreparedCourse, sc: SegmentConstants, d_sub: float) -> float:
+        """Energy balance (initial KE + net work - final KE) of a zero-power chunk ending at v_next."""
+        v_avg = (v_current + v_next) / 2
+        if v_avg < 0.1: v_avg = 0.1
+        v_air = v_avg + v_wind
+        f_brake = 0.0
+        if v_next > BRAKE_START_MS:
+            f_brake = course.brake_coef * ((v_next * 3.6 - 50.0) ** 1.2)
+        f_net = -sc.k_drag * (v_air * abs(v_air)) - sc.f_gravity - course.f_roll - f_brake
+        return ke_initial + f_net * d_sub - 0.5 * course.total_mass * (v_next ** 2)
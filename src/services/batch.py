@@ -0,0 +1,201 @@
+"""
+[Batch Simulation]
+One course, many riders ("run this course for the whole club").
+
+The course is prepared once by the caller (segments, weather field, air density)
+and pickled once per batch; each worker unpickles it on its first job of the batch
+and keeps it for the rest, so a job only adds the rider and engine settings.
+Results come back in completion order, so the server can stream them as NDJSON
+while the rest run.
+
+All batches share one process pool (get_pool / shutdown_pool, started and stopped
+by the server lifespan). Its workers come from a forkserver, never from a fork of
+the multithreaded server, so they cannot inherit a lock held by another thread
+(the course cache, the weather client). SIM_BATCH_WORKERS sets the pool size
+(0 = one per CPU).
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from src.core.gpx_loader import Segment
+from src.config.simulation import SolverConfig
+from src.core.rider import Rider
+from src.engines.cancellation import CancelToken
+from src.engines.registry import create_engine
+from src.engines.track import track_from
+from src.engines.v2 import PhysicsParams
+
+BATCH_WORKERS = int(os.environ.get("SIM_BATCH_WORKERS", "0"))
+
+@dataclass
+class BatchJob:
+    index: int                          # Position in the request (results arrive out of order)
+    rider: Dict[str, Any]               # RiderInput fields: weight_kg, cp, bike_weight, w_prime, pdc
+    engine: str
+    job_id: Optional[str] = None        # Caller's label for the rider, echoed back
+    instrument: Optional[bool] = None
+    timeout_sec: Optional[float] = None # Solver budget, counted from when the job starts
+    solver: Optional[SolverConfig] = None   # Search stopping rule (None = engine default)
+
+@dataclass
+class _Course:
+    segments: List[Segment]
+    weather_field: Any = None
+    resolution: Optional[float] = None
+    track_format: str = "rows"
+    include_track: bool = True
+
+def make_engine(engine_name: str, rider: Mapping[str, Any], instrument: Optional[bool] = None, weather_field=None,
+                cancel_token: Optional[CancelToken] = None, solver: Optional[SolverConfig] = None):
+    """Engine configured the way /api/simulate runs it. Raises ValueError for an unknown engine."""
+    r = Rider(weight=rider["weight_kg"], cp=rider["cp"], w_prime_max=rider.get("w_prime", 20000.0),
+              pdc=rider.get("pdc") or {})
+    engine = create_engine(engine_name, r, PhysicsParams(bike_weight=rider.get("bike_weight", 8.5)))
+
+    # [ENGINE V2 CONFIG] (V2 family only)
+    # Use Asymmetric Mode as it proved to be the most efficient in sensitivity tests.
+    # slow=0.6 (Climbing), fast=1.5 (Descending)
+    if hasattr(engine, "set_tuning"):
+        engine.set_tuning(mode='asymmetric', slow=0.6, fast=1.5)
+    if instrument is not None and hasattr(engine, "enable_instrumentation"):
+        engine.enable_instrumentation(instrument)
+    if weather_field is not None and hasattr(engine, "set_weather_field"):
+        engine.set_weather_field(weather_field)
+    if cancel_token is not None and hasattr(engine, "set_cancel_token"):
+        engine.set_cancel_token(cancel_token)
+    if solver is not None and hasattr(engine, "set_search_tolerance"):
+        engine.set_search_tolerance(solver.max_iterations, solver.time_tolerance_sec, solver.power_tolerance_w)
+    return engine
+
+def track_payload(track_data, resolution: Optional[float], track_format: str):
+    track = track_from(track_data)
+    if track is None:
+        return None
+    if resolution:
+        track = track.decimate(resolution)
+    # Columns go out as NumPy arrays (serialized natively by FastJSONResponse)
+    return dict(track.columns) if track_format == "columnar" else track.rows()
+
+def result_payload(result_obj, resolution: Optional[float] = None, track_format: str = "rows",
+                   include_track: bool = True) -> Dict[str, Any]:
+    """The /api/simulate response body for one engine result."""
+    result = {
+        "total_time_sec": result_obj.total_time_sec,
+        "avg_speed_kmh": result_obj.average_speed_kmh,
+        "avg_power": result_obj.average_power,
+        "normalized_power": result_obj.normalized_power,
+        "work_kj": result_obj.work_kj,
+        "w_prime_min": result_obj.w_prime_min,
+        "is_success": result_obj.is_success,
+        "fail_reason": result_obj.fail_reason,
+    }
+    if include_track:
+        result["track_data"] = track_payload(result_obj.track_data, resolution, track_format)
+    stats = getattr(result_obj, "stats", None)
+    if stats is not None:
+        result["stats"] = stats
+    achieved = getattr(result_obj, "achieved_tolerance", None)
+    if achieved is not None:
+        result["achieved_tolerance"] = achieved
+    interrupted = getattr(result_obj, "interrupted", "")
+    if interrupted:
+        result["interrupted"] = interrupted     # Search stopped early: best feasible result so far
+    return result
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared batch pool, started on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload([__name__])    # Workers fork with the engines already imported
+            _POOL = ProcessPoolExecutor(max_workers=BATCH_WORKERS or os.cpu_count() or 1, mp_context=ctx)
+        return _POOL
+
+def shutdown_pool(wait: bool = True):
+    """Stop the shared pool (pending jobs are cancelled); the next get_pool() starts a new one."""
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+# The current batch's course in each worker: (batch key, course)
+_WORKER_COURSE: Optional[Tuple[str, _Course]] = None
+
+def _run_job(job: BatchJob, course: _Course) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"index": job.index, "id": job.job_id, "engine": job.engine}
+    try:
+        token = CancelToken(job.timeout_sec) if job.timeout_sec else None
+        engine = make_engine(job.engine, job.rider, job.instrument, course.weather_field, token, job.solver)
+        res = engine.find_optimal_pacing(course.segments)
+        out.update(result_payload(res, course.resolution, course.track_format, course.include_track))
+    except Exception as e:     # One bad rider must not end the whole batch
+        out["error"] = f"{type(e).__name__}: {e}"
+    return out
+
+def _run_pooled_job(job: BatchJob, batch_key: str, course_blob: bytes) -> Dict[str, Any]:
+    global _WORKER_COURSE
+    if _WORKER_COURSE is None or _WORKER_COURSE[0] != batch_key:
+        _WORKER_COURSE = (batch_key, pickle.loads(course_blob))
+    return _run_job(job, _WORKER_COURSE[1])
+
+def submit_batch(segments: List[Segment], jobs: List[BatchJob], weather_field=None,
+                 resolution: Optional[float] = None, track_format: str = "rows", include_track: bool = True,
+                 executor: Optional[ProcessPoolExecutor] = None) -> List[Future]:
+    """
+    Queue every job on the shared pool (or `executor`); one future per job, in job order.
+    Each future's result is the job's payload (`index`/`id` identify it; failed jobs carry `error`).
+    """
+    course = _Course(segments, weather_field, resolution, track_format, include_track)
+    blob = pickle.dumps(course, protocol=pickle.HIGHEST_PROTOCOL)
+    key = uuid.uuid4().hex
+    pool = executor or get_pool()
+    try:
+        return [pool.submit(_run_pooled_job, job, key, blob) for job in jobs]
+    except BrokenProcessPool:
+        if executor is not None:
+            raise
+        # A worker died (OOM kill, ...): replace the shared pool once and resubmit
+        shutdown_pool(wait=False)
+        pool = get_pool()
+        return [pool.submit(_run_pooled_job, job, key, blob) for job in jobs]
+
+def cancel_batch(futures: List[Future]):
+    """Drop the jobs that have not started; running ones finish (bounded by their timeout_sec)."""
+    for fut in futures:
+        fut.cancel()
+
+def run_batch(segments: List[Segment], jobs: List[BatchJob], weather_field=None,
+              resolution: Optional[float] = None, track_format: str = "rows", include_track: bool = True,
+              max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Simulate every job on the same prepared course, yielding one payload per job
+    as it finishes. max_workers=1 (or a single job) runs in-process; otherwise the
+    jobs go to the shared pool. Closing the iterator early cancels the jobs that
+    have not started yet.
+    """
+    if max_workers == 1 or len(jobs) == 1:
+        course = _Course(segments, weather_field, resolution, track_format, include_track)
+        for job in jobs:
+            yield _run_job(job, course)
+        return
+
+    futures = submit_batch(segments, jobs, weather_field, resolution, track_format, include_track)
+    try:
+        for fut in as_completed(futures):
+            yield fut.result()
+    finally:
+        cancel_batch(futures)
@@ -0,0 +1,55 @@
+"""
+[Prepared Course Cache]
+course_id -> physics segments built from the stored Standard Course JSON
+(Valhalla's own segmentation, no re-compression), kept in a process-wide LRU so
+repeated simulations of an uploaded course skip both the storage read and the parse.
+"""
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from src.core.gpx_loader import GpxLoader, Segment
+from src.core.storage import get_storage
+from src.services.transport import course_filename
+
+_CACHE: "OrderedDict[str, Tuple[Segment, ...]]" = OrderedDict()
+_CACHE_MAX = int(os.environ.get("SIM_COURSE_CACHE_SIZE", "64"))
+_CACHE_LOCK = threading.Lock()
+
+class CourseNotFound(KeyError):
+    pass
+
+def _build_segments(course_id: str) -> Tuple[Segment, ...]:
+    filename = course_filename(course_id)
+    storage = get_storage()
+    if not storage.exists(filename):
+        raise CourseNotFound(course_id)
+    loader = GpxLoader("")
+    loader.load_from_standard_json(storage.load(filename))
+    return tuple(loader.segments)
+
+def get_course_segments(course_id: str) -> List[Segment]:
+    """
+    Segments for an uploaded course. Returns fresh copies: per-request preparation
+    (e.g. assign_air_density) mutates segments and must not leak into the cache.
+    Raises ValueError for a malformed id, CourseNotFound if it was never uploaded.
+    """
+    with _CACHE_LOCK:
+        segments = _CACHE.get(course_id)
+        if segments is not None:
+            _CACHE.move_to_end(course_id)
+    if segments is None:
+        segments = _build_segments(course_id)
+        with _CACHE_LOCK:
+            _CACHE[course_id] = segments
+            while len(_CACHE) > _CACHE_MAX:
+                _CACHE.popitem(last=False)
+    return [copy.copy(s) for s in segments]
+
+def clear_course_cache():
+    with _CACHE_LOCK:
+        _CACHE.clear()
@@ -0,0 +1,70 @@
+"""
+[Fast JSON Responses]
+orjson-based encoding for the large float payloads (simulation track, Standard Course JSON).
+
+- NumPy arrays are serialized natively (no .tolist() round trip).
+- Floats are rounded to JSON_FLOAT_DIGITS decimals first: all-float lists are
+  rounded as one NumPy array, so the cost stays vectorized. 6 decimals keeps lat/lon
+  at ~0.1 m. Set SIM_JSON_FLOAT_DIGITS=-1 to send full precision.
+- Falls back to the standard library encoder when orjson is not installed.
+
+Endpoints should return `FastJSONResponse(content)` directly: a plain dict return
+would go through FastAPI's jsonable_encoder first, which is the slow part.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:     # optional dependency
+    orjson = None
+
+_digits_env = int(os.environ.get("SIM_JSON_FLOAT_DIGITS", "6"))
+JSON_FLOAT_DIGITS: Optional[int] = _digits_env if _digits_env >= 0 else None
+
+def round_floats(obj: Any, digits: Optional[int] = JSON_FLOAT_DIGITS) -> Any:
+    """Copy of `obj` with floats rounded; float lists / arrays become rounded float64 arrays."""
+    if digits is None:
+        return obj
+    if isinstance(obj, float):
+        return round(obj, digits)
+    if isinstance(obj, np.ndarray):
+        return np.round(obj, digits) if obj.dtype.kind == "f" else obj
+    if isinstance(obj, dict):
+        return {k: round_floats(v, digits) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        # Vectorize only all-float lists: a forced float cast would turn ints, numeric
+        # strings and None into floats / NaN
+        if obj and isinstance(obj[0], float) and all(isinstance(v, float) for v in obj):
+            return np.round(np.asarray(obj, dtype=float), digits)
+        return [round_floats(v, digits) for v in obj]
+    return obj
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(content: Any, digits: Optional[int] = JSON_FLOAT_DIGITS, indent: bool = False) -> bytes:
+    content = round_floats(content, digits)
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(content, default=_default, option=option)
+    return json.dumps(content, default=_default, ensure_ascii=False,
+                      indent=2 if indent else None).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
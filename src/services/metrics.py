@@ -0,0 +1,69 @@
+"""
+[Prometheus Metrics]
+Process-wide accumulation of engine instrumentation counters, exposed in the
+Prometheus text exposition format (no client library needed).
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Tuple
+
+PREFIX = "bike_sim"
+
+# EngineStats field -> help text (exported as <PREFIX>_<field>_total{engine=...})
+COUNTERS = {
+    "outer_iterations": "Outer pacing search iterations",
+    "simulate_calls": "simulate_course calls",
+    "segments": "Segments simulated",
+    "chunks": "Chunks simulated",
+    "bisection_iterations": "Inner speed bisection iterations",
+    "walking_clamps": "Chunks clamped to walking speed",
+    "corner_clamps": "Segment entries capped by the cornering limit",
+    "brake_activations": "Chunks ending in the soft-wall brake zone",
+    "equilibrium_shortcuts": "Segment remainders integrated in closed form",
+}
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = {}
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._phases: Dict[Tuple[str, str], float] = {}
+
+    def observe(self, engine: str, stats: Dict[str, Any] = None):
+        """Count one simulation request, adding its EngineStats.as_dict() if available."""
+        with self._lock:
+            self._requests[engine] = self._requests.get(engine, 0) + 1
+            if not stats:
+                return
+            for name in COUNTERS:
+                key = (name, engine)
+                self._counters[key] = self._counters.get(key, 0) + stats.get(name, 0)
+            for phase, sec in stats.get("phase_seconds", {}).items():
+                key = (phase, engine)
+                self._phases[key] = self._phases.get(key, 0.0) + sec
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [f"# HELP {PREFIX}_requests_total Simulation requests",
+                     f"# TYPE {PREFIX}_requests_total counter"]
+            for engine, n in sorted(self._requests.items()):
+                lines.append(f'{PREFIX}_requests_total{{engine="{engine}"}} {n}')
+
+            for name, help_text in COUNTERS.items():
+                lines.append(f"# HELP {PREFIX}_{name}_total {help_text}")
+                lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+                for (counter, engine), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f'{PREFIX}_{name}_total{{engine="{engine}"}} {value:g}')
+
+            lines.append(f"# HELP {PREFIX}_phase_seconds_total Wall time per engine phase")
+            lines.append(f"# TYPE {PREFIX}_phase_seconds_total counter")
+            for (phase, engine), sec in sorted(self._phases.items()):
+                lines.append(f'{PREFIX}_phase_seconds_total{{engine="{engine}",phase="{phase}"}} {sec:.6f}')
+        return "\n".join(lines) + "\n"
+
+_REGISTRY = MetricsRegistry()
+
+def get_metrics() -> MetricsRegistry:
+    return _REGISTRY
@@ -0,0 +1,35 @@
+"""
+[Compact Request Transport]
+Helpers for the array-based /api/simulate inputs:
+  - packed arrays: base64 of little-endian float32 (or float64) values, one string per column
+  - course ids:    "course_<sha256>" as returned by /api/upload_gpx (the storage file name stem)
+"""
+from __future__ import annotations
+
+import base64
+import re
+from typing import Sequence
+
+import numpy as np
+
+PACKED_DTYPES = {"float32": "<f4", "float64": "<f8"}
+COURSE_ID_RE = re.compile(r"^course_[0-9a-f]{64}$")
+
+def pack_array(values: Sequence[float], dtype: str = "float32") -> str:
+    return base64.b64encode(np.asarray(values, dtype=PACKED_DTYPES[dtype]).tobytes()).decode("ascii")
+
+def unpack_array(data: str, dtype: str = "float32") -> np.ndarray:
+    """Decode a packed column to float64 (ValueError on unknown dtype / truncated data)."""
+    if dtype not in PACKED_DTYPES:
+        raise ValueError(f"Unknown packed dtype '{dtype}' (expected one of {', '.join(PACKED_DTYPES)})")
+    raw = base64.b64decode(data, validate=True)
+    width = np.dtype(PACKED_DTYPES[dtype]).itemsize
+    if len(raw) % width:
+        raise ValueError(f"Packed data length {len(raw)} is not a multiple of {width} bytes")
+    return np.frombuffer(raw, dtype=PACKED_DTYPES[dtype]).astype(float)
+
+def course_filename(course_id: str) -> str:
+    """Storage file name for a course id; rejects anything that is not a course hash."""
+    if not COURSE_ID_RE.match(course_id or ""):
+        raise ValueError(f"Invalid course id: {course_id!r}")
+    return f"{course_id}.json"
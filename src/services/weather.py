@@ -1,46 +1,88 @@
 from __future__ import annotations
 
+import os
 import json
-import urllib.request
-import urllib.parse
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+import time
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import httpx
+
+# --- Configuration (Environment Variables) ---
+WEATHER_CACHE_DIR = os.environ.get("WEATHER_CACHE_DIR", "")                  # empty = memory cache only
+WEATHER_CACHE_TTL = float(os.environ.get("WEATHER_CACHE_TTL", 6 * 3600))    # seconds
+WEATHER_CACHE_SIZE = int(os.environ.get("WEATHER_CACHE_SIZE", 2048))        # in-memory (location, day) entries
+WEATHER_COORD_DECIMALS = int(os.environ.get("WEATHER_COORD_DECIMALS", 2))   # ~1.1 km, finer than the model grid
+
+HOURLY_FIELDS = "temperature_2m,surface_pressure,windspeed_10m,winddirection_10m"
+DEFAULT_WEATHER = {"wind_speed": 0.0, "wind_deg": 0.0, "temperature": 15.0, "pressure": 1013.0}
 
 class WeatherClient:
     """
     Client for Open-Meteo API to fetch historical or forecast weather data.
     Designed to work without an API key for the free tier.
+
+    Responses are cached per (rounded lat, rounded lon, UTC date) as one day of
+    pre-parsed hourly data, in memory (LRU, at most `cache_size` entries) and
+    optionally on disk, with a TTL.
+    Lookups of a single moment are then a binary search over the cached hours.
+    One client can be shared across threads (the server keeps a single instance).
     """
-    
+
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
-    
-    def __init__(self, use_scenario_mode: bool = False, scenario_data: Optional[Dict[str, float]] = None):
+
+    def __init__(self, use_scenario_mode: bool = False, scenario_data: Optional[Dict[str, float]] = None,
+                 base_url: Optional[str] = None, cache_dir: Optional[str] = None, cache_ttl: Optional[float] = None,
+                 cache_size: Optional[int] = None):
         """
         Initialize WeatherClient.
-        
+
         Args:
             use_scenario_mode: If True, bypass API and use static scenario_data.
             scenario_data: Dict containing 'wind_speed', 'wind_deg', 'temperature'.
                            Required if use_scenario_mode is True.
+            base_url: Override of the API endpoint (e.g. a local stub server).
+            cache_dir: Directory for the on-disk cache. Defaults to WEATHER_CACHE_DIR.
+            cache_ttl: Cache lifetime in seconds. Defaults to WEATHER_CACHE_TTL.
+            cache_size: Most (location, day) entries kept in memory. Defaults to WEATHER_CACHE_SIZE.
         """
         self.use_scenario_mode = use_scenario_mode
         self.scenario_data = scenario_data or {}
+        self.base_url = base_url or self.BASE_URL
+        self.cache_dir = WEATHER_CACHE_DIR if cache_dir is None else cache_dir
+        self.cache_ttl = WEATHER_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache_size = WEATHER_CACHE_SIZE if cache_size is None else cache_size
+        self.timeout = 10.0
+        self._memory_cache: "OrderedDict[Tuple[float, float, str], Tuple[float, Dict[str, List[float]]]]" = OrderedDict()
+        self._http: Optional[httpx.Client] = None
+        self._lock = threading.Lock()   # Guards _memory_cache and the lazy _http creation
+
+    def close(self):
+        """Release the pooled HTTP connection."""
+        with self._lock:
+            http, self._http = self._http, None
+        if http is not None:
+            http.close()
 
     def get_weather(self, lat: float, lon: float, timestamp: datetime) -> Dict[str, float]:
         """
         Fetch weather data for a specific location and time.
-        
+
         Args:
             lat: Latitude
             lon: Longitude
             timestamp: datetime object for the desired moment
-            
+
         Returns:
             Dictionary with keys: 'wind_speed', 'wind_deg', 'temperature', 'pressure'
         """
         if self.use_scenario_mode:
             return self._get_scenario_weather()
-            
+
         return self._fetch_from_api(lat, lon, timestamp)
 
     def _get_scenario_weather(self) -> Dict[str, float]:
@@ -52,81 +94,216 @@ class WeatherClient:
             "pressure": self.scenario_data.get("pressure", 1013.0)
         }
 
+    def get_hourly(self, lat: float, lon: float, start: datetime, end: datetime) -> Dict[str, List[float]]:
+        """
+        Fetch the full hourly series covering [start, end] for one location.
+
+        One API call returns every hour of the requested days, so callers that
+        need weather at many moments (e.g. a WeatherField) should use this
+        instead of calling get_weather() per timestamp.
+
+        Returns:
+            Dictionary of equally long lists: 'time' (UTC epoch seconds),
+            'wind_speed' (m/s), 'wind_deg', 'temperature' (C), 'pressure' (hPa)
+        """
+        return self.get_hourly_bulk([(lat, lon)], start, end)[0]
+
+    def get_hourly_bulk(self, locations: Sequence[Tuple[float, float]], start: datetime, end: datetime) -> List[Dict[str, List[float]]]:
+        """
+        Hourly series for many locations, fetching every cache miss in ONE request.
+
+        Open-Meteo accepts comma-separated latitude/longitude lists and answers
+        with one result per coordinate, so a whole course costs a single call.
+
+        Returns:
+            One series per input location (same format as get_hourly), in order.
+        """
+        if self.use_scenario_mode:
+            d = self._get_scenario_weather()
+            return [_constant_series(_to_utc(start), d) for _ in locations]
+
+        dates = _date_range(_to_utc(start), _to_utc(end))
+        keys = [self._cache_key(lat, lon) for lat, lon in locations]
+
+        # 1. Cached days per unique rounded coordinate; collect the misses.
+        #    Held here, not re-read from the cache, so LRU eviction cannot drop them mid-call.
+        cached: Dict[Tuple[float, float], List[Optional[Dict[str, List[float]]]]] = {}
+        missing: List[Tuple[float, float]] = []
+        for coord in keys:
+            if coord not in cached:
+                cached[coord] = [self._cache_get(coord, d) for d in dates]
+                if any(day is None for day in cached[coord]):
+                    missing.append(coord)
+
+        # 2. One bulk request for all misses
+        if missing:
+            try:
+                for coord, series in zip(missing, self._request_hourly(missing, dates[0], dates[-1])):
+                    by_date = _split_by_date(series)
+                    for day, day_series in by_date.items():
+                        self._cache_put(coord, day, day_series)
+                    cached[coord] = [by_date.get(d) for d in dates]
+            except Exception as e:
+                print(f"[Warning] Weather API call failed: {e}. Using default values.")
+
+        # 3. Assemble per-location series from the days
+        results = []
+        for coord in keys:
+            days = cached[coord]
+            if any(day is None for day in days):
+                results.append(_constant_series(_to_utc(start), DEFAULT_WEATHER))
+                continue
+            merged: Dict[str, List[float]] = {k: [] for k in days[0]}
+            for day in days:
+                for k, values in day.items():
+                    merged[k].extend(values)
+            results.append(merged)
+        return results
+
     def _fetch_from_api(self, lat: float, lon: float, timestamp: datetime) -> Dict[str, float]:
         """
-        Internal method to call Open-Meteo API.
-        
+        Weather at the hour closest to `timestamp`.
+
         Note: Open-Meteo requires start_date/end_date for historical data
-        or hourly forecast access. We'll request a small window around the timestamp.
+        or hourly forecast access. We fetch (or reuse) the whole UTC day.
         """
-        # Format date as YYYY-MM-DD
-        date_str = timestamp.strftime("%Y-%m-%d")
-        
-        # Request parameters
+        ts = _to_utc(timestamp)
+        series = self.get_hourly(lat, lon, ts, ts)
+        idx = _nearest_index(series["time"], ts.timestamp())
+        return {k: series[k][idx] for k in DEFAULT_WEATHER}
+
+    def _request_hourly(self, coords: List[Tuple[float, float]], start_date: str, end_date: str) -> List[Dict[str, List[float]]]:
+        """Single HTTP call for one or many coordinates. Reuses a pooled connection."""
         params = {
-            "latitude": lat,
-            "longitude": lon,
-            "start_date": date_str,
-            "end_date": date_str,
-            "hourly": "temperature_2m,surface_pressure,windspeed_10m,winddirection_10m",
+            "latitude": ",".join(str(lat) for lat, _ in coords),
+            "longitude": ",".join(str(lon) for _, lon in coords),
+            "start_date": start_date,
+            "end_date": end_date,
+            "hourly": HOURLY_FIELDS,
             "timezone": "UTC" # Consistent timezone handling
         }
-        
-        query_string = urllib.parse.urlencode(params)
-        url = f"{self.BASE_URL}?{query_string}"
-        
-        try:
-            with urllib.request.urlopen(url) as response:
-                if response.status != 200:
-                    raise Exception(f"HTTP Error: {response.status}")
-                
-                data = json.loads(response.read().decode())
-                return self._parse_api_response(data, timestamp)
-                
-        except Exception as e:
-            print(f"[Warning] Weather API call failed: {e}. Using default values.")
-            return {
-                "wind_speed": 0.0,
-                "wind_deg": 0.0,
-                "temperature": 15.0,
-                "pressure": 1013.0
-            }
-
-    def _parse_api_response(self, data: Dict[str, Any], target_time: datetime) -> Dict[str, float]:
-        """
-        Find the closest hourly data point to the target_time.
-        """
+        with self._lock:
+            if self._http is None:
+                self._http = httpx.Client(timeout=self.timeout)
+            http = self._http
+        resp = http.get(self.base_url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        # A single coordinate returns an object, several return a list
+        blocks = data if isinstance(data, list) else [data]
+        if len(blocks) != len(coords):
+            raise ValueError(f"Expected {len(coords)} locations, got {len(blocks)}")
+        return [self._parse_hourly_series(b) for b in blocks]
+
+    def _parse_hourly_series(self, data: Dict[str, Any]) -> Dict[str, List[float]]:
+        """Convert an Open-Meteo 'hourly' block into SI-unit lists keyed like get_weather()."""
         hourly = data.get("hourly", {})
-        times = hourly.get("time", [])
-        
+        times = [_parse_iso_hour(t) for t in hourly.get("time", [])]
         if not times:
-            return {"wind_speed": 0, "wind_deg": 0, "temperature": 15, "pressure": 1013}
-
-        # Find index of the closest time
-        # Open-Meteo returns time in ISO8601 "YYYY-MM-DDThh:mm"
-        best_idx = 0
-        min_diff = float('inf')
-        
-        target_ts = target_time.timestamp()
-        
-        for i, t_str in enumerate(times):
-            # Parse time string (assuming UTC as requested)
-            try:
-                # Simple parsing for "2023-01-01T12:00" format
-                dt = datetime.strptime(t_str, "%Y-%m-%dT%H:%M")
-                # Assume basic UTC handling for simplicity in prototype
-                diff = abs(dt.timestamp() - target_ts)
-                
-                if diff < min_diff:
-                    min_diff = diff
-                    best_idx = i
-            except ValueError:
-                continue
+            raise ValueError("Empty hourly block")
+
+        def _col(key: str, default: float) -> List[float]:
+            return [default if v is None else float(v) for v in hourly.get(key, [default] * len(times))]
 
-        # Extract values
         return {
-            "temperature": hourly["temperature_2m"][best_idx],
-            "pressure": hourly["surface_pressure"][best_idx],
-            "wind_speed": hourly["windspeed_10m"][best_idx] / 3.6, # Convert km/h to m/s
-            "wind_deg": hourly["winddirection_10m"][best_idx]
+            "time": times,
+            "wind_speed": [v / 3.6 for v in _col("windspeed_10m", 0.0)], # km/h -> m/s
+            "wind_deg": _col("winddirection_10m", 0.0),
+            "temperature": _col("temperature_2m", 15.0),
+            "pressure": _col("surface_pressure", 1013.0)
         }
+
+    # --- Cache ---
+
+    def _cache_key(self, lat: float, lon: float) -> Tuple[float, float]:
+        return round(lat, WEATHER_COORD_DECIMALS), round(lon, WEATHER_COORD_DECIMALS)
+
+    def _cache_path(self, coord: Tuple[float, float], day: str) -> str:
+        name = hashlib.sha1(f"{coord[0]},{coord[1]},{day}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"weather_{name}.json")
+
+    def _cache_get(self, coord: Tuple[float, float], day: str) -> Optional[Dict[str, List[float]]]:
+        now = time.time()
+        key = (coord[0], coord[1], day)
+        with self._lock:
+            hit = self._memory_cache.get(key)
+            if hit is not None:
+                if now - hit[0] <= self.cache_ttl:
+                    self._memory_cache.move_to_end(key)
+                    return hit[1]
+                del self._memory_cache[key]
+
+        if self.cache_dir:
+            path = self._cache_path(coord, day)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if now - entry["fetched_at"] <= self.cache_ttl:
+                    self._memory_put(key, entry["fetched_at"], entry["series"])
+                    return entry["series"]
+            except (OSError, ValueError, KeyError):
+                pass
+        return None
+
+    def _memory_put(self, key: Tuple[float, float, str], fetched_at: float, series: Dict[str, List[float]]):
+        """Insert as most recently used; drop expired entries, then the least recently used beyond cache_size."""
+        now = time.time()
+        with self._lock:
+            cache = self._memory_cache
+            cache[key] = (fetched_at, series)
+            cache.move_to_end(key)
+            for k in [k for k, (t, _) in cache.items() if now - t > self.cache_ttl]:
+                del cache[k]
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def _cache_put(self, coord: Tuple[float, float], day: str, series: Dict[str, List[float]]):
+        fetched_at = time.time()
+        self._memory_put((coord[0], coord[1], day), fetched_at, series)
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(self._cache_path(coord, day), "w", encoding="utf-8") as f:
+                    json.dump({"fetched_at": fetched_at, "series": series}, f)
+            except OSError as e:
+                print(f"[Warning] Failed to write weather cache: {e}")
+
+
+def _to_utc(ts: datetime) -> datetime:
+    """Naive datetimes are treated as UTC (the API is always queried in UTC)."""
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+def _parse_iso_hour(t_str: str) -> float:
+    """'YYYY-MM-DDThh:mm' (UTC) -> epoch seconds."""
+    return datetime.strptime(t_str, "%Y-%m-%dT%H:%M").replace(tzinfo=timezone.utc).timestamp()
+
+def _date_range(start: datetime, end: datetime) -> List[str]:
+    days = []
+    day = start.date()
+    while day <= end.date():
+        days.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return days
+
+def _split_by_date(series: Dict[str, List[float]]) -> Dict[str, Dict[str, List[float]]]:
+    """Split a multi-day hourly series into per-UTC-day series (the cache granularity)."""
+    days: Dict[str, Dict[str, List[float]]] = {}
+    for i, ts in enumerate(series["time"]):
+        day = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+        bucket = days.setdefault(day, {k: [] for k in series})
+        for k, values in series.items():
+            bucket[k].append(values[i])
+    return days
+
+def _nearest_index(times: List[float], target_ts: float) -> int:
+    """Index of the hour closest to target_ts in an ascending time list (binary search)."""
+    i = bisect.bisect_left(times, target_ts)
+    if i == 0:
+        return 0
+    if i == len(times):
+        return len(times) - 1
+    return i if times[i] - target_ts < target_ts - times[i - 1] else i - 1
+
+def _constant_series(start: datetime, values: Dict[str, float]) -> Dict[str, List[float]]:
+    return {"time": [start.timestamp()], **{k: [values[k]] for k in DEFAULT_WEATHER}}
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.core.gpx_loader import Segment
+from src.services.weather import WeatherClient, _to_utc
+
+
+class WeatherField:
+    """
+    Course-aligned weather grid: (distance along course) x (hourly time).
+
+    The course is sampled every `spacing_m` metres and the hourly series for each
+    sample location is fetched once. During simulation, wind/temperature/pressure
+    for every segment are bilinearly interpolated from the grid in one vectorized
+    call, using each segment's distance and predicted arrival time.
+
+    Wind is interpolated as (u, v) components rather than (speed, deg) so that
+    directions around 0/360 deg blend correctly. Components point to where the
+    wind comes FROM (meteorological convention), so that the headwind on a
+    segment with heading h is simply u*sin(h) + v*cos(h), matching
+    `wind_speed * cos(wind_deg - heading)` used by the engines.
+    """
+
+    def __init__(self, start_time: datetime, sample_dist: Sequence[float], times: Sequence[float],
+                 wind_u: np.ndarray, wind_v: np.ndarray, temperature: np.ndarray, pressure: np.ndarray,
+                 sample_ele: Optional[Sequence[float]] = None):
+        """
+        Args:
+            start_time: Ride start (elapsed time 0)
+            sample_dist: Course distance [m] of each sample location (ascending), shape (L,)
+            times: Grid times as elapsed seconds since start_time (ascending), shape (T,)
+            wind_u, wind_v, temperature, pressure: Grids of shape (L, T)
+            sample_ele: Elevation [m] the temperature/pressure of each sample refer to, shape (L,)
+                        (None = unknown; values are then used as-is at any elevation)
+        """
+        self.start_time = _to_utc(start_time)
+        self.sample_dist = np.asarray(sample_dist, dtype=float)
+        self.times = np.asarray(times, dtype=float)
+        self.wind_u = np.asarray(wind_u, dtype=float)
+        self.wind_v = np.asarray(wind_v, dtype=float)
+        self.temperature = np.asarray(temperature, dtype=float)
+        self.pressure = np.asarray(pressure, dtype=float)
+        self.sample_ele = None if sample_ele is None else np.asarray(sample_ele, dtype=float)
+
+        # Degenerate axes (single location or single hour) are duplicated so that
+        # interpolation can always read cell idx and idx + 1.
+        if len(self.sample_dist) == 1:
+            self.sample_dist = np.append(self.sample_dist, self.sample_dist[0] + 1.0)
+            self._repeat_grids(axis=0)
+            if self.sample_ele is not None:
+                self.sample_ele = np.repeat(self.sample_ele, 2)
+        if len(self.times) == 1:
+            self.times = np.append(self.times, self.times[0] + 3600.0)
+            self._repeat_grids(axis=1)
+
+    def _repeat_grids(self, axis: int):
+        for name in ("wind_u", "wind_v", "temperature", "pressure"):
+            setattr(self, name, np.repeat(getattr(self, name), 2, axis=axis))
+
+    @classmethod
+    def constant(cls, wind_speed: float = 0.0, wind_deg: float = 0.0,
+                 temperature: float = 20.0, pressure: float = 1013.0,
+                 start_time: Optional[datetime] = None) -> 'WeatherField':
+        """Single-cell field, equivalent to the global scenario wind."""
+        rad = math.radians(wind_deg)
+        return cls(start_time or datetime(1970, 1, 1), [0.0], [0.0],
+                   np.full((1, 1), wind_speed * math.sin(rad)), np.full((1, 1), wind_speed * math.cos(rad)),
+                   np.full((1, 1), float(temperature)), np.full((1, 1), float(pressure)))
+
+    @classmethod
+    def from_course(cls, client: WeatherClient, segments: List[Segment], start_time: datetime,
+                    duration_hours: float = 12.0, spacing_m: float = 10000.0) -> 'WeatherField':
+        """
+        Build the field for a course by sampling one location every `spacing_m`.
+
+        All sample locations are fetched in a single bulk hourly request covering
+        the whole ride window (and served from the client cache afterwards),
+        instead of one request per segment per probe.
+        """
+        if not segments:
+            return cls.constant(start_time=start_time)
+
+        # 1. Spatial samples: first segment start, every spacing_m, course end.
+        #    The API downscales surface values to the terrain at each location, so the
+        #    course elevation there is the samples' reference elevation.
+        first, last = segments[0], segments[-1]
+        locations = [(first.start_dist, first.start_lat, first.start_lon, first.start_ele)]
+        next_mark = first.start_dist + spacing_m
+        for seg in segments:
+            if seg.end_dist >= next_mark:
+                locations.append((seg.end_dist, seg.lat, seg.lon, seg.end_ele))
+                next_mark = seg.end_dist + spacing_m
+        if locations[-1][0] < last.end_dist:
+            locations.append((last.end_dist, last.lat, last.lon, last.end_ele))
+
+        # 2. Temporal axis: whole hours covering the ride window
+        start_utc = _to_utc(start_time)
+        end_utc = start_utc + timedelta(hours=duration_hours)
+        t0 = math.floor(start_utc.timestamp() / 3600.0) * 3600.0
+        n_hours = int(math.ceil((end_utc.timestamp() - t0) / 3600.0)) + 1
+        grid_epoch = t0 + 3600.0 * np.arange(n_hours)
+
+        # 3. Fetch (one bulk request) and resample each location onto the common hourly axis
+        series = client.get_hourly_bulk([(lat, lon) for _, lat, lon, _ in locations], start_utc, end_utc)
+        return cls._from_series(start_time, [loc[0] for loc in locations], grid_epoch, series,
+                                sample_ele=[loc[3] for loc in locations])
+
+    @classmethod
+    def _from_series(cls, start_time: datetime, sample_dist: Sequence[float],
+                     grid_epoch: np.ndarray, series: List[Dict[str, List[float]]],
+                     sample_ele: Optional[Sequence[float]] = None) -> 'WeatherField':
+        grid_epoch = np.asarray(grid_epoch, dtype=float)
+        shape = (len(series), len(grid_epoch))
+        u, v = np.empty(shape), np.empty(shape)
+        temp, pres = np.empty(shape), np.empty(shape)
+        for i, s in enumerate(series):
+            t = np.asarray(s["time"], dtype=float)
+            rad = np.radians(np.asarray(s["wind_deg"], dtype=float))
+            spd = np.asarray(s["wind_speed"], dtype=float)
+            u[i] = np.interp(grid_epoch, t, spd * np.sin(rad))
+            v[i] = np.interp(grid_epoch, t, spd * np.cos(rad))
+            temp[i] = np.interp(grid_epoch, t, s["temperature"])
+            pres[i] = np.interp(grid_epoch, t, s["pressure"])
+
+        elapsed = grid_epoch - _to_utc(start_time).timestamp()
+        return cls(start_time, sample_dist, elapsed, u, v, temp, pres, sample_ele)
+
+    def sample(self, dist_m: Sequence[float], elapsed_sec: Sequence[float]) -> Dict[str, np.ndarray]:
+        """
+        Interpolate the field at many (distance, elapsed time) pairs at once.
+
+        Returns:
+            Dictionary of arrays: 'wind_u', 'wind_v', 'wind_speed', 'wind_deg',
+            'temperature', 'pressure'. Points outside the grid are clamped to its edge.
+        """
+        d_idx, d_w = _axis_weights(self.sample_dist, np.asarray(dist_m, dtype=float))
+        t_idx, t_w = _axis_weights(self.times, np.asarray(elapsed_sec, dtype=float))
+
+        def _bilinear(grid: np.ndarray) -> np.ndarray:
+            top = grid[d_idx, t_idx] * (1 - t_w) + grid[d_idx, t_idx + 1] * t_w
+            bot = grid[d_idx + 1, t_idx] * (1 - t_w) + grid[d_idx + 1, t_idx + 1] * t_w
+            return top * (1 - d_w) + bot * d_w
+
+        u, v = _bilinear(self.wind_u), _bilinear(self.wind_v)
+        return {
+            "wind_u": u,
+            "wind_v": v,
+            "wind_speed": np.hypot(u, v),
+            "wind_deg": np.degrees(np.arctan2(u, v)) % 360.0,
+            "temperature": _bilinear(self.temperature),
+            "pressure": _bilinear(self.pressure)
+        }
+
+    def reference_elevation(self, dist_m: Sequence[float]) -> Optional[np.ndarray]:
+        """Elevation [m] that sample()'s temperature/pressure refer to at each distance (None if unknown)."""
+        if self.sample_ele is None:
+            return None
+        return np.interp(np.asarray(dist_m, dtype=float), self.sample_dist, self.sample_ele)
+
+    def headwind(self, dist_m: Sequence[float], elapsed_sec: Sequence[float], heading_deg: Sequence[float]) -> np.ndarray:
+        """Headwind component [m/s] (positive = against the rider) for each segment."""
+        w = self.sample(dist_m, elapsed_sec)
+        h = np.radians(np.asarray(heading_deg, dtype=float))
+        return w["wind_u"] * np.sin(h) + w["wind_v"] * np.cos(h)
+
+
+def _axis_weights(axis: np.ndarray, x: np.ndarray):
+    """Lower cell index and fractional weight for linear interpolation on `axis` (len >= 2)."""
+    idx = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+    lo, hi = axis[idx], axis[idx + 1]
+    w = np.clip((x - lo) / (hi - lo), 0.0, 1.0)
+    return idx, w
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.gpx_loader import GpxLoader, Segment
+
+N_POINTS = 400
+
+
+@pytest.fixture
+def synthetic_points():
+    """400 GPX-like points, 11.1 m apart: a gentle +-20 m sine profile heading north."""
+    return [{"lat": 37.5 + i * 1e-4, "lon": 127.0, "ele": 50.0 + 20.0 * np.sin(i / 40.0), "dist_m": i * 11.1}
+            for i in range(N_POINTS)]
+
+
+@pytest.fixture
+def synthetic_segments(synthetic_points):
+    """`synthetic_points` compressed into physics segments the way the server does it."""
+    loader = GpxLoader("")
+    loader.load_from_arrays(*(np.array([p[k] for p in synthetic_points]) for k in ("lat", "lon", "ele", "dist_m")))
+    return loader.compress_segments(grade_threshold=0.005, max_length=200.0)
+
+
+def make_segments(grades, length=200.0, heading=0.0, ele=0.0):
+    """
+    Back-to-back straight segments of equal `length`, one per grade.
+    `heading` may be a single value or one per segment; `ele` sets start/end elevation.
+    """
+    headings = list(heading) if isinstance(heading, (list, tuple)) else [heading] * len(grades)
+    return [Segment(index=i, start_dist=i * length, end_dist=(i + 1) * length, length=length, grade=g,
+                    heading=h, start_ele=ele, end_ele=ele)
+            for i, (g, h) in enumerate(zip(grades, headings))]
+
+
+@pytest.fixture
+def segment_factory():
+    return make_segments
+
+
+@pytest.fixture
+def api_client(tmp_path, monkeypatch):
+    """TestClient for server.app, run from tmp_path (simulation_result.json / local storage land there)."""
+    monkeypatch.chdir(tmp_path)
+    import server
+    return TestClient(server.app)
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import numpy as np
+
+from src.core.atmosphere import air_density, assign_air_density, lapse_to_elevation
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+from src.services.weather_field import WeatherField
+
+
+def test_isa_density():
+    assert abs(air_density(0.0) - 1.225) < 0.001
+    assert abs(air_density(1000.0) - 1.112) < 0.002
+    # Hot, low pressure day at altitude
+    assert air_density(1000.0, temperature_c=30.0, pressure_hpa=890.0) < air_density(1000.0)
+
+
+def test_assign_air_density_from_weather_field(segment_factory):
+    segments = segment_factory([0.0] * 10, ele=0.0)
+    assign_air_density(segments, WeatherField.constant(temperature=35.0, pressure=1000.0))
+    expected = air_density(0.0, 35.0, 1000.0)
+    assert all(abs(s.air_density - expected) < 1e-12 for s in segments)
+
+
+def test_climb_between_weather_samples_thins_the_air(segment_factory):
+    # Both samples (10 km apart) sit at 100 m; the course climbs to 1100 m between them
+    field = WeatherField(datetime(2025, 6, 1), [0.0, 10000.0], [0.0], np.zeros((2, 1)), np.zeros((2, 1)),
+                         np.full((2, 1), 20.0), np.full((2, 1), 1000.0), sample_ele=[100.0, 100.0])
+    valley, summit = segment_factory([0.0] * 50, ele=100.0), segment_factory([0.0] * 50, ele=1100.0)
+    assign_air_density(valley, field)
+    assign_air_density(summit, field)
+
+    assert abs(valley[25].air_density - air_density(100.0, 20.0, 1000.0)) < 1e-12
+    temp_c, p_hpa = lapse_to_elevation(20.0, 1000.0, 100.0, 1100.0)
+    assert abs(temp_c - 13.5) < 1e-9 and 885.0 < p_hpa < 890.0
+    assert abs(summit[25].air_density - air_density(1100.0, temp_c, p_hpa)) < 1e-12
+    assert summit[25].air_density / valley[25].air_density < 0.91    # ~ISA: 1.099 / 1.213
+
+
+def test_thinner_air_is_faster(segment_factory):
+    rider = Rider(cp=250.0, w_prime_max=20000.0, weight=70.0)
+    low, high = segment_factory([0.0] * 10, ele=0.0), segment_factory([0.0] * 10, ele=1500.0)
+    assign_air_density(low)
+    assign_air_density(high)
+    engine = PhysicsEngineV2(rider, PhysicsParams())
+    t_low = engine.simulate_course(low, 200.0, 600.0).total_time_sec
+    t_high = engine.simulate_course(high, 200.0, 600.0).total_time_sec
+    assert t_high < t_low
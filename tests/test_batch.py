@@ -0,0 +1,98 @@
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.services.batch import BatchJob, make_engine, result_payload, run_batch
+
+RIDERS = [{"weight_kg": 70, "cp": 250}, {"weight_kg": 60, "cp": 300, "w_prime": 25000.0},
+          {"weight_kg": 85, "cp": 220, "bike_weight": 9.0}]
+
+
+def test_run_batch_matches_single_runs_inline_and_in_pool(synthetic_segments):
+    segments = synthetic_segments
+    jobs = [BatchJob(index=i, rider=r, engine="v2", job_id=f"r{i}") for i, r in enumerate(RIDERS)]
+    expected = [result_payload(make_engine("v2", r).find_optimal_pacing(segments), include_track=False)
+                for r in RIDERS]
+
+    for workers in (1, 2):
+        out = sorted(run_batch(segments, jobs, include_track=False, max_workers=workers), key=lambda o: o["index"])
+        assert [o["id"] for o in out] == ["r0", "r1", "r2"]
+        for o, ref in zip(out, expected):
+            assert o["total_time_sec"] == pytest.approx(ref["total_time_sec"])
+            assert "track_data" not in o
+
+
+def test_failed_job_is_reported_not_raised(synthetic_segments):
+    jobs = [BatchJob(index=0, rider={"weight_kg": 70, "cp": 250}, engine="nope"),
+            BatchJob(index=1, rider=RIDERS[0], engine="v2")]
+    out = list(run_batch(synthetic_segments, jobs, max_workers=1))
+    assert "error" in out[0] and "total_time_sec" in out[1]
+
+
+def test_simulate_batch_streams_ndjson(api_client, synthetic_points):
+    riders = [{**r, "id": f"m{i}"} for i, r in enumerate(RIDERS)]
+    res = api_client.post("/api/simulate_batch", json={"points": synthetic_points, "riders": riders, "include_track": True,
+                                                  "track_format": "columnar"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert sorted(o["id"] for o in lines) == ["m0", "m1", "m2"]
+    assert all(len(o["track_data"]["dist_km"]) > 0 for o in lines)
+
+    single = api_client.post("/api/simulate", json={"points": synthetic_points, "rider": RIDERS[1]}).json()
+    by_id = {o["id"]: o for o in lines}
+    assert by_id["m1"]["total_time_sec"] == pytest.approx(single["total_time_sec"])
+
+    bad = api_client.post("/api/simulate_batch", json={"points": synthetic_points, "riders": [{**RIDERS[0], "engine": "nope"}]})
+    assert bad.status_code == 400
+    assert api_client.post("/api/simulate_batch", json={"points": synthetic_points, "riders": []}).status_code == 400
+
+
+def test_simulate_batch_cancels_pending_jobs_on_disconnect(synthetic_points, monkeypatch):
+    import server
+    from src.services import batch
+
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("forkserver"))
+    submitted = []
+
+    def submit(*args, **kwargs):
+        submitted.extend(batch.submit_batch(*args, executor=pool, **kwargs))
+        return submitted
+
+    monkeypatch.setattr(server, "submit_batch", submit)
+    riders = [{**RIDERS[i % len(RIDERS)], "id": f"m{i}"} for i in range(8)]
+    body = json.dumps({"points": synthetic_points, "riders": riders, "include_track": False}).encode()
+    try:
+        lines = asyncio.run(_drop_after_first_line(server.app, "/api/simulate_batch", body))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    assert len(lines) == 1 and json.loads(lines[0])["id"] == "m0"
+    assert all(f.done() for f in submitted)
+    assert any(f.cancelled() for f in submitted)      # The riders still queued never ran
+
+
+async def _drop_after_first_line(app, path, body):
+    """Drive `app` over ASGI and disconnect as soon as the first response line arrives."""
+    lines, gone = [], asyncio.Event()
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            lines.extend(message["body"].splitlines())
+            gone.set()
+
+    scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+             "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": b"", "headers": [(b"content-type", b"application/json")],
+             "server": ("testserver", 80), "client": ("testclient", 50000)}
+    await asyncio.wait_for(app(scope, receive, send), timeout=60)
+    return lines
@@ -0,0 +1,28 @@
+from scripts.benchmark import RESULT_FIELDS, load_riders, run_benchmark
+
+GRADES = [0.0, 0.05, 0.09, -0.04, -0.08, 0.01]
+
+
+def test_benchmark_reports_every_case_and_golden_deltas(segment_factory):
+    riders = load_riders(["rider_a"])
+    courses = {"tiny": segment_factory(GRADES)}
+
+    report = run_benchmark(["v1", "v2"], courses, riders)
+    assert [(c["engine"], c["course"], c["rider"]) for c in report["cases"]] == [("v1", "tiny", "rider_a"), ("v2", "tiny", "rider_a")]
+    for case in report["cases"]:
+        assert case["wall_time_sec"] > 0
+        assert case["simulate_calls"] >= 15        # binary search probes
+        assert case["peak_memory_kb"] > 0
+        assert set(case["result"]) == set(RESULT_FIELDS)
+
+    # Deterministic engines: a rerun against itself has zero deltas
+    rerun = run_benchmark(["v2"], courses, riders, golden=report, measure_memory=False)
+    delta = rerun["cases"][0]["delta"]
+    assert all(delta[f] == 0.0 for f in RESULT_FIELDS)
+    assert rerun["cases"][0]["peak_memory_kb"] is None
+
+
+def test_benchmark_collects_engine_counters(segment_factory):
+    report = run_benchmark(["v2"], {"tiny": segment_factory(GRADES)}, load_riders(["rider_a"]), measure_memory=False)
+    case = report["cases"][0]
+    assert case["counters"]["outer_iterations"] == case["solver_iterations"] == 15
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from src.core.rider import Rider
+from src.engines.base import PhysicsEngine
+from src.engines.cancellation import CancelToken
+from src.engines.legacy.gordon import GordonTheoryEngine
+from src.engines.legacy.v3 import PhysicsEngineV3
+from src.engines.legacy.v5 import PhysicsEngineV5
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+def _rider():
+    return Rider(weight=70, cp=250, w_prime_max=20000)
+
+
+def test_token_cancel_and_deadline():
+    token = CancelToken()
+    assert token.stop_reason is None
+    token.cancel()
+    assert token.stop_reason == "cancelled"
+
+    token = CancelToken(timeout_sec=0.01)
+    assert not token.cancelled
+    time.sleep(0.02)
+    assert token.stop_reason == "deadline"
+
+
+def test_v2_returns_best_feasible_probe_when_cancelled(synthetic_segments):
+    engine = PhysicsEngineV2(_rider(), PhysicsParams(bike_weight=8.5))
+    token = CancelToken()
+    engine.set_cancel_token(token)
+    seen = []
+
+    def on_progress(p):
+        seen.append(p)
+        if len(seen) == 5:
+            token.cancel()
+
+    engine.set_progress(on_progress)
+    res = engine.find_optimal_pacing(synthetic_segments)
+    assert len(seen) == 5
+    assert res.interrupted == "cancelled"
+    assert res.base_power == seen[-1].best_p_base
+
+    engine.set_progress(None)
+    engine.set_cancel_token(None)
+    full = engine.find_optimal_pacing(synthetic_segments)
+    assert full.interrupted == "" and full.base_power >= res.base_power
+
+
+@pytest.mark.parametrize("engine_cls", [PhysicsEngineV2, PhysicsEngine, PhysicsEngineV3, PhysicsEngineV5])
+def test_expired_deadline_without_feasible_probe_fails(engine_cls, synthetic_segments):
+    engine = engine_cls(_rider(), PhysicsParams(bike_weight=8.5))
+    token = CancelToken(timeout_sec=1e-9)
+    time.sleep(0.001)
+    engine.set_cancel_token(token)
+    calls = []
+    inner = engine.simulate_course
+    engine.simulate_course = lambda *a, **k: calls.append(1) or inner(*a, **k)
+    res = engine.find_optimal_pacing(synthetic_segments)
+    assert calls == []      # No fallback simulation after the deadline
+    assert res.interrupted == "deadline"
+    assert not res.is_success and res.fail_reason == "deadline"
+
+
+def test_gordon_vcrit_search_stops_after_first_probe(synthetic_segments):
+    engine = GordonTheoryEngine(_rider(), PhysicsParams(bike_weight=8.5))
+    token = CancelToken()
+    token.cancel()
+    engine.set_cancel_token(token)
+    calls = []
+    inner = engine.simulate_course
+    engine.simulate_course = lambda *a, **k: calls.append(1) or inner(*a, **k)
+    res = engine.find_pbase_for_work(synthetic_segments, target_work_kj=200.0)
+    assert len(calls) == 1 and res.interrupted == "cancelled"
+
+
+def test_simulate_honours_request_timeout(api_client, synthetic_points):
+    body = {"points": synthetic_points, "rider": {"weight_kg": 70, "cp": 250}}
+    assert "interrupted" not in api_client.post("/api/simulate", json=body).json()
+
+    res = api_client.post("/api/simulate", json={**body, "timeout_sec": 1e-6})
+    assert res.status_code == 504
+    assert "deadline" in res.json()["detail"]
+
+
+def test_stream_reports_deadline_without_feasible_probe_as_error(api_client, synthetic_points):
+    body = {"points": synthetic_points, "rider": {"weight_kg": 70, "cp": 250}, "timeout_sec": 1e-6}
+    res = api_client.post("/api/simulate/stream", json=body)
+    assert res.status_code == 200
+    assert res.text.startswith("event: error\n") and "deadline" in res.text
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+
+def _engine(max_dke, equilibrium_tol=0.0, min_dv=0.75):
+    engine = PhysicsEngineV2(Rider(weight=70, cp=250, w_prime_max=20000), PhysicsParams(bike_weight=8.5))
+    engine.set_tuning(mode='linear')
+    engine.beta_aero = 0.0
+    engine.set_chunking(max_dke, equilibrium_tol, min_dv)
+    engine.enable_instrumentation()
+    return engine
+
+
+@pytest.fixture
+def solve(segment_factory):
+    """Solve one segment: (exit speed, time, chunks used, average power)."""
+    def _solve(engine, length, grade, v_in, power=300.0):
+        seg = segment_factory([grade], length)[0]
+        before = engine.stats.chunks
+        v, t, _, p_avg = engine._solve_segment_physics(seg, power, v_in, 0.0, 9999.0, max_power_limit=1e9)
+        return v, t, engine.stats.chunks - before, p_avg
+    return _solve
+
+
+def test_steady_segment_takes_one_chunk(solve):
+    engine = _engine(0.1)
+    v_eq = engine.calculate_flat_speed(200.0)
+    v, t, n, p_avg = solve(engine, 200.0, 0.0, v_eq, power=200.0)
+    assert n == 1
+    assert abs(v - v_eq) < 0.05
+    assert p_avg == 200.0
+    assert solve(_engine(0.0), 200.0, 0.0, v_eq, power=200.0)[2] == 10
+
+
+def test_transition_is_more_accurate_than_fixed_chunks(solve):
+    # Ramp right after a descent: 60 km/h into 10 %
+    v_ref, t_ref, _, _ = solve(_engine(0.0005, min_dv=0.0), 200.0, 0.10, 60 / 3.6)
+    v_fix, t_fix, n_fix, _ = solve(_engine(0.0), 200.0, 0.10, 60 / 3.6)
+    v_ad, t_ad, n_ad, _ = solve(_engine(0.1), 200.0, 0.10, 60 / 3.6)
+    assert abs(t_ad - t_ref) < abs(t_fix - t_ref)
+    assert abs(v_ad - v_ref) < 0.1
+
+
+def test_slow_climb_is_not_over_chunked(solve):
+    # 15 % ramp entered at 15 km/h, fading to ~7 km/h: the relative bound alone wants 5 m chunks
+    v_ref, t_ref, _, _ = solve(_engine(0.0005, min_dv=0.0), 300.0, 0.15, 15 / 3.6, power=250.0)
+    _, t_fix, n_fix, _ = solve(_engine(0.0), 300.0, 0.15, 15 / 3.6, power=250.0)
+    n_relative = solve(_engine(0.1, min_dv=0.0), 300.0, 0.15, 15 / 3.6, power=250.0)[2]
+    v, t, n, _ = solve(_engine(0.1), 300.0, 0.15, 15 / 3.6, power=250.0)
+    assert n < n_relative and n < n_fix
+    assert abs(t - t_ref) < abs(t_fix - t_ref)
+    assert abs(v - v_ref) < 0.05
+
+
+def test_fixed_chunking_restores_legacy_chunk_count(synthetic_segments):
+    segments = synthetic_segments
+    fixed = _engine(0.0)
+    fixed.simulate_course(segments, 250.0, 750.0)
+    assert fixed.stats.chunks == sum(max(1, int(np.ceil(s.length / 20.0))) for s in segments)
+
+    adaptive = _engine(0.1)
+    res = adaptive.simulate_course(segments, 250.0, 750.0)
+    assert adaptive.stats.chunks < fixed.stats.chunks
+    assert res.total_time_sec > 0
+
+
+def test_equilibrium_shortcut_matches_bisected_chunks(solve):
+    # Long steady climb entered a little below its equilibrium speed
+    v_ref, t_ref, _, _ = solve(_engine(0.1), 1000.0, 0.06, 5.0)
+    engine = _engine(0.1, 0.1)
+    v, t, n, p_avg = solve(engine, 1000.0, 0.06, 5.0)
+    assert engine.stats.equilibrium_shortcuts == 1
+    assert engine.stats.bisection_iterations == 0 and n == 1
+    assert abs(v - v_ref) < 0.005 and abs(t - t_ref) < 0.05
+    assert p_avg == 300.0
+
+    # Far from equilibrium (ramp after a descent) the first chunks are still bisected
+    engine = _engine(0.1, 0.1)
+    v, t, n, _ = solve(engine, 200.0, 0.10, 60 / 3.6)
+    v_ref, t_ref, _, _ = solve(_engine(0.1), 200.0, 0.10, 60 / 3.6)
+    assert n > 1 and engine.stats.bisection_iterations > 0
+    assert abs(v - v_ref) < 0.005 and abs(t - t_ref) < 0.05
@@ -0,0 +1,27 @@
+import math
+
+from src.engines.course import prepare_course, build_course
+from src.engines.v2 import PhysicsParams
+
+GRADES = [0.01 * i for i in range(5)]
+HEADINGS = [(30.0 * i) % 360 for i in range(5)]
+
+
+def test_prepared_course_is_cached_per_course_and_params(segment_factory):
+    a = prepare_course(segment_factory(GRADES, 100.0, heading=HEADINGS), 70.0, PhysicsParams())
+    b = prepare_course(segment_factory(GRADES, 100.0, heading=HEADINGS), 70.0, PhysicsParams()) # equal course, new objects
+    assert a is b
+    assert prepare_course(segment_factory(GRADES, 100.0, heading=HEADINGS), 70.0, PhysicsParams(cda=0.25)) is not a
+    assert prepare_course(segment_factory(GRADES, 100.0, heading=HEADINGS), 75.0, PhysicsParams()) is not a
+
+
+def test_segment_constants(segment_factory):
+    params = PhysicsParams(bike_weight=8.0)
+    course = build_course(segment_factory(GRADES, 100.0, heading=HEADINGS), 72.0, params)
+    assert course.total_mass == 80.0
+    assert math.isinf(course.segments[0].v_corner_limit) # no previous heading change
+    # 30 deg over 100 m -> R = 191 m -> sqrt(0.8 * 9.81 * R)
+    radius = 100.0 / math.radians(30.0)
+    assert abs(course.segments[1].v_corner_limit - math.sqrt(0.8 * 9.81 * radius)) < 1e-9
+    assert course.segments[3].num_chunks == 5 and course.segments[3].d_sub == 20.0
+    assert abs(course.segments[2].f_gravity - 80.0 * 9.81 * 0.02) < 1e-9
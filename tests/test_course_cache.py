@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.core.gpx_loader import GpxLoader
+from src.core.storage import LocalStorageProvider
+from src.services import course_cache
+from src.services.course_cache import CourseNotFound, get_course_segments
+from src.services.valhalla import ValhallaClient
+
+COURSE_ID = "course_" + "ab" * 32
+
+
+def _standard_course(n=600):
+    # Standard Course JSON built offline (no map matching) from a synthetic climb + descent
+    shape = [(37.5 + i * 1e-4, 127.0 + (i % 50) * 1e-5) for i in range(n)]
+    ele = (60.0 * np.sin(np.arange(n) / n * np.pi)).tolist()
+    return ValhallaClient()._parse_to_standard_format({"edges": []}, shape, ele)
+
+
+@pytest.fixture
+def stored_course(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)     # local storage + simulation_result.json in tmp
+    course_cache.clear_course_cache()
+    course = _standard_course()
+    LocalStorageProvider().save(course, f"{COURSE_ID}.json")
+    yield course
+    course_cache.clear_course_cache()
+
+
+def test_segments_come_from_valhalla_segmentation_and_are_cached(stored_course, monkeypatch):
+    segments = get_course_segments(COURSE_ID)
+    assert len(segments) == stored_course["stats"]["segments_count"]
+    assert [s.length for s in segments] == stored_course["segments"]["length"]
+
+    # Second call is a cache hit (no storage access) and returns independent copies
+    build = course_cache._build_segments
+    monkeypatch.setattr(course_cache, "_build_segments", lambda cid: pytest.fail("cache miss"))
+    segments[0].air_density = 1.0
+    again = get_course_segments(COURSE_ID)
+    assert again[0].air_density == 0.0 and again[0] is not segments[0]
+
+    monkeypatch.setattr(course_cache, "_build_segments", build)
+    with pytest.raises(CourseNotFound):
+        get_course_segments("course_" + "cd" * 32)
+    with pytest.raises(ValueError):
+        get_course_segments("course_../../x")
+
+
+def test_simulate_by_course_id_skips_resegmentation(stored_course, api_client):
+    res = api_client.post("/api/simulate", json={"course_id": COURSE_ID, "rider": {"weight_kg": 70, "cp": 250}})
+    assert res.status_code == 200
+    body = res.json()
+    assert len(body["track_data"]) == stored_course["stats"]["segments_count"]
+
+    loader = GpxLoader("")
+    loader.load_from_standard_json(stored_course)
+    assert body["track_data"][-1]["dist_km"] == pytest.approx(loader.segments[-1].end_dist / 1000.0, abs=1e-6)
+
+    missing = api_client.post("/api/simulate", json={"course_id": "course_" + "cd" * 32, "rider": {"weight_kg": 70, "cp": 250}})
+    assert missing.status_code == 404
@@ -0,0 +1,41 @@
+from src.core.rider import Rider
+from src.engines.legacy.v3 import PhysicsEngineV3
+from src.engines.v2 import PhysicsParams
+
+
+def _exact_segment_time(power, v_entry, grade, mass=78.0, length=300.0):
+    """The V3 segment equation solved to machine precision."""
+    low, high = 0.01, 40.0
+    for _ in range(200):
+        mid = (low + high) / 2
+        v_avg = max((v_entry + mid) / 2, 0.1)
+        residual = (0.5 * mass * v_entry ** 2 + power * 0.95 * length / v_avg
+                    - (0.5 * 1.225 * 0.30 * v_avg ** 2 + mass * 9.81 * (grade + 0.0045)) * length
+                    - 0.5 * mass * mid ** 2)
+        if residual > 0:
+            low = mid
+        else:
+            high = mid
+    v = (low + high) / 2
+    return v, length / ((v_entry + v) / 2)
+
+
+def test_analytic_sensitivity_matches_finite_difference(segment_factory):
+    engine = PhysicsEngineV3(Rider(cp=250.0, w_prime_max=20000.0, weight=70.0), PhysicsParams())
+    for grade in (-0.02, 0.0, 0.04, 0.09):
+        for power, v_entry in ((150.0, 3.0), (250.0, 8.0), (400.0, 5.0)):
+            v, t = _exact_segment_time(power, v_entry, grade)
+            _, t_up = _exact_segment_time(power + 1e-4, v_entry, grade)
+            fd = (t_up - t) / 1e-4
+            analytic = engine._segment_time_sensitivity(segment_factory([grade], 300.0)[0], power, v_entry, v, 0)
+            assert abs(analytic - fd) < 1e-5 * max(1.0, abs(fd))
+
+
+def test_optimizer_stops_when_converged(segment_factory):
+    engine = PhysicsEngineV3(Rider(cp=250.0, w_prime_max=20000.0, weight=70.0), PhysicsParams())
+    # Identical flat segments: equal gradients, so the profile only needs the energy rescale
+    segments = segment_factory([0.0] * 10, 300.0)
+    budget = engine.simulate_course(segments, [200.0] * 10).work_kj * 1000.0
+    powers = engine.solve_dahmen_optimizer(segments, budget, 750.0)
+    assert engine.last_dahmen_iterations < 20
+    assert max(powers) - min(powers) < 30.0
@@ -0,0 +1,20 @@
+from src.core.rider import Rider
+from src.engines.flat_speed import solve_flat_speed
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+
+def test_flat_speed_solves_power_balance():
+    for power in (50.0, 160.0, 250.0, 400.0, 1200.0):
+        v = solve_flat_speed(power, 89.0, 0.32, 0.006, 1.225, 0.05)
+        p_req = (0.5 * 1.225 * 0.32 * v ** 2 + 89.0 * 9.81 * 0.006) * v
+        assert abs(p_req - power * 0.95) < 1e-9 * power
+    assert solve_flat_speed(0.0, 89.0, 0.32, 0.006) == 0.0
+    # No rolling resistance: pure cube root
+    assert abs(solve_flat_speed(200.0, 80.0, 0.3, 0.0, 1.2, 0.0) - (200.0 / 0.18) ** (1 / 3)) < 1e-12
+
+
+def test_engine_uses_shared_solver():
+    params = PhysicsParams(bike_weight=8.0)
+    engine = PhysicsEngineV2(Rider(cp=250.0, w_prime_max=20000.0, weight=70.0), params)
+    assert engine.calculate_flat_speed(200.0) == solve_flat_speed(200.0, 78.0, params.cda, params.crr,
+                                                                  params.air_density, params.drivetrain_loss)
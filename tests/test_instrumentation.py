@@ -0,0 +1,60 @@
+from src.core.rider import Rider
+from src.engines.instrumentation import bisection_steps
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+from src.services.metrics import MetricsRegistry
+
+GRADES = [0.0, 0.06, 0.12, -0.04, -0.09, -0.09, 0.02]
+
+
+def _engine():
+    return PhysicsEngineV2(Rider(cp=250.0, w_prime_max=20000.0, weight=70.0), PhysicsParams())
+
+
+def test_bisection_steps_matches_halving():
+    assert bisection_steps(44.99, 0.005, 15) == 14
+    assert bisection_steps(0.004, 0.005, 15) == 0
+    assert bisection_steps(1e6, 0.005, 15) == 15
+
+
+def test_counters_do_not_change_results(segment_factory):
+    plain = _engine().find_optimal_pacing(segment_factory(GRADES, 300.0))
+    assert plain.stats is None
+
+    engine = _engine()
+    engine.enable_instrumentation()
+    res = engine.find_optimal_pacing(segment_factory(GRADES, 300.0))
+    assert res.total_time_sec == plain.total_time_sec
+
+    s = res.stats
+    assert s["outer_iterations"] == 15
+    assert s["simulate_calls"] >= 15
+    assert 0 < s["chunks"] < s["segments"] * 15         # Adaptive: fewer than 300 m / 20 m chunks
+    assert s["equilibrium_shortcuts"] > 0
+    assert 0 < s["bisection_iterations"] <= s["chunks"] * 15
+    assert s["brake_activations"] > 0                   # -9 % descent runs past 50 km/h
+    assert s["phase_seconds"]["search"] >= s["phase_seconds"]["simulate"] > 0
+
+    engine.enable_instrumentation(False)
+    assert engine.find_optimal_pacing(segment_factory(GRADES, 300.0)).stats is None
+
+    engine.set_chunking(0, equilibrium_tol=0)
+    engine.enable_instrumentation()
+    s = engine.find_optimal_pacing(segment_factory(GRADES, 300.0)).stats
+    assert s["chunks"] == s["segments"] * 15            # Fixed: 300 m / 20 m chunks
+
+
+def test_metrics_render_prometheus_text(segment_factory):
+    engine = _engine()
+    engine.enable_instrumentation()
+    stats = engine.find_optimal_pacing(segment_factory(GRADES, 300.0)).stats
+
+    registry = MetricsRegistry()
+    registry.observe("v2", stats)
+    registry.observe("v2", stats)
+    registry.observe("v1", None)
+    text = registry.render()
+    assert 'bike_sim_requests_total{engine="v2"} 2' in text
+    assert 'bike_sim_requests_total{engine="v1"} 1' in text
+    assert f'bike_sim_chunks_total{{engine="v2"}} {2 * stats["chunks"]}' in text
+    assert 'bike_sim_phase_seconds_total{engine="v2",phase="search"}' in text
+    assert "# TYPE bike_sim_chunks_total counter" in text
@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+
+from src.services import json_response
+from src.services.json_response import FastJSONResponse, dumps, round_floats
+
+
+def test_round_floats_vectorizes_float_lists_and_keeps_ints():
+    out = round_floats({"lat": [37.1234567891, 37.2], "idx": [1, 2], "name": "x", "v": 1.23456789}, 3)
+    assert isinstance(out["lat"], np.ndarray) and out["lat"].tolist() == [37.123, 37.2]
+    assert out["idx"] == [1, 2] and out["name"] == "x" and out["v"] == 1.235
+    assert round_floats([1.5, "a"], 0) == [2.0, "a"]          # mixed list falls back per item
+    payload = {"a": [0.1]}
+    assert round_floats(payload, None) is payload
+
+
+def test_round_floats_keeps_mixed_lists_exact(monkeypatch):
+    content = {"a": [1.5, 2], "b": [1.0, "2"], "c": [1.0, None], "d": [0.5, True]}
+    expected = {"a": [1.5, 2], "b": [1.0, "2"], "c": [1.0, None], "d": [0.5, True]}
+    assert round_floats(content, 3) == expected
+    assert isinstance(round_floats(content, 3)["a"][1], int)
+    assert json.loads(dumps(content, digits=3)) == expected
+    monkeypatch.setattr(json_response, "orjson", None)
+    text = dumps(content, digits=3).decode()
+    assert "NaN" not in text and json.loads(text) == expected
+
+
+def test_dumps_numpy_and_fallback_agree(monkeypatch):
+    content = {"track": {"speed": np.array([30.123456789, 31.0])}, "n": np.int64(3), 1: [0.5, 0.25]}
+    fast = json.loads(dumps(content, digits=2))
+    monkeypatch.setattr(json_response, "orjson", None)
+    slow = json.loads(dumps(content, digits=2))
+    assert fast == slow == {"track": {"speed": [30.12, 31.0]}, "n": 3, "1": [0.5, 0.25]}
+
+
+def test_response_class_renders_bytes():
+    resp = FastJSONResponse({"x": np.arange(3, dtype=float)})
+    assert json.loads(resp.body) == {"x": [0.0, 1.0, 2.0]}
+    assert resp.media_type == "application/json"
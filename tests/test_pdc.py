@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.core.pdc import PowerDurationCurve
+from src.core.rider import Rider
+
+PDC = {"5": 900.0, "60": 450.0, "300": 330.0, "1200": 290.0, "3600": 260.0}
+
+
+def test_log_log_interpolation_and_riegel_tail():
+    curve = PowerDurationCurve(PDC, riegel_exponent=-0.10)
+    # Exact at the data points
+    assert np.allclose(curve.evaluate([5, 60, 300, 1200, 3600]), [900, 450, 330, 290, 260])
+    # Piecewise power law between points
+    k = math.log(330.0 / 450.0) / math.log(300.0 / 60.0)
+    assert abs(curve.power(120) - 450.0 * (120 / 60) ** k) < 1e-9
+    # Clamped below the first point, Riegel beyond the last
+    assert curve.power(1) == pytest.approx(900.0)
+    assert abs(curve.power(7200) - 260.0 * 2 ** -0.10) < 1e-9
+    assert curve.power(7200, riegel_exponent=0.0) == pytest.approx(260.0)
+
+
+def test_vectorized_matches_scalar():
+    curve = PowerDurationCurve(PDC)
+    durations = np.geomspace(1, 20000, 200)
+    assert np.allclose(curve.evaluate(durations), [curve.power(d) for d in durations])
+
+
+def test_curve_is_immutable_and_tracks_rider_pdc():
+    rider = Rider(cp=250.0, w_prime_max=20000.0, weight=70.0, pdc=PDC)
+    curve = rider.pdc_curve
+    with pytest.raises(AttributeError):
+        curve.riegel_exponent = 0.0
+    with pytest.raises(ValueError):
+        curve.powers[0] = 1.0
+
+    assert Rider(cp=250.0, w_prime_max=20000.0, weight=70.0, pdc={"60": 400}).pdc == {60: 400.0}
+    assert rider.pdc_curve is curve     # Cached while `pdc` is unchanged
+
+    rider.pdc = {"60": 400.0}
+    assert rider.pdc_curve is not curve and len(rider.pdc_curve) == 1
+    rider.pdc[300] = 330.0              # In-place edits are picked up too
+    assert len(rider.pdc_curve) == 2 and rider.pdc_curve.step_power(300) == 330.0
+
+    # step lookup keeps the conservative "first duration >= T" semantics
+    rider.pdc = PDC
+    assert rider.check_pdc_limit(335.0, 200)      # 330 W (300 s) + 5 W margin
+    assert not rider.check_pdc_limit(340.0, 200)
+    assert not Rider(cp=250.0, w_prime_max=20000.0, weight=70.0).pdc_curve
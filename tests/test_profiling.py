@@ -0,0 +1,31 @@
+from src.core.profiling import SamplingProfiler, format_hotspots
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+GRADES = [0.0, 0.05, 0.09, -0.03, -0.07]
+
+
+def test_sampling_profiler_collects_scoped_stacks(tmp_path, segment_factory):
+    engine = PhysicsEngineV2(Rider(cp=250.0, w_prime_max=20000.0, weight=70.0), PhysicsParams())
+    segments = segment_factory(GRADES * 40)
+
+    with SamplingProfiler(interval=0.001) as prof:
+        while prof.samples < 20:
+            engine.find_optimal_pacing(segments)
+
+    assert prof.stacks
+    # Only engine/loader frames survive the scope filter, outermost first
+    for stack in prof.stacks:
+        assert all(f.startswith("src.") for f in stack.split(";"))
+    assert any(stack.startswith("src.engines.v2:find_optimal_pacing") for stack in prof.stacks)
+
+    top = prof.top(5)
+    assert top and [h.self_samples for h in top] == sorted((h.self_samples for h in top), reverse=True)
+    assert any("_solve_segment_physics" in h.frame for h in prof.top(20))
+    assert "self%" in format_hotspots(top)
+
+    path = tmp_path / "out.folded"
+    prof.write_collapsed(str(path))
+    lines = path.read_text().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == sum(prof.stacks.values())
+    assert prof.summary(3)["samples"] == prof.samples
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from src.core.rider import Rider
+from src.engines.base import PhysicsEngine
+from src.engines.progress import SearchCancelled
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+@pytest.mark.parametrize("engine_cls", [PhysicsEngineV2, PhysicsEngine])
+def test_progress_reports_every_probe(engine_cls, capsys, synthetic_segments):
+    engine = engine_cls(Rider(weight=70, cp=250, w_prime_max=20000), PhysicsParams(bike_weight=8.5))
+    seen = []
+    engine.set_progress(seen.append)
+    res = engine.find_optimal_pacing(synthetic_segments)
+
+    assert [p.iteration for p in seen] == list(range(1, 16))
+    assert all(b.bracket_w < a.bracket_w for a, b in zip(seen, seen[1:]))
+    assert seen[-1].best_p_base == res.base_power and seen[-1].best_time_sec == res.total_time_sec
+    assert capsys.readouterr().out == ""     # debug output goes to the logger now
+
+
+def test_progress_callback_can_cancel(synthetic_segments):
+    engine = PhysicsEngineV2(Rider(weight=70, cp=250, w_prime_max=20000), PhysicsParams(bike_weight=8.5))
+    calls = []
+
+    def stop_after_three(p):
+        calls.append(p)
+        if len(calls) == 3:
+            raise SearchCancelled()
+
+    engine.set_progress(stop_after_three)
+    with pytest.raises(SearchCancelled):
+        engine.find_optimal_pacing(synthetic_segments)
+    assert len(calls) == 3
+
+
+def _events(text):
+    out = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def test_simulate_stream_emits_progress_then_result(api_client, synthetic_points):
+    rider = {"weight_kg": 70, "cp": 250}
+    res = api_client.post("/api/simulate/stream", json={"points": synthetic_points, "rider": rider})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(res.text)
+    assert [e for e, _ in events] == ["progress"] * 15 + ["result"]
+    assert events[0][1]["iteration"] == 1 and "p_base" in events[0][1]
+    final = events[-1][1]
+    single = api_client.post("/api/simulate", json={"points": synthetic_points, "rider": rider}).json()
+    assert final["total_time_sec"] == pytest.approx(single["total_time_sec"])
+    assert events[-2][1]["best_time_sec"] == pytest.approx(final["total_time_sec"])
+
+    assert api_client.post("/api/simulate/stream", json={"points": synthetic_points, "rider": rider, "engine": "nope"}).status_code == 400
@@ -0,0 +1,41 @@
+import pytest
+
+from src.core.rider import Rider
+from src.engines.course import PreparedCourse
+from src.engines import registry
+from src.engines.registry import Engine, ENGINES, available_engines, create_engine, get_engine_class, register_engine
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+GRADES = [0.0, 0.04, 0.08, -0.03, -0.07, 0.02]
+
+
+def _rider():
+    return Rider(cp=250.0, w_prime_max=20000.0, weight=70.0, pdc={"60": 450.0, "300": 320.0, "1200": 270.0})
+
+
+@pytest.mark.parametrize("name", available_engines())
+def test_every_registered_engine_satisfies_protocol(name, segment_factory):
+    engine = create_engine(name, _rider(), PhysicsParams())
+    assert isinstance(engine, Engine)
+
+    segments = segment_factory(GRADES)
+    assert isinstance(engine.prepare_course(segments), PreparedCourse)
+    if name == "v5":
+        return   # full V5 pacing takes minutes; the protocol check above is enough
+    res = engine.find_optimal_pacing(segments)
+    assert res.total_time_sec > 0
+
+
+def test_default_and_unknown_engine(monkeypatch):
+    monkeypatch.setattr(registry, "DEFAULT_ENGINE", "v2")
+    assert get_engine_class(None) is PhysicsEngineV2
+    with pytest.raises(ValueError):
+        create_engine("v99", _rider(), PhysicsParams())
+
+
+def test_register_engine_by_path():
+    register_engine("v2_alias", "src.engines.v2:PhysicsEngineV2")
+    try:
+        assert get_engine_class("v2_alias") is PhysicsEngineV2
+    finally:
+        del ENGINES["v2_alias"]
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.gpx_loader import Segment
+from src.core.rider import Rider, RiderState
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+
+def _hilly_course():
+    grades = [0.03, 0.05, -0.04, 0.0, 0.06, -0.06, 0.01]
+    return [Segment(index=i, start_dist=i * 500.0, end_dist=(i + 1) * 500.0, length=500.0,
+                    grade=grades[i % len(grades)], heading=0.0, start_ele=0.0, end_ele=0.0)
+            for i in range(70)]
+
+
+def test_next_state_is_pure():
+    rider = Rider(cp=250.0, w_prime_max=20000.0, weight=70.0)
+    state = rider.initial_state()
+    depleted = rider.next_state(state, 350.0, 60.0)
+    assert depleted == RiderState(14000.0) and state == RiderState(20000.0)
+    assert rider.next_state(depleted, 250.0, 60.0) is depleted      # at CP: unchanged
+    assert 14000.0 < rider.next_state(depleted, 150.0, 60.0).w_prime_bal < 20000.0
+    assert rider.w_prime_bal == 20000.0
+
+
+def test_shared_engine_runs_concurrently():
+    rider = Rider(cp=250.0, w_prime_max=20000.0, weight=70.0)
+    engine = PhysicsEngineV2(rider, PhysicsParams())
+    segments = _hilly_course()
+    powers = [160.0, 200.0, 240.0, 280.0, 320.0, 360.0]
+
+    sequential = [engine.simulate_course(segments, p, p * 3.0) for p in powers]
+    with ThreadPoolExecutor(max_workers=len(powers)) as pool:
+        parallel = list(pool.map(lambda p: engine.simulate_course(segments, p, p * 3.0), powers))
+
+    for a, b in zip(sequential, parallel):
+        assert (a.total_time_sec, a.w_prime_min, a.is_success) == (b.total_time_sec, b.w_prime_min, b.is_success)
+    assert rider.w_prime_bal == rider.w_prime_max   # never touched by the engine
+
+    # A run can start from a partially depleted state
+    assert sequential[1].is_success
+    tired = engine.simulate_course(segments, 200.0, 600.0, state=RiderState(15000.0))
+    assert tired.is_success and tired.w_prime_min < sequential[1].w_prime_min
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from src.config.simulation import SimulationConfig, SolverConfig
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams, SEARCH_MAX_ITERATIONS
+
+def _engine():
+    return PhysicsEngineV2(Rider(weight=70, cp=250, w_prime_max=20000), PhysicsParams(bike_weight=8.5))
+
+
+def test_default_search_is_full_precision(synthetic_segments):
+    res = _engine().find_optimal_pacing(synthetic_segments)
+    tol = res.achieved_tolerance
+    assert tol["iterations"] == SEARCH_MAX_ITERATIONS
+    assert tol["p_base_w"] == pytest.approx(1490.0 / 2 ** SEARCH_MAX_ITERATIONS)
+
+
+def test_power_tolerance_stops_early_close_to_full_answer(synthetic_segments):
+    segments = synthetic_segments
+    full = _engine().find_optimal_pacing(segments)
+
+    engine = _engine()
+    engine.set_search_tolerance(power_tolerance_w=2.0)
+    loose = engine.find_optimal_pacing(segments)
+    tol = loose.achieved_tolerance
+    assert tol["iterations"] < SEARCH_MAX_ITERATIONS and tol["p_base_w"] < 2.0
+    assert full.base_power - tol["p_base_w"] <= loose.base_power <= full.base_power
+
+
+def test_time_tolerance_bounds_finish_time_error(synthetic_segments):
+    segments = synthetic_segments
+    full = _engine().find_optimal_pacing(segments)
+
+    engine = _engine()
+    engine.set_search_tolerance(time_tolerance_sec=5.0)
+    loose = engine.find_optimal_pacing(segments)
+    tol = loose.achieved_tolerance
+    assert tol["time_sec"] is not None and tol["time_sec"] < 5.0
+    assert tol["iterations"] < SEARCH_MAX_ITERATIONS
+    assert loose.total_time_sec - full.total_time_sec < 5.0
+
+
+def test_config_replaces_binary_search_iterations(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"solver": {"binary_search_iterations": 9, "time_tolerance_sec": 2.5}}))
+    solver = SimulationConfig.load_from_json(str(path)).solver
+    assert solver == SolverConfig(max_iterations=9, time_tolerance_sec=2.5)
+
+
+def test_simulate_reports_achieved_tolerance(api_client, synthetic_points):
+    body = {"points": synthetic_points, "rider": {"weight_kg": 70, "cp": 250}, "power_tolerance_w": 5.0}
+    tol = api_client.post("/api/simulate", json=body).json()["achieved_tolerance"]
+    assert tol["p_base_w"] < 5.0 and tol["iterations"] < SEARCH_MAX_ITERATIONS
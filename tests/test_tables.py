@@ -0,0 +1,38 @@
+from src.core.rider import Rider
+from src.engines.course import BRAKE_GAIN_KMH
+from src.engines.tables import BrakeTable, SteadyStateSpeedTable, get_tables
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+
+def test_brake_table_matches_exact_formula():
+    table = BrakeTable()
+    assert table.max_abs_error < 1e-3
+    assert table.decel(10.0) == 0.0
+    for v in (14.5, 20.0, 25.0, 30.0, 44.0):
+        exact = BRAKE_GAIN_KMH * ((v * 3.6 - 50.0) ** 1.2) / 3.6
+        assert abs(table.decel(v) - exact) <= table.max_abs_error + 1e-12
+
+
+def test_steady_state_speed_balances_forces():
+    table = SteadyStateSpeedTable(78.0, 0.30, 0.0045, 1.225, BrakeTable())
+    assert table.speed(0.0) == 0.0
+    assert table.speed(-0.002) == 0.0   # gravity below rolling resistance
+    v = table.speed(-0.08)
+    f_push = 78.0 * 9.81 * (0.08 - 0.0045)
+    f_resist = 0.5 * 1.225 * 0.30 * v * v + table.brake_table.force(v, 78.0)
+    assert abs(f_push - f_resist) / f_push < 0.01
+    # Tables are shared between engines with the same mass / CdA
+    assert get_tables(78.0, 0.30, 0.0045, 1.225) is get_tables(78.0, 0.30, 0.0045, 1.225)
+
+
+def test_coasting_bracket_matches_full_bisection(segment_factory):
+    rider = Rider(cp=250.0, w_prime_max=20000.0, weight=70.0)
+    engine = PhysicsEngineV2(rider, PhysicsParams())
+    for grade, v_entry in ((-0.08, 5.0), (-0.12, 25.0), (-0.06, 16.0)):
+        seg = segment_factory([grade], 400.0)[0]
+        bracketed = engine._solve_segment_physics(seg, 0.0, v_entry, 0.0, 500.0, 1000.0)
+        engine._is_coasting = lambda g: False
+        full = engine._solve_segment_physics(seg, 0.0, v_entry, 0.0, 500.0, 1000.0)
+        del engine._is_coasting
+        assert abs(bracketed[0] - full[0]) < 0.005
+        assert abs(bracketed[1] - full[1]) < 0.01
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from src.core.gpx_loader import Segment
+from src.core.rider import Rider
+from src.engines.track import Track, track_from
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+
+
+def _profile_track(n=201):
+    dist = np.linspace(0.0, 10.0, n)                      # km
+    ele = 100.0 + 50.0 * np.sin(dist / 10.0 * np.pi)      # one smooth hill
+    return Track({"dist_km": dist, "ele": ele, "power": np.full(n, 200.0)})
+
+
+def test_track_reads_like_list_of_dicts():
+    rows = [{"dist_km": 0.2, "power": 210.0}, {"dist_km": 0.4, "power": 190.0}]
+    track = Track.from_rows(rows)
+    assert len(track) == 2 and track
+    assert track[1] == rows[1]
+    assert list(track) == rows == track.rows()
+    assert track.to_columns() == {"dist_km": [0.2, 0.4], "power": [210.0, 190.0]}
+    assert track_from(rows).rows() == rows and track_from(track) is track
+    assert not Track({})
+    with pytest.raises(ValueError):
+        Track({"a": [1.0], "b": [1.0, 2.0]})
+
+
+def test_douglas_peucker_keeps_profile_within_tolerance():
+    track = _profile_track()
+    small = track.decimate(0.5)
+    assert 2 < len(small) < len(track) // 4
+    assert small[0] == track[0] and small[-1] == track[-1]
+    # Every dropped point lies within the tolerance of the kept polyline
+    interp = np.interp(track.columns["dist_km"], small.columns["dist_km"], small.columns["ele"])
+    assert np.max(np.abs(interp - track.columns["ele"])) <= 0.5
+    assert track.decimate(0) is track
+
+
+def test_stride_keeps_last_row():
+    track = _profile_track(10)
+    assert track.decimate_stride(4).columns["dist_km"].tolist() == track.columns["dist_km"][[0, 4, 8, 9]].tolist()
+
+
+def test_v2_track_is_columnar_and_optional():
+    segments = [Segment(index=i, start_dist=i * 200.0, end_dist=(i + 1) * 200.0, length=200.0,
+                        grade=g, heading=0.0, start_ele=0.0, end_ele=10.0 * i) for i, g in enumerate([0.0, 0.05, -0.05])]
+    engine = PhysicsEngineV2(Rider(cp=250.0, w_prime_max=20000.0, weight=70.0), PhysicsParams())
+    res = engine.simulate_course(segments, 200.0, 600.0)
+    assert isinstance(res.track_data, Track) and len(res.track_data) == 3
+    assert res.track_data[2]["dist_km"] == 0.6 and res.track_data[-1]["time_sec"] == res.total_time_sec
+
+    bare = engine.simulate_course(segments, 200.0, 600.0, record_track=False)
+    assert bare.track_data is None and bare.total_time_sec == res.total_time_sec
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.core.gpx_loader import GpxLoader
+from src.services.transport import course_filename, pack_array, unpack_array
+
+RIDER = {"weight_kg": 70, "cp": 250}
+
+
+@pytest.fixture
+def columns(synthetic_points):
+    """lat, lon, ele, dist arrays of the synthetic course."""
+    return tuple(np.array([p[k] for p in synthetic_points]) for k in ("lat", "lon", "ele", "dist_m"))
+
+
+def test_pack_roundtrip_and_validation(columns):
+    lat = columns[0]
+    assert np.array_equal(unpack_array(pack_array(lat, "float64"), "float64"), lat)
+    assert np.allclose(unpack_array(pack_array(lat)), lat, atol=1e-5)      # float32: ~0.4 m at 37 deg
+    with pytest.raises(ValueError):
+        unpack_array(pack_array(lat)[:-4])                                 # truncated
+    with pytest.raises(ValueError):
+        unpack_array(pack_array(lat), "int8")
+
+    assert course_filename("course_" + "a" * 64) == "course_" + "a" * 64 + ".json"
+    for bad in ("course_../../etc/passwd", "course_abc", None):
+        with pytest.raises(ValueError):
+            course_filename(bad)
+
+
+def test_load_from_arrays_matches_point_list(columns):
+    _, _, ele, dist = columns
+    loader = GpxLoader("")
+    loader.load_from_arrays(*columns)
+    assert len(loader.points) == len(dist)
+    assert loader.points[7].distance_from_start == dist[7] and loader.points[7].ele == ele[7]
+
+
+def test_simulate_accepts_packed_points(api_client, synthetic_points, columns):
+    lat, lon, ele, dist = columns
+    legacy = api_client.post("/api/simulate", json={"points": synthetic_points, "segments": [], "rider": RIDER}).json()
+
+    packed = api_client.post("/api/simulate", json={
+        "points_packed": {"lat": pack_array(lat, "float64"), "lon": pack_array(lon, "float64"),
+                          "ele": pack_array(ele, "float64"), "dist": pack_array(dist, "float64"), "dtype": "float64"},
+        "rider": RIDER}).json()
+    assert packed["total_time_sec"] == legacy["total_time_sec"]
+
+    assert api_client.post("/api/simulate", json={"course_id": "course_" + "1" * 64, "rider": RIDER}).status_code == 404
+    assert api_client.post("/api/simulate", json={"course_id": "../x", "rider": RIDER}).status_code == 400
+    assert api_client.post("/api/simulate", json={"rider": RIDER}).status_code == 400
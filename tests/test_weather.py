@@ -1,5 +1,10 @@
-from src.weather_client import WeatherClient
-from datetime import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timezone
+
+from src.services.weather import WeatherClient
 
 def test_weather():
     # 1. API 모드 테스트 (서울 시청)
@@ -36,3 +41,114 @@ def test_weather():
 
 if __name__ == "__main__":
     test_weather()
+
+
+# --- Cache / bulk fetch against a local stub server ---
+class _StubOpenMeteo(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)
+        _StubOpenMeteo.requests.append(q)
+        lats = q["latitude"][0].split(",")
+        day = q["start_date"][0]
+        blocks = [{
+            "hourly": {
+                "time": [f"{day}T{h:02d}:00" for h in range(24)],
+                "temperature_2m": [float(lat) for _ in range(24)],
+                "surface_pressure": [1000.0 + h for h in range(24)],
+                "windspeed_10m": [3.6 * h for h in range(24)],
+                "winddirection_10m": [90.0 for _ in range(24)]
+            }
+        } for lat in lats]
+        body = json.dumps(blocks if len(blocks) > 1 else blocks[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _start_stub():
+    _StubOpenMeteo.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOpenMeteo)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+
+def test_bulk_fetch_and_cache(tmp_path):
+    server, url = _start_stub()
+    try:
+        start = datetime(2025, 6, 1, 6, 0, tzinfo=timezone.utc)
+        end = datetime(2025, 6, 1, 18, 0, tzinfo=timezone.utc)
+        locations = [(37.501, 127.001), (37.6, 127.1), (37.7, 127.2)]
+
+        client = WeatherClient(base_url=url, cache_dir=str(tmp_path))
+        series = client.get_hourly_bulk(locations, start, end)
+        assert len(_StubOpenMeteo.requests) == 1 # one call for all locations
+        assert series[1]["temperature"][0] == 37.6
+        assert abs(series[0]["wind_speed"][10] - 10.0) < 1e-9 # km/h -> m/s
+
+        # Memory cache: nearest-hour lookup and coordinates rounding to the same cell
+        w = client.get_weather(37.5012, 127.0009, datetime(2025, 6, 1, 12, 20, tzinfo=timezone.utc))
+        assert len(_StubOpenMeteo.requests) == 1
+        assert w["pressure"] == 1012.0
+        assert abs(w["wind_speed"] - 12.0) < 1e-9
+
+        # Disk cache: a fresh client does not hit the network
+        client2 = WeatherClient(base_url=url, cache_dir=str(tmp_path))
+        client2.get_hourly(37.7, 127.2, start, end)
+        assert len(_StubOpenMeteo.requests) == 1
+
+        # Expired entries are refetched
+        client3 = WeatherClient(base_url=url, cache_dir=str(tmp_path), cache_ttl=-1)
+        client3.get_hourly(37.7, 127.2, start, end)
+        assert len(_StubOpenMeteo.requests) == 2
+        client.close(); client2.close(); client3.close()
+    finally:
+        server.shutdown()
+
+def test_memory_cache_is_a_bounded_lru(monkeypatch):
+    from src.services import weather
+
+    now = [1000.0]
+    monkeypatch.setattr(weather.time, "time", lambda: now[0])
+    client = WeatherClient(cache_dir="", cache_ttl=3600.0, cache_size=2)
+    day = {"time": [0.0], "temperature": [20.0]}
+    client._cache_put((37.5, 127.0), "2025-06-01", day)
+    client._cache_put((37.6, 127.0), "2025-06-01", day)
+    assert client._cache_get((37.5, 127.0), "2025-06-01") is day     # Now the most recently used
+    client._cache_put((37.7, 127.0), "2025-06-01", day)
+    assert list(client._memory_cache) == [(37.5, 127.0, "2025-06-01"), (37.7, 127.0, "2025-06-01")]
+
+    # Expired entries are dropped on the next insert, not only when the same key is refetched
+    now[0] += 4000.0
+    client._cache_put((37.8, 127.0), "2025-06-02", day)
+    assert list(client._memory_cache) == [(37.8, 127.0, "2025-06-02")]
+
+def test_bulk_fetch_larger_than_memory_cache():
+    server, url = _start_stub()
+    try:
+        start = datetime(2025, 6, 1, 6, 0, tzinfo=timezone.utc)
+        client = WeatherClient(base_url=url, cache_dir="", cache_size=1)
+        series = client.get_hourly_bulk([(37.5, 127.0), (37.6, 127.1), (37.7, 127.2)], start, start)
+        assert [s["temperature"][0] for s in series] == [37.5, 37.6, 37.7]   # Not the defaults
+        assert len(client._memory_cache) == 1
+        client.close()
+    finally:
+        server.shutdown()
+
+def test_server_reuses_one_weather_client(api_client, synthetic_points, monkeypatch):
+    import server
+
+    stub, url = _start_stub()
+    monkeypatch.setattr(server, "WEATHER", WeatherClient(base_url=url, cache_dir=""))
+    try:
+        body = {"points": synthetic_points, "rider": {"weight_kg": 70, "cp": 250}, "start_time": "2025-06-01T06:00:00Z"}
+        assert api_client.post("/api/simulate", json=body).status_code == 200
+        assert api_client.post("/api/simulate", json=body).status_code == 200
+        assert len(_StubOpenMeteo.requests) == 1    # Second request served from the shared cache
+    finally:
+        server.WEATHER.close()
+        stub.shutdown()
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.core.atmosphere import assign_air_density
+from src.core.gpx_loader import Segment
+from src.core.rider import Rider
+from src.engines.v2 import PhysicsEngineV2, PhysicsParams
+from src.services.weather import WeatherClient
+from src.services.weather_field import WeatherField
+
+START = datetime(2025, 6, 1, 6, 0, tzinfo=timezone.utc)
+
+
+class FakeHourlyClient:
+    """Wind from the north, growing 1 m/s per hour; temperature rises with distance (lat)."""
+    def __init__(self):
+        self.calls = 0
+
+    def get_hourly(self, lat, lon, start, end):
+        self.calls += 1
+        t0 = START.timestamp()
+        hours = range(13)
+        return {
+            "time": [t0 + 3600 * h for h in hours],
+            "wind_speed": [float(h) for h in hours],
+            "wind_deg": [0.0 for _ in hours],
+            "temperature": [lat for _ in hours],
+            "pressure": [1000.0 for _ in hours]
+        }
+
+    def get_hourly_bulk(self, locations, start, end):
+        return [self.get_hourly(lat, lon, start, end) for lat, lon in locations]
+
+
+def _straight_course(n=100, length=1000.0, heading=0.0):
+    return [
+        Segment(index=i, start_dist=i * length, end_dist=(i + 1) * length, length=length,
+                grade=0.0, heading=heading, start_ele=0.0, end_ele=0.0,
+                lat=float(i + 1), lon=0.0, start_lat=float(i), start_lon=0.0)
+        for i in range(n)
+    ]
+
+
+def test_field_interpolates_time_and_distance():
+    client = FakeHourlyClient()
+    segments = _straight_course()
+    field = WeatherField.from_course(client, segments, START, duration_hours=12.0, spacing_m=10000.0)
+
+    # 11 sample locations (every 10 km), not one per segment
+    assert client.calls == 11
+
+    w = field.sample([0.0, 50000.0, 100000.0], [0.0, 1800.0, 7200.0])
+    assert abs(w["wind_speed"][0] - 0.0) < 1e-9
+    assert abs(w["wind_speed"][1] - 0.5) < 1e-9
+    assert abs(w["wind_speed"][2] - 2.0) < 1e-9
+    assert abs(w["temperature"][1] - 50.0) < 1e-9
+    assert list(field.reference_elevation([0.0, 55000.0])) == [0.0, 0.0]   # Course elevation at the samples
+
+    # Wind from the north on a northbound segment is a pure headwind
+    hw = field.headwind([0.0], [3600.0], [0.0])
+    assert abs(hw[0] - 1.0) < 1e-9
+    # ... and a pure tailwind southbound
+    hw = field.headwind([0.0], [3600.0], [180.0])
+    assert abs(hw[0] + 1.0) < 1e-9
+
+
+def test_wind_direction_blends_across_north():
+    field = WeatherField._from_series(START, [0.0], [START.timestamp(), START.timestamp() + 3600],
+                                      [{"time": [START.timestamp(), START.timestamp() + 3600],
+                                        "wind_speed": [5.0, 5.0], "wind_deg": [350.0, 10.0],
+                                        "temperature": [20.0, 20.0], "pressure": [1013.0, 1013.0]}])
+    w = field.sample([0.0], [1800.0])
+    assert w["wind_deg"][0] < 1e-6 or w["wind_deg"][0] > 360.0 - 1e-6
+
+
+def test_constant_field_matches_scenario_wind():
+    segments = _straight_course(n=20, length=500.0, heading=45.0)
+    rider = Rider(cp=250.0, w_prime_max=20000.0, weight=70.0)
+    field = WeatherField.constant(wind_speed=4.0, wind_deg=90.0)
+    assign_air_density(segments, field)     # Same air on both sides (the field also sets density)
+
+    scenario = WeatherClient(use_scenario_mode=True, scenario_data={"wind_speed": 4.0, "wind_deg": 90.0})
+    res_scenario = PhysicsEngineV2(rider, PhysicsParams(), scenario).simulate_course(segments, 200.0, 600.0)
+
+    engine = PhysicsEngineV2(rider, PhysicsParams())
+    engine.set_weather_field(field)
+    res_field = engine.simulate_course(segments, 200.0, 600.0)
+
+    assert abs(res_scenario.total_time_sec - res_field.total_time_sec) < 1e-6
+
+
+def test_search_samples_weather_at_predicted_arrival(segment_factory):
+    segments = segment_factory([0.08] * 20, 500.0)     # 10 km at 8 %: far slower than flat speed
+    field = WeatherField.constant()
+    lookups = []
+    sample = field.sample
+    field.sample = lambda dist, elapsed: lookups.append(np.asarray(elapsed, dtype=float)) or sample(dist, elapsed)
+
+    engine = PhysicsEngineV2(Rider(cp=250.0, w_prime_max=20000.0, weight=70.0), PhysicsParams())
+    engine.set_weather_field(field)
+    res = engine.find_optimal_pacing(segments)
+    finish = res.track_data.columns["time_sec"][-1]
+
+    # The first probe can only guess from the flat speed; later probes use the previous track
+    assert lookups[0][-1] < 0.5 * finish
+    assert abs(lookups[-1][-1] - finish) < 0.05 * finish
@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+
+from src.core.rider import Rider
+from src.core.wprime import SKIBA_2015, w_prime_balance
+
+
+def _random_ride(n=5000, seed=1):
+    rng = np.random.default_rng(seed)
+    power = rng.uniform(0.0, 450.0, n)
+    power[::50] = 250.0     # exactly at CP: no change
+    duration = rng.uniform(1.0, 60.0, n)
+    return power, duration
+
+
+def test_matches_scalar_skiba_2012():
+    power, duration = _random_ride()
+    rider = Rider(cp=250.0, w_prime_max=20000.0, weight=70.0)
+    expected = []
+    for p, dt in zip(power, duration):
+        rider.update_w_prime(p, dt)
+        expected.append(rider.w_prime_bal)
+
+    trace = w_prime_balance(power, duration, 250.0, 20000.0)
+    assert np.allclose(trace.balance, expected, rtol=0, atol=1e-6)
+    assert abs(trace.minimum - min(20000.0, min(expected))) < 1e-6
+
+
+def test_streaming_equals_single_pass():
+    power, duration = _random_ride(n=2000, seed=2)
+    full = w_prime_balance(power, duration, 250.0, 20000.0, model=SKIBA_2015)
+    first = w_prime_balance(power[:700], duration[:700], 250.0, 20000.0, model=SKIBA_2015)
+    second = w_prime_balance(power[700:], duration[700:], 250.0, 20000.0,
+                             w_initial=first.balance[-1], model=SKIBA_2015)
+    assert np.allclose(np.concatenate([first.balance, second.balance]), full.balance, atol=1e-6)
+
+
+def test_skiba_2015_closed_form_and_long_recovery():
+    # Deplete 10 kJ, then recover 600 s at 150 W below CP
+    trace = w_prime_balance([350.0, 100.0], [100.0, 600.0], 250.0, 20000.0, model=SKIBA_2015)
+    assert trace.balance[0] == 10000.0
+    expected = 20000.0 - 10000.0 * math.exp(-150.0 * 600.0 / 20000.0)
+    assert abs(trace.balance[1] - expected) < 1e-9
+    assert trace.minimum == 10000.0
+
+    # Days of easy riding must not underflow the scan
+    trace = w_prime_balance(np.full(100000, 50.0), np.full(100000, 30.0), 250.0, 20000.0, w_initial=0.0)
+    assert np.all(np.isfinite(trace.balance)) and abs(trace.balance[-1] - 20000.0) < 1e-6